@@ -0,0 +1,239 @@
+"""
+Cold-start benchmark for a fresh (serverless) instance.
+
+Every measurement starts a new Python process: the import time of main.py
+(and which heavy modules it pulled in), then a uvicorn server against the
+local OpenAI-compatible stub, timing the first HEAD / and the first and
+second POST /evaluate, once without and once with WARMUP_ON_STARTUP.
+
+    cd backend && python -m bench.cold_start --runs 5 --output cold-start.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+import httpx
+
+from bench.corpus import BENCH_JD, build_corpus
+from bench.run import stub_overrides
+from bench.stub_server import StubConfig, StubServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a health check must not need (see the lazy imports in main.py).
+HEAVY_MODULES = ("services.ai", "langchain_openai", "langgraph", "openai", "pymupdf")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"seconds": seconds, "heavy_loaded": heavy}}))
+"""
+
+
+# --- Measurements ---
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": _ms(statistics.median(values)),
+        "min_ms": _ms(min(values)),
+        "max_ms": _ms(max(values)),
+    }
+
+
+def measure_import(runs: int) -> Dict[str, Any]:
+    """Time to `import main` in fresh interpreters, and what it loaded."""
+    seconds, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        seconds.append(probe["seconds"])
+        heavy.update(probe["heavy_loaded"])
+    return {"runs": runs, **_summary(seconds), "heavy_loaded": sorted(heavy)}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(client: httpx.Client, process, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            if client.head("/").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise TimeoutError("server did not answer HEAD / in time")
+
+
+def _evaluate(client: httpx.Client, pdf: bytes) -> float:
+    start = time.perf_counter()
+    response = client.post(
+        "/evaluate",
+        params={"cache": "false"},
+        files={"file": ("resume.pdf", pdf, "application/pdf")},
+    )
+    elapsed = time.perf_counter() - start
+    final = json.loads(response.text.strip().splitlines()[-1])
+    if final.get("status") != "completed":
+        raise RuntimeError(f"evaluation failed: {final}")
+    return elapsed
+
+
+def measure_server(env: Dict[str, str], pdf: bytes, timeout: float) -> Dict[str, Any]:
+    """One fresh server: first health check, then two evaluations."""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(
+            base_url=f"http://127.0.0.1:{port}", timeout=timeout
+        ) as client:
+            _wait_healthy(client, process, timeout)
+            first_health = time.perf_counter() - start
+            client.post("/job-description", params={"content": BENCH_JD})
+            first_evaluation = _evaluate(client, pdf)
+            second_evaluation = _evaluate(client, pdf)
+            warmup = client.get("/stats").json()["warmup"]
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {
+        "first_health_s": first_health,
+        "first_evaluation_s": first_evaluation,
+        "first_result_s": time.perf_counter() - start,
+        "second_evaluation_s": second_evaluation,
+        "warmup": warmup,
+    }
+
+
+def summarize_server(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"runs": len(samples)}
+    for key in (
+        "first_health_s",
+        "first_evaluation_s",
+        "second_evaluation_s",
+        "first_result_s",
+    ):
+        result[key.removesuffix("_s")] = _summary([sample[key] for sample in samples])
+    result["warmup"] = samples[-1]["warmup"]
+    return result
+
+
+# --- Runner ---
+def run_cold_start(args) -> Dict[str, Any]:
+    config = StubConfig(
+        latency=args.latency, tokens_per_second=args.tokens_per_second, seed=args.seed
+    )
+    _, pages, pdf = build_corpus(1, seed=args.seed)[0]
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "runs": args.runs,
+            "resume_pages": pages,
+            "stub": asdict(config),
+        }
+    }
+
+    print("import main...")
+    report["import"] = measure_import(args.runs)
+
+    report["server"] = {}
+    with StubServer(config) as stub:
+        for label, warmup in (("cold", "false"), ("warmup", "true")):
+            print(f"Server ({label})...")
+            samples = []
+            for _ in range(args.runs):
+                with tempfile.TemporaryDirectory() as workdir:
+                    env = {
+                        **os.environ,
+                        **stub_overrides(stub, workdir),
+                        "WARMUP_ON_STARTUP": warmup,
+                    }
+                    samples.append(measure_server(env, pdf, args.timeout))
+            report["server"][label] = summarize_server(samples)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", default="cold-start-report.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = run_cold_start(args)
+
+    # A health check must stay cheap: flag heavy modules loaded at import.
+    violations = [
+        f"import main loaded {module}" for module in report["import"]["heavy_loaded"]
+    ]
+    report["regressions"] = violations
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Report written to {args.output}")
+    print(f"  import main: {report['import']['median_ms']} ms")
+    for label, result in report["server"].items():
+        print(
+            f"  {label}: first HEAD / {result['first_health']['median_ms']} ms, "
+            f"first evaluation {result['first_evaluation']['median_ms']} ms, "
+            f"second {result['second_evaluation']['median_ms']} ms"
+        )
+    for violation in violations:
+        print(f"  REGRESSION {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
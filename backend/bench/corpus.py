@@ -0,0 +1,89 @@
+import random
+from typing import List, Tuple
+
+import pymupdf as fitz
+
+# --- Synthetic resume corpus ---
+# Digital (text-layer) PDFs only, so extraction never falls back to "scan".
+FIRST_NAMES = ["Somchai", "Malee", "Anan", "Kanya", "Niran", "Pim", "Tawan", "Dao"]
+LAST_NAMES = ["Jaidee", "Suksan", "Wongsa", "Rattana", "Chaiyo", "Boonmee"]
+MATCHING_SKILLS = [
+    "Python",
+    "FastAPI",
+    "PostgreSQL",
+    "Docker",
+    "Kubernetes",
+    "REST APIs",
+    "Redis",
+    "CI/CD",
+    "Linux",
+    "unit testing",
+]
+UNRELATED_SKILLS = [
+    "titration",
+    "HPLC",
+    "GMP",
+    "ISO 17025",
+    "lab safety",
+    "quality control",
+    "retail sales",
+    "inventory counts",
+]
+BENCH_JD = """Senior Backend Engineer
+Requirements:
+- 5+ years Python development
+- FastAPI or Django REST APIs
+- PostgreSQL and Redis
+- Docker, Kubernetes, CI/CD
+- Linux and unit testing"""
+
+UNIVERSITIES = ["Chulalongkorn University", "Kasetsart University", "KMUTT"]
+
+LINES_PER_PAGE = 40
+PAGE_COUNTS = (1, 2, 3, 5, 10)
+
+
+def resume_lines(rng: random.Random, pages: int, matching: bool) -> List[str]:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = f"{name.lower().replace(' ', '.')}@example.com"
+    skills = MATCHING_SKILLS if matching else UNRELATED_SKILLS
+    lines = [name, email, "", "Skills: " + ", ".join(rng.sample(skills, 5)), ""]
+    lines += ["Education", f"B.Sc., {rng.choice(UNIVERSITIES)}", "", "Experience"]
+    while len(lines) < pages * LINES_PER_PAGE:
+        year = rng.randint(2010, 2024)
+        lines.append(f"{year}: worked on {rng.choice(skills)} and {rng.choice(skills)}")
+        lines.append(
+            f"  - delivered {rng.randint(2, 30)} projects for a team of {rng.randint(3, 40)}"
+        )
+    return lines
+
+
+def make_resume_pdf(lines: List[str]) -> bytes:
+    # Every page repeats a header and a numbered footer, like real CVs do.
+    doc = fitz.open()
+    pages = (len(lines) + LINES_PER_PAGE - 1) // LINES_PER_PAGE
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = doc.new_page()
+        page.insert_text((50, 30), f"{lines[0]}  |  Curriculum Vitae", fontsize=8)
+        page.insert_text(
+            (50, 60), "\n".join(lines[start : start + LINES_PER_PAGE]), fontsize=9
+        )
+        number = start // LINES_PER_PAGE + 1
+        page.insert_text((270, 815), f"Page {number} of {pages}", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def build_corpus(
+    size: int, seed: int = 7, match_ratio: float = 0.7
+) -> List[Tuple[str, int, bytes]]:
+    """Returns [(file_name, pages, pdf_bytes)], deterministic for a seed."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        pages = PAGE_COUNTS[i % len(PAGE_COUNTS)]
+        matching = rng.random() < match_ratio
+        pdf = make_resume_pdf(resume_lines(rng, pages, matching))
+        corpus.append((f"resume_{i:03d}_{pages}p.pdf", pages, pdf))
+    return corpus
@@ -0,0 +1,453 @@
+"""
+Offline benchmark for the evaluation pipeline.
+
+Runs a local OpenAI-compatible stub, builds a synthetic PDF corpus and
+drives text extraction, the judge graph and POST /evaluate at increasing
+concurrency. Writes a JSON report and checks it against regression
+thresholds (exit code 1 on a violation).
+
+    cd backend && python -m bench.run --concurrency 1,4,16 --output report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from bench.corpus import BENCH_JD, build_corpus
+from bench.stub_server import StubConfig, StubServer
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(__file__), "thresholds.json")
+
+
+# --- Measurements ---
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+    }
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "peak_rss_mb": round(own / scale, 1),
+        "peak_rss_children_mb": round(children / scale, 1),
+    }
+
+
+async def drive(
+    call: Callable[[Any], Awaitable[bool]], items: List[Any], concurrency: int
+) -> Dict[str, Any]:
+    """Runs call(item) for every item with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(item):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await call(item)
+            except Exception as e:
+                print(f"  ! {type(e).__name__}: {e}")
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(item) for item in items))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(items),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
+
+
+def llm_counters(stub: StubServer, resumes: int, before: Dict[str, int]):
+    after = dict(stub.llm.stats)
+    calls = (after["reviewer_calls"] - before["reviewer_calls"]) + (
+        after["auditor_calls"] - before["auditor_calls"]
+    )
+    return {
+        "llm_calls": calls,
+        "llm_calls_per_resume": round(calls / resumes, 3) if resumes else 0.0,
+        "rate_limited": after["rate_limited"] - before["rate_limited"],
+    }
+
+
+# --- Scenarios ---
+async def bench_extraction_mode(corpus, mode: str) -> Dict[str, Any]:
+    from services.ocr import extract_text_from_pdf_async
+    from services.tokens import estimate_tokens
+
+    by_pages: Dict[int, List[float]] = {}
+    latencies = []
+    tokens = []
+    for _, pages, pdf in corpus:
+        start = time.perf_counter()
+        text = await extract_text_from_pdf_async(pdf, mode=mode)
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        tokens.append(estimate_tokens(text))
+        by_pages.setdefault(pages, []).append(elapsed)
+    return {
+        "documents": len(corpus),
+        **latency_summary(latencies),
+        "mean_ms_by_pages": {
+            str(pages): round(float(np.mean(values)) * 1000, 2)
+            for pages, values in sorted(by_pages.items())
+        },
+        "tokens_total": sum(tokens),
+        "tokens_mean": round(float(np.mean(tokens)), 1) if tokens else 0.0,
+    }
+
+
+async def bench_extraction(corpus) -> Dict[str, Any]:
+    """Plain mode at the top level (as before), compact mode next to it."""
+    from services.ocr import COMPACT, PLAIN
+
+    plain = await bench_extraction_mode(corpus, PLAIN)
+    compact = await bench_extraction_mode(corpus, COMPACT)
+    saved = plain["tokens_total"] - compact["tokens_total"]
+    return {
+        **plain,
+        "compact": compact,
+        "compact_token_reduction": (
+            round(saved / plain["tokens_total"], 4) if plain["tokens_total"] else 0.0
+        ),
+        **peak_rss_mb(),
+    }
+
+
+async def bench_graph(texts, jd, stub, levels) -> Dict[str, Any]:
+    from services.ai import final_tier, get_judge_engine, initial_graph_state
+    from services.scheduler import reset_llm_scheduler
+
+    app = get_judge_engine().get_app()
+    tiers: Dict[str, int] = {}
+
+    async def call(text):
+        state = initial_graph_state(text, jd.normalized_text, jd.requirements)
+        final = await app.ainvoke(state)
+        tier = final_tier(final) or "none"
+        tiers[tier] = tiers.get(tier, 0) + 1
+        return bool(final.get("reviewer_output"))
+
+    results = {}
+    for level in levels:
+        reset_llm_scheduler()  # Each level starts with an empty token window
+        before = dict(stub.llm.stats)
+        tiers.clear()
+        result = await drive(call, texts, level)
+        results[str(level)] = {
+            **result,
+            **llm_counters(stub, len(texts), before),
+            "result_tiers": dict(tiers),
+            **peak_rss_mb(),
+        }
+        print(f"  graph c={level}: {results[str(level)]['p95_ms']} ms p95")
+    return results
+
+
+async def bench_api(corpus, stub, levels) -> Dict[str, Any]:
+    import httpx
+
+    from main import app
+    from services.scheduler import reset_llm_scheduler
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+
+        async def call(item):
+            name, _, pdf = item
+            response = await client.post(
+                "/evaluate",
+                params={"cache": "false"},
+                files={"file": (name, pdf, "application/pdf")},
+            )
+            lines = [line for line in response.text.splitlines() if line]
+            return bool(lines) and json.loads(lines[-1])["status"] == "completed"
+
+        results = {}
+        for level in levels:
+            reset_llm_scheduler()
+            before = dict(stub.llm.stats)
+            result = await drive(call, corpus, level)
+            results[str(level)] = {
+                **result,
+                **llm_counters(stub, len(corpus), before),
+                **peak_rss_mb(),
+            }
+            print(f"  api c={level}: {results[str(level)]['p95_ms']} ms p95")
+    return results
+
+
+def tail_change(serial: Dict[str, Any], speculative: Dict[str, Any]):
+    """Relative change of p50/p95/p99 and LLM calls, per concurrency level."""
+    change = {}
+    for level, current in speculative.items():
+        previous = serial.get(level) or {}
+        change[level] = {
+            metric: round(current[metric] / previous[metric] - 1, 4)
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "llm_calls_per_resume")
+            if previous.get(metric)
+        }
+    return change
+
+
+@contextmanager
+def env_override(name: str, value: str):
+    saved = os.environ.get(name)
+    os.environ[name] = value
+    try:
+        yield
+    finally:
+        if saved is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = saved
+
+
+# --- Regression checks ---
+def lookup(report: Dict[str, Any], path: str) -> Optional[float]:
+    node: Any = report
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node if isinstance(node, (int, float)) else None
+
+
+def check_thresholds(report, thresholds: Dict[str, Dict[str, float]]) -> List[str]:
+    """Thresholds map a report path (e.g. "api.4.p95_ms") to {"max"/"min"}."""
+    violations = []
+    for path, bounds in thresholds.items():
+        value = lookup(report, path)
+        if value is None:
+            continue
+        if "max" in bounds and value > bounds["max"]:
+            violations.append(f"{path} = {value} > max {bounds['max']}")
+        if "min" in bounds and value < bounds["min"]:
+            violations.append(f"{path} = {value} < min {bounds['min']}")
+    return violations
+
+
+def check_baseline(report, baseline, tolerance: float) -> List[str]:
+    """Flags latencies that grew, or throughput that fell, beyond tolerance."""
+    violations = []
+    for scenario in ("graph", "api"):
+        for level, current in report.get(scenario, {}).items():
+            previous = baseline.get(scenario, {}).get(level)
+            if not previous:
+                continue
+            for metric in ("p95_ms", "p99_ms"):
+                if previous[metric] and current[metric] > previous[metric] * (
+                    1 + tolerance
+                ):
+                    violations.append(
+                        f"{scenario}.{level}.{metric} = {current[metric]} "
+                        f"(baseline {previous[metric]})"
+                    )
+            if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+                violations.append(
+                    f"{scenario}.{level}.throughput_rps = {current['throughput_rps']} "
+                    f"(baseline {previous['throughput_rps']})"
+                )
+    return violations
+
+
+# --- Runner ---
+def stub_overrides(stub: StubServer, workdir: str) -> Dict[str, str]:
+    """Environment that points the app at the stub, with no result cache."""
+    return {
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": stub.base_url,
+        "RESULT_CACHE_ENABLED": "false",
+        "JD_REGISTRY_DB": os.path.join(workdir, "jd_registry.db"),
+        "LLM_BACKOFF_BASE": os.environ.get("LLM_BACKOFF_BASE", "0.05"),
+        "LLM_BACKOFF_MAX": os.environ.get("LLM_BACKOFF_MAX", "1"),
+    }
+
+
+@contextmanager
+def bench_environment(stub: StubServer, workdir: str):
+    """Points the app at the stub for the run, then restores the environment."""
+    overrides = stub_overrides(stub, workdir)
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        # Singletons built against the stub must not outlive the run.
+        from services.ai import reset_judge_engine
+        from services.jd_registry import reset_jd_registry
+        from services.scheduler import reset_llm_scheduler
+
+        reset_judge_engine()
+        reset_jd_registry()
+        reset_llm_scheduler()
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    levels = [int(c) for c in args.concurrency.split(",")]
+    scenarios = set(args.scenarios.split(","))
+    config = StubConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_ratio=args.rate_limit_ratio,
+        pass_ratio=args.pass_ratio,
+        seed=args.seed,
+        model_latency=parse_model_latency(args.model_latency),
+    )
+    corpus = build_corpus(args.corpus_size, seed=args.seed)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus_size": len(corpus),
+            "corpus_pages": sum(pages for _, pages, _ in corpus),
+            "concurrency": levels,
+            "stub": asdict(config),
+            "model_routing": model_routing_meta(),
+        }
+    }
+
+    with StubServer(
+        config
+    ) as stub, tempfile.TemporaryDirectory() as workdir, bench_environment(
+        stub, workdir
+    ):
+        from services.jd_registry import get_jd_registry
+        from services.ocr import extract_text_from_pdf_async, shutdown_extraction_pool
+
+        jd = get_jd_registry().register(BENCH_JD)
+        try:
+            if "extraction" in scenarios:
+                print("Extraction...")
+                report["extraction"] = await bench_extraction(corpus)
+            if "graph" in scenarios:
+                print("Graph...")
+                texts = [await extract_text_from_pdf_async(pdf) for _, _, pdf in corpus]
+                report["graph"] = await bench_graph(texts, jd, stub, levels)
+                if args.speculative_drafts > 1:
+                    print(f"Graph, {args.speculative_drafts} speculative drafts...")
+                    drafts = str(args.speculative_drafts)
+                    with env_override("SPECULATIVE_DRAFTS", drafts):
+                        speculative = await bench_graph(texts, jd, stub, levels)
+                    report["graph_speculative"] = speculative
+                    report["speculative_change"] = tail_change(
+                        report["graph"], speculative
+                    )
+            if "api" in scenarios:
+                print("POST /evaluate...")
+                report["api"] = await bench_api(corpus, stub, levels)
+        finally:
+            shutdown_extraction_pool()
+        report["stub_totals"] = {**stub.llm.stats, "by_model": stub.llm.model_stats}
+    return report
+
+
+def parse_model_latency(value: str) -> Dict[str, float]:
+    """ "fast-model=0.05,strong-model=0.4" -> {model: seconds}."""
+    latencies = {}
+    for item in filter(None, value.split(",")):
+        model, _, seconds = item.partition("=")
+        latencies[model.strip()] = float(seconds)
+    return latencies
+
+
+def model_routing_meta() -> Dict[str, Any]:
+    from services.ai import get_model_name
+    from services.routing import get_model_routing
+
+    routing = get_model_routing(get_model_name())
+    return {**asdict(routing), "cascade_enabled": routing.cascade_enabled}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus-size", type=int, default=20)
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--scenarios", default="extraction,graph,api")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--pass-ratio", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--speculative-drafts",
+        type=int,
+        default=0,
+        help="Also run the graph with this many parallel Reviewer drafts",
+    )
+    parser.add_argument(
+        "--model-latency",
+        default="",
+        help="Per-model stub latency, e.g. gpt-4o-mini=0.1,gpt-4o=0.4",
+    )
+    parser.add_argument("--output", default="bench-report.json")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+
+    violations = []
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds) as f:
+            violations += check_thresholds(report, json.load(f))
+    if args.baseline:
+        with open(args.baseline) as f:
+            violations += check_baseline(report, json.load(f), args.tolerance)
+    report["regressions"] = violations
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Report written to {args.output}")
+    for violation in violations:
+        print(f"  REGRESSION {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
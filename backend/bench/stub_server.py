@@ -0,0 +1,251 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from services.tokens import estimate_tokens
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.2  # Seconds before the first token
+    tokens_per_second: float = 200.0  # Completion speed after the first token
+    rate_limit_ratio: float = 0.0  # Share of requests answered with a 429
+    retry_after_ms: int = 100  # Retry-After sent with injected 429s
+    pass_ratio: float = 0.8  # Share of Auditor calls that return PASS
+    seed: int = 7
+    # Per-model latency overrides, to compare cascade tiers
+    model_latency: Dict[str, float] = field(default_factory=dict)
+
+    def latency_for(self, model: str) -> float:
+        return self.model_latency.get(model, self.latency)
+
+
+REVIEWER_TEMPLATE = """0. **Candidate Metadata**:
+   - Name: {name}
+   - Email: {email}
+1. Score (0-10): {score}
+2. Analysis:
+   - **จุดแข็ง (Strengths):** มีประสบการณ์ Python และ FastAPI ที่ชัดเจน พร้อมหลักฐานในโปรเจกต์ที่ผ่านมา
+   - **ทักษะที่นำมาปรับใช้ได้ (Transferable Skills):** Flask ใกล้เคียงกับ FastAPI
+   - **สิ่งที่ต้องพัฒนา (Gaps & Growth Areas):** ยังขาดประสบการณ์ Kubernetes ในระดับ production"""
+
+
+class StubLLM:
+    """The fake model behind the stub: picks replies and keeps counters."""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {
+                "requests": 0,
+                "reviewer_calls": 0,
+                "auditor_calls": 0,
+                "rate_limited": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+            }
+            self.model_stats: Dict[str, Dict[str, int]] = {}
+
+    def _random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def should_rate_limit(self) -> bool:
+        limited = self._random() < self.config.rate_limit_ratio
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["rate_limited"] += int(limited)
+        return limited
+
+    def reply(self, body: Dict[str, Any]) -> tuple:
+        """Returns (content, prompt_tokens, completion_tokens)."""
+        messages: List[Dict[str, Any]] = body.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        is_auditor = "HR Auditor" in prompt
+
+        if is_auditor:
+            if self._random() < self.config.pass_ratio:
+                content = "PASS"
+            else:
+                content = "FAIL: คะแนนสูงเกินไปเมื่อเทียบกับหลักฐานใน Resume"
+        else:
+            score = 2 + int(self._random() * 7)
+            fields = {
+                "name": "Somchai Jaidee",
+                "email": "somchai@example.com",
+                "score": score,
+            }
+            response_format = body.get("response_format") or {}
+            if response_format.get("type") == "json_schema":
+                content = json.dumps(
+                    {
+                        **fields,
+                        "strengths": "มีประสบการณ์ Python และ FastAPI",
+                        "transferable_skills": "Flask ใกล้เคียงกับ FastAPI",
+                        "gaps": "ยังขาดประสบการณ์ Kubernetes",
+                    },
+                    ensure_ascii=False,
+                )
+            else:
+                content = REVIEWER_TEMPLATE.format(**fields)
+
+        prompt_tokens = estimate_tokens(prompt) + 4 * len(messages)
+        completion_tokens = estimate_tokens(content)
+        model = body.get("model", "stub")
+        with self._lock:
+            key = "auditor_calls" if is_auditor else "reviewer_calls"
+            self.stats[key] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+            per_model = self.model_stats.setdefault(
+                model, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            )
+            per_model["calls"] += 1
+            per_model["prompt_tokens"] += prompt_tokens
+            per_model["completion_tokens"] += completion_tokens
+        return content, prompt_tokens, completion_tokens
+
+
+def _pieces(content: str, size: int = 8) -> List[str]:
+    return [content[i : i + size] for i in range(0, len(content), size)]
+
+
+def create_stub_app(llm: StubLLM) -> FastAPI:
+    app = FastAPI(title="OpenAI-compatible stub")
+
+    @app.get("/stub/stats")
+    def stub_stats():
+        return {
+            **llm.stats,
+            "by_model": llm.model_stats,
+            "config": asdict(llm.config),
+        }
+
+    @app.post("/stub/reset")
+    def stub_reset():
+        llm.reset()
+        return {"ok": True}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        config = llm.config
+        if llm.should_rate_limit():
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after-ms": str(config.retry_after_ms)},
+                content={
+                    "error": {
+                        "message": "Rate limit reached (stub)",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+            )
+
+        content, prompt_tokens, completion_tokens = llm.reply(body)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        created = int(time.time())
+        base = {"id": f"chatcmpl-stub-{time.monotonic_ns()}", "created": created}
+        model = body.get("model", "stub")
+        generation_time = completion_tokens / max(config.tokens_per_second, 1e-6)
+        latency = config.latency_for(model)
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency + generation_time)
+            return {
+                **base,
+                "object": "chat.completion",
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+
+        pieces = _pieces(content)
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def chunk(delta, finish_reason=None, **extra):
+            choice = {"index": 0, "delta": delta, "finish_reason": finish_reason}
+            data = {
+                **base,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [choice],
+                **extra,
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            await asyncio.sleep(latency)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                await asyncio.sleep(generation_time / len(pieces))
+                yield chunk({"content": piece})
+            yield chunk({}, "stop")
+            if include_usage:
+                data = {
+                    **base,
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(data)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+class StubServer:
+    """Runs the stub on a free local port in a background thread."""
+
+    def __init__(self, config: StubConfig):
+        self.llm = StubLLM(config)
+        self._server = uvicorn.Server(
+            uvicorn.Config(
+                create_stub_app(self.llm),
+                host="127.0.0.1",
+                port=0,
+                log_level="warning",
+                access_log=False,
+            )
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self.base_url = ""
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
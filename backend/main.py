@@ -2,26 +2,252 @@ import os
 import uuid
 import json
 import io
-from typing import List, Optional
-from fastapi import FastAPI, Depends, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional
+from fastapi import FastAPI, Depends, File, UploadFile, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
 
-from services.ocr import extract_text_from_pdf
-from services.ai import evaluate_resume
+# Heavy modules (services.ai with LangChain/LangGraph, PyMuPDF, numpy) are
+# imported where they are first needed, so a cold instance answers health
+# checks without loading them. WARMUP_ON_STARTUP loads them in the background.
+from services.ocr import (
+    PDFBuffer,
+    PDFLimitError,
+    check_pdf_size,
+    extract_text_from_pdf_async,
+    get_max_batch_bytes,
+    get_max_pdf_bytes,
+    get_extract_mode,
+    get_upload_chunk_bytes,
+    shutdown_extraction_pool,
+)
+from services.admission import (
+    AdmissionFull,
+    admitted,
+    client_key,
+    get_admission_controller,
+    waiting_event,
+)
+from services.cache import (
+    evaluation_cache_key,
+    get_result_cache,
+    result_cache_enabled,
+)
+from services.config import env_int
+from services.tokens import estimate_tokens
+from services.jd_registry import get_jd_registry
+from services.jobs import JobQueueFull, get_job_manager
+from services.scheduler import get_llm_scheduler
+from services.parsing import parse_snapshot
+from services.routing import record_result_tier, routing_snapshot
+from services.telemetry import RequestTrace, render_metrics
+from services.validator import validator_snapshot
+from services.warmup import start_warmup, warmup_enabled, warmup_snapshot
+
+load_dotenv()
 
 from pathlib import Path
 
-# --- IN-MEMORY STORAGE ---
-# Since Serverless (Vercel/Render) is Read-Only, we cannot write to disk.
-# We use a global variable to store the JD temporarily.
-# This resets when the server instance recycles, which is acceptable for this use case.
-GLOBAL_JOB_DESCRIPTION = ""
+# --- JOB DESCRIPTION STORAGE ---
+# JDs live in a small SQLite registry in the instance's temp dir (writable even
+# on serverless), so every uvicorn worker sees the same JDs. Each JD has an id;
+# the most recently posted one is the default for /evaluate.
+
 
-app = FastAPI(title="Skrut AI")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = start_warmup() if warmup_enabled() else None
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    get_job_manager().shutdown()
+    shutdown_extraction_pool()
+
+
+app = FastAPI(title="Skrut AI", lifespan=lifespan)
 
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
+
+# Room for the multipart boundaries and headers around one uploaded file.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+SINGLE_UPLOAD_PATHS = ("/evaluate", "/jobs")
+BATCH_UPLOAD_PATH = "/evaluate/batch"
+
+
+def upload_too_large(limit: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=413,
+        content={
+            "code": "max_bytes",
+            "detail": f"Upload is too large. Maximum is {limit // 1024} KB.",
+        },
+    )
+
+
+class UploadSizeLimit:
+    """
+    Answers 413 before the body is read when a single-file upload already
+    declares a Content-Length over MAX_PDF_BYTES. Uploads without one are
+    still cut off while being read (read_upload).
+
+    A batch is capped as a whole at MAX_BATCH_BYTES: by its Content-Length
+    when declared, otherwise by counting the body as it arrives. Past the
+    cap it is answered 413 and the rest of the body is never read.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not (scope["type"] == "http" and scope["method"] == "POST"):
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] in SINGLE_UPLOAD_PATHS:
+            limit = get_max_pdf_bytes()
+            body_limit = limit + MULTIPART_OVERHEAD_BYTES
+        elif scope["path"] == BATCH_UPLOAD_PATH:
+            limit = body_limit = get_max_batch_bytes()
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        length = Headers(scope=scope).get("content-length", "")
+        if length.isdigit() and int(length) > body_limit:
+            await upload_too_large(limit)(scope, receive, send)
+            return
+        if scope["path"] != BATCH_UPLOAD_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def counted_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > body_limit:
+                    # The app sees a client that went away; the 413 is ours.
+                    rejected = True
+                    await upload_too_large(limit)(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
 
+        await self.app(scope, counted_receive, guarded_send)
+
+
+ADMITTED_PATHS = ("/evaluate", "/evaluate/batch", "/jobs")
+
+
+class AdmissionControl:
+    """
+    Sheds load before any upload is read: a POST to an evaluation path is
+    answered 503 with Retry-After when every slot is busy and the wait queue
+    is full. A POST /evaluate then holds one slot for as long as its response
+    streams, and reads nothing from the request until the slot is granted.
+    Batch items and jobs take their slots per evaluation (`admitted`).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        controller = get_admission_controller()
+        if not (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"] in ADMITTED_PATHS
+            and controller.enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        ticket = None
+        try:
+            if scope["path"] == "/evaluate":
+                ticket = controller.reserve(client_key(scope))
+            else:
+                controller.check_room()
+        except AdmissionFull as e:
+            response = JSONResponse(
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)},
+                content={"code": "overloaded", "detail": str(e)},
+            )
+            await response(scope, receive, send)
+            return
+        if ticket is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            if not ticket.granted:
+                send = await self._stream_wait(ticket, send)
+            await self.app(scope, receive, send)
+        finally:
+            ticket.release()
+
+    @staticmethod
+    async def _stream_wait(ticket, send):
+        """
+        Starts the NDJSON response with `progress` events carrying the queue
+        position, and returns a `send` that continues it with the app's own
+        response once the slot is granted. An error response from the app
+        (413, 422, ...) becomes a final `error` event.
+        """
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/x-ndjson")],
+            }
+        )
+        async for position in ticket.wait():
+            line = to_ndjson(waiting_event(position)).encode()
+            await send({"type": "http.response.body", "body": line, "more_body": True})
+
+        status = 200
+        error = bytearray()
+
+        async def forward(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif status == 200:
+                await send(message)
+            else:
+                error.extend(message.get("body", b""))
+                if message.get("more_body"):
+                    return
+                try:
+                    body = json.loads(error)
+                except ValueError:
+                    body = None
+                body = body if isinstance(body, dict) else {}
+                event = {
+                    "status": "error",
+                    "code": body.get("code", status),
+                    "message": str(body.get("detail", "Request failed.")),
+                }
+                line = to_ndjson(event).encode()
+                await send({"type": "http.response.body", "body": line})
+
+        return forward
+
+
+app.add_middleware(AdmissionControl)
+app.add_middleware(UploadSizeLimit)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -54,122 +280,905 @@ def read_root():
     }
 
 
+@app.get("/stats")
+def get_stats():
+    from services.artifacts import get_artifact_cache
+    from services.dedup import get_duplicate_index
+
+    return {
+        "result_cache": get_result_cache().snapshot(),
+        "llm_scheduler": get_llm_scheduler().snapshot(),
+        "review_validator": validator_snapshot(),
+        "reviewer_parsing": parse_snapshot(),
+        "model_routing": routing_snapshot(),
+        "jobs": get_job_manager().snapshot(),
+        "warmup": warmup_snapshot(),
+        "admission": get_admission_controller().snapshot(),
+        "duplicates": get_duplicate_index().snapshot(),
+        "artifact_cache": get_artifact_cache().snapshot(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus scrape endpoint: stage histograms, token and retry counters."""
+    scheduler = get_llm_scheduler().snapshot()
+    from services.artifacts import get_artifact_cache
+
+    cache = get_result_cache().snapshot()
+    artifacts = get_artifact_cache().snapshot()
+    admission = get_admission_controller().snapshot()
+    gauges = {
+        "skrut_evaluations_active": (
+            "Evaluations holding an admission slot.",
+            admission["active"],
+        ),
+        "skrut_evaluations_waiting": (
+            "Evaluations waiting for an admission slot.",
+            admission["waiting"],
+        ),
+        "skrut_llm_queue_depth": (
+            "LLM calls waiting for rate-limit budget.",
+            scheduler["queue_depth"],
+        ),
+        "skrut_llm_window_tokens": (
+            "Tokens used in the current rate-limit window.",
+            scheduler["window_tokens"],
+        ),
+        "skrut_result_cache_entries": ("Cached evaluations.", cache["entries"]),
+        "skrut_result_cache_bytes": (
+            "Memory used by cached evaluations.",
+            cache["bytes"],
+        ),
+        "skrut_artifact_cache_bytes": (
+            "Memory used by cached extracted resumes.",
+            artifacts["bytes"],
+        ),
+    }
+    return PlainTextResponse(
+        render_metrics(gauges), media_type="text/plain; version=0.0.4"
+    )
+
+
 @app.get("/job-description")
 def get_job_description():
-    return {"content": GLOBAL_JOB_DESCRIPTION}
+    current = get_jd_registry().current()
+    if current is None:
+        return {"content": "", "jd_id": None}
+    return {"content": current.content, "jd_id": current.jd_id}
 
 
 @app.post("/job-description")
 def update_job_description(content: str):
-    global GLOBAL_JOB_DESCRIPTION
-    GLOBAL_JOB_DESCRIPTION = content
-    return {"message": "Job description updated (In-Memory)"}
+    profile = get_jd_registry().register(content)
+    return {
+        "message": "Job description registered",
+        "jd_id": profile.jd_id,
+        "token_count": profile.token_count,
+        "requirements": profile.requirements,
+    }
 
 
-@app.post("/evaluate")
-async def evaluate_resume_endpoint(file: UploadFile = File(...)):
-    # Read file into memory immediately
-    file_bytes = await file.read()
-    file_name = file.filename
+@app.get("/job-descriptions")
+def list_job_descriptions(limit: int = 50):
+    return {
+        "job_descriptions": [
+            {
+                "jd_id": p.jd_id,
+                "title": p.normalized_text.split("\n", 1)[0],
+                "token_count": p.token_count,
+                "created_at": p.created_at,
+            }
+            for p in get_jd_registry().list(limit)
+        ]
+    }
 
-    async def event_generator():
+
+@app.get("/job-descriptions/{jd_id}")
+def get_job_description_by_id(jd_id: str):
+    profile = get_jd_registry().get(jd_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Job description not found")
+    return profile.model_dump()
+
+
+# --- Evaluation Pipeline ---
+class ResumeEvaluation:
+    """
+    One resume's trip through the pipeline, in two stages: `prepare` (JD,
+    cache lookup, text extraction) and `judge` (pre-screen + judge graph).
+    Both yield the NDJSON event dicts (progress / completed / error) that
+    /evaluate and /evaluate/batch stream to the client. Batches run
+    `prepare` for every file first so the pre-screen scores them at once.
+    """
+
+    def __init__(
+        self,
+        file_bytes: PDFBuffer,
+        file_name: str,
+        use_cache: bool = True,
+        jd_id: Optional[str] = None,
+        jd=None,
+        stream_tokens: bool = False,
+        trace: Optional[RequestTrace] = None,
+        deadline: Optional[float] = None,
+        upload_error: Optional[PDFLimitError] = None,
+    ):
+        # The evaluation owns the upload and drops it right after extraction,
+        # so memory follows active extractions, not active evaluations.
+        self.file_bytes = file_bytes
+        self.upload_error = upload_error
+        self.file_name = file_name
+        self.use_cache = use_cache
+        self.jd_id = jd_id
+        self.jd = jd
+        self.stream_tokens = stream_tokens
+        self.cache_key = None
+        self.resume_text = ""
+        self.artifacts = None  # JD-independent text features (artifact cache)
+        self.prescreen = None  # Precomputed by batches, otherwise by the graph
+        # Near-duplicate check: the earlier copy this one waits for, or this
+        # one's own index entry while it is the copy being evaluated.
+        self.duplicate = None
+        self.duplicate_entry = None
+        self.duplicate_scope = None
+        self.fingerprint = None
+        self.finished = False  # Set once a completed/error event was yielded
+        self.trace = trace or RequestTrace()  # Per-stage timings of this request
+        # Time budget in seconds (None = EVALUATION_DEADLINE); the clock
+        # starts when the work starts.
+        self.deadline_seconds = deadline
+        self.deadline = None  # time.monotonic() by which to finish
+
+    def _time_left(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def _cancelled(self):
+        # The client went away (or the batch/job was stopped): the graph and
+        # any in-flight LLM call were cancelled with this task.
+        print(f"  > Evaluation of {self.file_name} cancelled (client disconnected).")
+        self.finished = True
+        self._settle_duplicate_entry(None)
+        self.trace.finish("cancelled")
+
+    def _settle_duplicate_entry(self, event: Optional[dict]):
+        """Hands this copy's result to its near-duplicates, or lets them go."""
+        if self.duplicate_entry is None:
+            return
+        from services.dedup import get_duplicate_index
+
+        entry, self.duplicate_entry = self.duplicate_entry, None
+        if (
+            event is not None
+            and event["status"] == "completed"
+            and not event.get("deadline_exceeded")
+        ):
+            # Copies read the result back from the result cache.
+            get_duplicate_index().complete(entry, self.cache_key, event.get("score"))
+        else:
+            get_duplicate_index().abandon(entry)
+
+    def _find_duplicate(self):
+        """An earlier copy of this resume, or None once this one is indexed."""
+        from services.dedup import get_duplicate_index
+
+        match, self.duplicate_entry = get_duplicate_index().find_or_add(
+            self.duplicate_scope, self.fingerprint, self.file_name
+        )
+        return match
+
+    def _finish(self, event: dict, outcome: Optional[str] = None) -> dict:
+        """Marks the evaluation done; a completed event gets its timing summary."""
+        self.finished = True
+        self._settle_duplicate_entry(event)
+        if outcome is None:
+            outcome = "cached" if event.get("cached") else event["status"]
+        self.trace.finish(outcome)
+        if event["status"] != "completed":
+            return event
+        return {**event, "timings": self.trace.summary()}
+
+    async def prepare(self):
+        if self.deadline_seconds is None:
+            from services.ai import get_evaluation_deadline
+
+            self.deadline_seconds = get_evaluation_deadline()
+        if self.deadline_seconds and self.deadline_seconds > 0:
+            self.deadline = time.monotonic() + self.deadline_seconds
         try:
             # 1. Start
-            yield json.dumps(
-                {"status": "progress", "message": f"Processing {file_name}..."}
-            ) + "\n"
+            yield {"status": "progress", "message": f"Processing {self.file_name}..."}
+            if self.upload_error is not None:
+                e = self.upload_error
+                yield self._finish(
+                    {"status": "error", "code": e.code, "message": str(e)}
+                )
+                return
 
-            # 2. Extract Text (In-Memory)
-            yield json.dumps(
-                {"status": "progress", "message": "Extracting text (Memory Mode)..."}
-            ) + "\n"
+            # 2. Get Job Description (processed once at registration)
+            if self.jd is None:
+                self.jd = await asyncio.to_thread(get_jd_registry().resolve, self.jd_id)
+            if self.jd is None:
+                message = (
+                    f"Job description {self.jd_id} not found."
+                    if self.jd_id
+                    else "Job description not set."
+                )
+                yield self._finish({"status": "error", "message": message})
+                return
+
+            # Same PDF + JD + model + prompt version -> reuse the earlier result
+            if self.use_cache and result_cache_enabled():
+                from services.ai import model_signature, pipeline_version
 
-            resume_text = extract_text_from_pdf(file_bytes)
+                self.cache_key = evaluation_cache_key(
+                    self.file_bytes,
+                    self.jd.normalized_text,
+                    model_signature(),
+                    pipeline_version(),
+                )
+                with self.trace.span("cache_lookup") as span:
+                    cached = await get_result_cache().aget(self.cache_key)
+                    span["hit"] = cached is not None
+                if cached is not None:
+                    yield {
+                        "status": "progress",
+                        "message": "Found a cached evaluation.",
+                    }
+                    yield self._finish({**cached, "cached": True})
+                    return
 
-            if not resume_text or len(resume_text.strip()) == 0:
-                yield json.dumps(
+            # 3. Extract Text (In-Memory), unless this PDF was extracted before
+            from services.artifacts import (
+                artifact_cache_enabled,
+                artifact_key,
+                build_artifacts,
+                complete_artifacts,
+                get_artifact_cache,
+            )
+            from services.dedup import get_duplicate_mode
+            from services.prescreen import get_prescreen_mode
+
+            mode = get_extract_mode()
+            # Term counts and signatures only for the features that use them.
+            features = {
+                "counts": get_prescreen_mode() != "off",
+                "signature": get_duplicate_mode() != "off",
+            }
+            artifacts_key = None
+            # Like results, nothing is kept with ?cache=false or the cache off.
+            if self.use_cache and result_cache_enabled() and artifact_cache_enabled():
+                artifacts_key = artifact_key(self.file_bytes, mode)
+                cached_artifacts = get_artifact_cache().get(artifacts_key)
+                if cached_artifacts is not None:
+                    self.artifacts = complete_artifacts(cached_artifacts, **features)
+                    if self.artifacts is not cached_artifacts:
+                        get_artifact_cache().put(artifacts_key, self.artifacts)
+
+            if self.artifacts is not None:
+                yield {"status": "progress", "message": "Reusing extracted text..."}
+                with self.trace.span(
+                    "extraction", bytes=len(self.file_bytes), mode=mode, cached=True
+                ) as span:
+                    self.resume_text = self.artifacts.text
+                    span["chars"] = len(self.resume_text)
+                    span["tokens"] = self.artifacts.token_count
+            else:
+                yield {
+                    "status": "progress",
+                    "message": "Extracting text (Memory Mode)...",
+                }
+                try:
+                    with self.trace.span(
+                        "extraction", bytes=len(self.file_bytes), mode=mode
+                    ) as span:
+                        self.resume_text = await extract_text_from_pdf_async(
+                            self.file_bytes, timeout=self._time_left(), mode=mode
+                        )
+                        span["chars"] = len(self.resume_text)
+                        span["tokens"] = estimate_tokens(self.resume_text)
+                        if artifacts_key is not None and self.resume_text.strip():
+                            self.artifacts = build_artifacts(
+                                self.resume_text, **features
+                            )
+                            get_artifact_cache().put(artifacts_key, self.artifacts)
+                except PDFLimitError as e:
+                    yield self._finish(
+                        {"status": "error", "code": e.code, "message": str(e)}
+                    )
+                    return
+
+            if not self.resume_text or len(self.resume_text.strip()) == 0:
+                yield self._finish(
                     {
                         "status": "error",
                         "message": "Could not extract text. System supports DIGITAL PDFS only (no scans/images).",
                     }
-                ) + "\n"
+                )
                 return
 
-            # 3. Get Job Description
-            if not GLOBAL_JOB_DESCRIPTION:
-                yield json.dumps(
-                    {"status": "error", "message": "Job description not set."}
-                ) + "\n"
-                return
+            # Same or nearly the same resume seen for this JD -> no LLM call.
+            # Results are shared through the result cache, so no cache, no check.
+            from services.dedup import fingerprint
 
-            jd_text = GLOBAL_JOB_DESCRIPTION
+            mode = get_duplicate_mode()
+            if self.cache_key is not None and mode != "off":
+                from services.ai import model_signature, pipeline_version
 
+                with self.trace.span("dedup", mode=mode) as span:
+                    self.fingerprint = (
+                        self.artifacts and self.artifacts.fingerprint
+                    ) or fingerprint(self.resume_text)
+                    self.duplicate_scope = (
+                        f"{self.jd.jd_id}|{model_signature()}|{pipeline_version()}"
+                    )
+                    match = self._find_duplicate()
+                    span["duplicate"] = match is not None
+                if match is not None and mode == "flag":
+                    yield self._flag_duplicate(match)
+                    return
+                self.duplicate = match
+
+        except asyncio.CancelledError:
+            self._cancelled()
+            raise
+        except Exception as e:
+            print(f"Error: {e}")
+            yield self._finish({"status": "error", "message": str(e)})
+        finally:
+            # Only the text is needed from here on.
+            self.file_bytes = None
+
+    def _flag_duplicate(self, match) -> dict:
+        from services.dedup import get_duplicate_index
+
+        get_duplicate_index().record_skip("flag")
+        original = match.entry.file_name
+        message = (
+            f"Same resume as {original}; not evaluated again."
+            if match.exact
+            else f"Near-duplicate of {original} "
+            f"({match.similarity:.0%} similar); not evaluated again."
+        )
+        return self._finish(
+            {
+                "status": "error",
+                "code": "duplicate",
+                "message": message,
+                "jd_id": self.jd.jd_id,
+                "duplicate": match.describe(),
+            },
+            outcome="duplicate",
+        )
+
+    async def reuse_duplicate(self):
+        """
+        Answers a near-duplicate with its original's evaluation once that
+        completes. If the original fails, this copy is evaluated itself.
+        Runs between `prepare` and `judge`, outside any concurrency slot.
+        """
+        from services.dedup import get_duplicate_index, same_candidate
+
+        try:
+            while self.duplicate is not None:
+                match, self.duplicate = self.duplicate, None
+                if not match.entry.settled:
+                    yield {
+                        "status": "progress",
+                        "message": f"Waiting for the evaluation of "
+                        f"{match.entry.file_name} (near-duplicate)...",
+                        "duplicate": match.describe(),
+                    }
+                with self.trace.span("duplicate_wait") as span:
+                    original_key = await match.entry.wait(self._time_left())
+                    original = None
+                    if original_key is not None:
+                        original = await get_result_cache().aget(original_key)
+                        if original is None:
+                            # Evicted or expired: the entry can answer no one.
+                            get_duplicate_index().forget(match.entry)
+                    if original is not None and not same_candidate(
+                        original, self.resume_text
+                    ):
+                        # Same text, another person: evaluated on its own.
+                        get_duplicate_index().record_other_candidate()
+                        span["other_candidate"] = True
+                        return
+                    span["reused"] = original is not None
+                if original is not None:
+                    get_duplicate_index().record_skip("reuse")
+                    result = {**original, "duplicate": match.describe()}
+                    await get_result_cache().aput(self.cache_key, result)
+                    yield self._finish({**result, "cached": True}, outcome="duplicate")
+                    return
+                if match.entry.settled:
+                    # The original failed: take its place, or follow another copy.
+                    self.duplicate = self._find_duplicate()
+        except asyncio.CancelledError:
+            self._cancelled()
+            raise
+
+    async def judge(self):
+        try:
             # 4. AI Agent Analysis (Streaming Graph)
-            yield json.dumps(
-                {"status": "progress", "message": "AI Agents are thinking..."}
-            ) + "\n"
-
-            from services.ai import ResumeJudgeGraph
-
-            judge_graph = ResumeJudgeGraph()
-            graph_app = judge_graph.build_graph()
-
-            initial_state = {
-                "resume_text": resume_text,
-                "job_description": jd_text,
-                "reviewer_output": "",
-                "feedback_history": [],
-                "conversation_history": [],
-                "retry_count": 0,
-                "temp_status": "START",
-                "status_message": "Starting Multi-Agent Analysis...",
-            }
+            yield {"status": "progress", "message": "AI Agents are thinking..."}
+
+            from services.ai import get_judge_engine, initial_graph_state
+            from services.prescreen import get_prescreen_mode
+
+            if self.prescreen is None and get_prescreen_mode() != "off":
+                # Scored from the cached term counts when there are some.
+                prescreen_batch([self])
+            graph_app = get_judge_engine().get_app()
 
-            # Run the graph and stream node updates
+            initial_state = initial_graph_state(
+                self.resume_text,
+                self.jd.normalized_text,
+                self.jd.requirements,
+                self.prescreen,
+                self.deadline,
+            )
+
+            # Run the graph and stream node updates. With stream_tokens the
+            # Reviewer's tokens are forwarded as `delta` events too, and a
+            # rejected attempt is followed by a `discard` event.
+            modes = ["updates", "messages"] if self.stream_tokens else ["updates"]
             final_state_data = {}
-            async for output in graph_app.astream(initial_state):
+            flag = {}
+            attempt = 1  # Reviewer attempt currently being generated
+            async for mode, output in graph_app.astream(
+                initial_state, stream_mode=modes
+            ):
+                if mode == "messages":
+                    token, metadata = output
+                    if metadata.get("langgraph_node") == "reviewer" and isinstance(
+                        token.content, str
+                    ):
+                        if token.content:
+                            yield {
+                                "status": "delta",
+                                "attempt": attempt,
+                                "content": token.content,
+                                **flag,
+                            }
+                    continue
+
                 # output is a dict where keys are node names
                 for node_name, state_update in output.items():
+                    # Once the pre-screen fires, every later event says so.
+                    if (state_update.get("prescreen") or {}).get("fired"):
+                        flag = {"prescreened": True}
                     msg = state_update.get(
                         "status_message", f"{node_name.capitalize()} working..."
                     )
-                    yield json.dumps({"status": "progress", "message": msg}) + "\n"
+                    yield {"status": "progress", "message": msg, **flag}
+                    if state_update.get("deadline_exceeded"):
+                        if self.stream_tokens and node_name == "reviewer":
+                            yield {
+                                "status": "discard",
+                                "attempt": attempt,
+                                "reason": "Deadline reached",
+                                **flag,
+                            }
+                    elif node_name in ("reviewer", "speculate"):
+                        attempt += 1
+                    elif self.stream_tokens and node_name == "escalate":
+                        yield {
+                            "status": "discard",
+                            "attempt": attempt - 1,
+                            "reason": msg,
+                            **flag,
+                        }
+                    elif (
+                        self.stream_tokens and state_update.get("temp_status") == "FAIL"
+                    ):
+                        yield {
+                            "status": "discard",
+                            "attempt": attempt - 1,
+                            "reason": state_update["feedback_history"][-1],
+                            **flag,
+                        }
                     # Accumulate state updates to get the final version
                     final_state_data.update(state_update)
 
             # 5. Final Extraction & Result
-            from services.ai import extract_score, extract_name, extract_email
+            from services.ai import final_parsed, final_tier
 
+            self.trace.extend(final_state_data.get("spans", []))
             evaluation_text = final_state_data.get("reviewer_output", "")
 
+            deadline_exceeded = bool(final_state_data.get("deadline_exceeded"))
             if not evaluation_text:
-                yield json.dumps(
-                    {
-                        "status": "error",
-                        "message": "Agents failed to produce evaluation.",
-                    }
-                ) + "\n"
+                message = (
+                    "Deadline reached before the Reviewer produced an evaluation."
+                    if deadline_exceeded
+                    else "Agents failed to produce evaluation."
+                )
+                yield self._finish({"status": "error", "message": message, **flag})
                 return
 
+            parsed = final_parsed(final_state_data)
+            tier = final_tier(final_state_data)
+            if tier is not None:
+                record_result_tier(tier)
             result = {
                 "status": "completed",
-                "score": str(extract_score(evaluation_text)),
-                "candidate_name": extract_name(evaluation_text),
-                "email": extract_email(evaluation_text),
+                "jd_id": self.jd.jd_id,
+                "score": parsed.score or "N/A",
+                "candidate_name": parsed.name or "Candidate",
+                "email": parsed.email or "N/A",
+                "evaluation": parsed.fields(),
+                "parse_failures": len(final_state_data.get("parse_failures") or []),
                 "analysis": evaluation_text,
                 "conversation_log": final_state_data.get("conversation_history", []),
+                "llm_usage": final_state_data.get("llm_usage", []),
+                "prescreen": final_state_data.get("prescreen"),
+                "auditor_calls_avoided": final_state_data.get(
+                    "auditor_calls_avoided", 0
+                ),
+                "audited": final_state_data.get("temp_status") == "PASS",
+                "deadline_exceeded": deadline_exceeded,
+                "model_tier": tier,
+                "accepted_draft": final_state_data.get("accepted_draft"),
+                "speculative_tokens": final_state_data.get("speculative_tokens", 0),
+                **flag,
             }
-            yield json.dumps(result) + "\n"
+            # A result cut short by a deadline is not worth reusing.
+            if self.cache_key is not None and not deadline_exceeded:
+                await get_result_cache().aput(self.cache_key, result)
+            yield self._finish({**result, "cached": False})
 
+        except asyncio.CancelledError:
+            self._cancelled()
+            raise
         except Exception as e:
             print(f"Error: {e}")
-            yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+            yield self._finish({"status": "error", "message": str(e)})
+
+    async def events(self):
+        async for event in self.prepare():
+            yield event
+        if not self.finished:
+            async for event in self.reuse_duplicate():
+                yield event
+        if not self.finished:
+            async for event in self.judge():
+                yield event
+
+
+async def evaluation_events(
+    file_bytes: PDFBuffer,
+    file_name: str,
+    use_cache: bool = True,
+    jd_id: Optional[str] = None,
+    stream_tokens: bool = False,
+    trace: Optional[RequestTrace] = None,
+    deadline: Optional[float] = None,
+):
+    """Runs extraction and the judge graph for one resume."""
+    evaluation = ResumeEvaluation(
+        file_bytes,
+        file_name,
+        use_cache,
+        jd_id,
+        stream_tokens=stream_tokens,
+        trace=trace,
+        deadline=deadline,
+    )
+    del file_bytes  # Owned by the evaluation, which frees it after extraction
+    async for event in evaluation.events():
+        yield event
+
+
+def prescreen_batch(evaluations: List[ResumeEvaluation]):
+    """Scores every extracted resume of a batch in one matrix operation."""
+    from services.prescreen import prescreen_results
+
+    pending = [e for e in evaluations if not e.finished and e.resume_text]
+    if not pending:
+        return
+    jd = pending[0].jd
+    results = prescreen_results(
+        jd.normalized_text,
+        jd.requirements,
+        [e.resume_text for e in pending],
+        [e.artifacts.term_counts if e.artifacts else None for e in pending],
+    )
+    for evaluation, result in zip(pending, results):
+        evaluation.prescreen = result
+
+
+async def read_upload(file: UploadFile) -> bytearray:
+    """
+    Reads an upload in chunks into one buffer. Raises PDFLimitError as soon
+    as the file is known to exceed MAX_PDF_BYTES, before buffering the rest.
+    """
+    if file.size is not None:
+        check_pdf_size(file.size)
+    chunk_size = get_upload_chunk_bytes()
+    buffer = bytearray()
+    try:
+        while chunk := await file.read(chunk_size):
+            check_pdf_size(len(buffer) + len(chunk))
+            buffer += chunk
+    finally:
+        await file.close()
+    return buffer
+
+
+async def upload_evaluation(file: UploadFile, **options) -> ResumeEvaluation:
+    """Reads one upload into a ResumeEvaluation, which owns it from then on."""
+    trace = RequestTrace()
+    upload_error = None
+    with trace.span("upload_read") as span:
+        try:
+            file_bytes = await read_upload(file)
+        except PDFLimitError as e:
+            file_bytes, upload_error = bytearray(), e
+        span["bytes"] = len(file_bytes)
+    return ResumeEvaluation(
+        file_bytes, file.filename, trace=trace, upload_error=upload_error, **options
+    )
+
+
+def to_ndjson(event: dict) -> str:
+    return json.dumps(event) + "\n"
+
+
+async def until_disconnected(request: Request, lines: AsyncIterator[str]):
+    """
+    Streams `lines`, but cancels the producer as soon as the client
+    disconnects, instead of when the next line fails to send. That stops
+    the graph and any in-flight LLM call mid-wait.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    done = object()
+
+    async def produce():
+        try:
+            async for line in lines:
+                await queue.put(line)
+        finally:
+            await queue.put(done)
 
-    from fastapi.responses import StreamingResponse
+    async def watch():
+        while (await request.receive())["type"] != "http.disconnect":
+            pass
+
+    producer = asyncio.create_task(produce())
+    watcher = asyncio.create_task(watch())
+    try:
+        while True:
+            getter = asyncio.create_task(queue.get())
+            await asyncio.wait({getter, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                return  # Client disconnected
+            line = getter.result()
+            if line is done:
+                return
+            yield line
+    finally:
+        for task in (producer, watcher):
+            task.cancel()
+        await asyncio.gather(producer, watcher, return_exceptions=True)
+
+
+@app.post("/evaluate")
+async def evaluate_resume_endpoint(
+    request: Request,
+    file: UploadFile = File(...),
+    cache: bool = True,
+    jd_id: Optional[str] = None,
+    stream_tokens: bool = False,
+    deadline: Optional[float] = None,
+):
+    """
+    Streams one evaluation as NDJSON. With `stream_tokens=true` the Reviewer's
+    text also arrives as `delta` events ({attempt, content}) while it is
+    generated; `discard` marks an attempt the Auditor rejected.
+    The final event carries `timings`: per-stage spans with durations,
+    tokens and retries. `deadline` (seconds) caps extraction and every LLM
+    call; when it runs out the best draft so far is returned unaudited.
+    A client disconnect cancels the evaluation. While every evaluation slot
+    is busy, `progress` events carry the request's `queue_position`
+    (AdmissionControl); the upload is read only once a slot is free.
+    """
+    evaluation = await upload_evaluation(
+        file,
+        use_cache=cache,
+        jd_id=jd_id,
+        stream_tokens=stream_tokens,
+        deadline=deadline,
+    )
+
+    async def event_generator():
+        async for event in evaluation.events():
+            yield to_ndjson(event)
+
+    return StreamingResponse(
+        until_disconnected(request, event_generator()),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job_endpoint(
+    request: Request,
+    file: UploadFile = File(...),
+    cache: bool = True,
+    jd_id: Optional[str] = None,
+    deadline: Optional[float] = None,
+):
+    """
+    Queues one evaluation and returns its job id at once. Follow it with
+    GET /jobs/{job_id}/events; the result is kept for JOB_RESULT_TTL seconds.
+    A running job holds an evaluation slot like any /evaluate request.
+    """
+    evaluation = await upload_evaluation(
+        file, use_cache=cache, jd_id=jd_id, deadline=deadline
+    )
+    client = client_key(request.scope)
+
+    try:
+        job = get_job_manager().submit(
+            evaluation.file_name, lambda: admitted(evaluation.events(), client)
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "events_url": f"/jobs/{job.job_id}/events",
+    }
+
+
+def _find_job(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found (or expired).")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def get_job_endpoint(job_id: str):
+    return _find_job(job_id).snapshot()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events_endpoint(job_id: str, offset: int = 0):
+    """
+    Replays the job's NDJSON events from `offset`, then follows the live
+    stream until the job finishes. Each event carries its `offset`, so a
+    client that lost the connection resumes with offset = last offset + 1.
+    """
+    job = _find_job(job_id)
+
+    async def event_generator():
+        async for event in job.stream(offset):
+            yield to_ndjson(event)
 
     return StreamingResponse(event_generator(), media_type="application/x-ndjson")
 
 
+@app.post("/evaluate/batch")
+async def evaluate_batch_endpoint(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    cache: bool = True,
+    jd_id: Optional[str] = None,
+):
+    """
+    Evaluates many resumes against one JD (jd_id, or the current one) concurrently.
+    All events share one NDJSON stream; each carries `file_id` (upload
+    position) and `file_name`. The stream ends with a `batch_completed` event.
+    Each file takes an evaluation slot while it is read and extracted, and
+    again while it is judged; files still queued are not read yet.
+    """
+    evaluations: List[Optional[ResumeEvaluation]] = [None] * len(files)
+    concurrency = max(1, env_int("EVALUATE_BATCH_CONCURRENCY", 4))
+    client = client_key(request.scope)
+
+    async def event_generator():
+        semaphore = asyncio.Semaphore(concurrency)
+        queue: asyncio.Queue = asyncio.Queue()
+        outcomes = {}
+        duplicates = set()  # Answered by the near-duplicate check
+
+        # With the pre-screen on, all files are extracted before any judging
+        # so their pre-screen scores come from a single matrix operation.
+        from services.prescreen import get_prescreen_mode
+
+        batch_prescreen = get_prescreen_mode() != "off"
+        jd = None
+        if batch_prescreen:
+            jd = await asyncio.to_thread(get_jd_registry().resolve, jd_id)
+        prepared = {"count": 0}
+        all_prepared = asyncio.Event()
+
+        def mark_prepared():
+            prepared["count"] += 1
+            if prepared["count"] < len(evaluations):
+                return
+            try:
+                prescreen_batch([e for e in evaluations if e is not None])
+            except Exception as e:
+                # Each file is then scored on its own when it is judged.
+                print(f"Batch pre-screen error: {e}")
+            finally:
+                all_prepared.set()
+
+        async def read_and_prepare(index: int, file: UploadFile):
+            evaluation = await upload_evaluation(file, use_cache=cache, jd_id=jd_id)
+            evaluation.jd = jd
+            evaluations[index] = evaluation
+            async for event in evaluation.prepare():
+                yield event
+
+        async def run_one(index: int, file: UploadFile):
+            file_id = str(index)
+            tag = {"file_id": file_id, "file_name": file.filename}
+
+            async def forward(events):
+                async for event in events:
+                    if event["status"] in ("completed", "error"):
+                        outcomes[file_id] = event["status"]
+                        if "duplicate" in event:
+                            duplicates.add(file_id)
+                    await queue.put({**tag, **event})
+
+            try:
+                await queue.put({**tag, "status": "progress", "message": "Queued..."})
+                try:
+                    async with semaphore:
+                        await forward(admitted(read_and_prepare(index, file), client))
+                finally:
+                    # Counted even if preparing failed, so no file waits forever.
+                    if batch_prescreen:
+                        mark_prepared()
+                if batch_prescreen:
+                    await all_prepared.wait()
+                evaluation = evaluations[index]
+                # A near-duplicate waits for its original without holding a slot.
+                await forward(evaluation.reuse_duplicate())
+                if not evaluation.finished:
+                    async with semaphore:
+                        await forward(admitted(evaluation.judge(), client))
+            finally:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(run_one(i, file)) for i, file in enumerate(files)]
+        try:
+            pending = len(tasks)
+            while pending:
+                event = await queue.get()
+                if event is None:
+                    pending -= 1
+                    continue
+                yield to_ndjson(event)
+
+            completed = sum(1 for s in outcomes.values() if s == "completed")
+            flagged = sum(1 for i in duplicates if outcomes[i] == "error")
+            yield to_ndjson(
+                {
+                    "status": "batch_completed",
+                    "total": len(tasks),
+                    "completed": completed,
+                    "failed": len(tasks) - completed - flagged,
+                    "duplicates": len(duplicates),
+                }
+            )
+        finally:
+            # Client went away (or we finished): stop any remaining work.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        until_disconnected(request, event_generator()),
+        media_type="application/x-ndjson",
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,242 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from services.config import env_float, env_int
+
+# --- Inbound admission control ---
+# At most `max_active` evaluations run at once, whether they come from
+# /evaluate, a batch item or a job; up to `max_waiting` more /evaluate
+# requests wait for a slot, and anything beyond that is turned away at once
+# (503 with Retry-After) before its upload is read. Waiting evaluations are
+# queued per client and slots are handed out round-robin across clients, so
+# one client sending a burst cannot starve the others.
+
+
+class AdmissionFull(Exception):
+    """Raised by reserve() when every slot is busy and the wait queue is full."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    def __init__(self, controller: "AdmissionController", client: str):
+        self.controller = controller
+        self.client = client
+        self.granted = False
+        self.released = False
+        self.granted_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+
+    async def wait(self) -> AsyncIterator[int]:
+        """Yields the queue position (1 = next) whenever it changes, until granted."""
+        last = None
+        while True:
+            self._changed.clear()  # Before reading, so no change is missed
+            if self.granted:
+                return
+            position = self.controller.position(self)
+            if position != last:
+                last = position
+                yield position
+            await self._changed.wait()
+
+    def release(self):
+        self.controller.release(self)
+
+
+class AdmissionController:
+    def __init__(
+        self, max_active: int, max_waiting: int, default_retry_after: float = 5.0
+    ):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.default_retry_after = default_retry_after
+        self.active = 0
+        # client -> its waiting tickets; the dict order is the round-robin turn
+        self._waiting: "OrderedDict[str, Deque[AdmissionTicket]]" = OrderedDict()
+        self._service_seconds: Optional[float] = None  # Moving average
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "abandoned": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_active > 0
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiting.values())
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from recent evaluation times."""
+        per_slot = self._service_seconds or self.default_retry_after
+        turns = (self.waiting + 1) / max(self.max_active, 1)
+        return max(1, min(120, math.ceil(per_slot * turns)))
+
+    def has_room(self) -> bool:
+        return (
+            self.active < self.max_active and not self._waiting
+        ) or self.waiting < self.max_waiting
+
+    def check_room(self):
+        """Raises AdmissionFull when a new request could neither run nor wait."""
+        if not self.has_room():
+            self.stats["rejected"] += 1
+            raise AdmissionFull(
+                f"Server is busy ({self.active} evaluations running, "
+                f"{self.waiting} waiting). Try again later.",
+                self.retry_after(),
+            )
+
+    def reserve(self, client: str, shed: bool = True) -> AdmissionTicket:
+        """
+        A granted or queued ticket. Raises AdmissionFull when there is no
+        room, unless `shed` is False: work already accepted (batch items,
+        jobs) always queues.
+        """
+        ticket = AdmissionTicket(self, client)
+        if self.active < self.max_active and not self._waiting:
+            self._grant(ticket)
+            return ticket
+        if shed:
+            self.check_room()
+        self._waiting.setdefault(client, deque()).append(ticket)
+        self.stats["queued"] += 1
+        return ticket
+
+    def _grant(self, ticket: AdmissionTicket):
+        ticket.granted = True
+        ticket.granted_at = time.monotonic()
+        self.active += 1
+        self.stats["admitted"] += 1
+        ticket._notify()
+
+    def release(self, ticket: AdmissionTicket):
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket.granted:
+            self.active -= 1
+            took = time.monotonic() - ticket.granted_at
+            self._service_seconds = (
+                took
+                if self._service_seconds is None
+                else 0.8 * self._service_seconds + 0.2 * took
+            )
+        else:
+            # Gave up while waiting (e.g. the client disconnected).
+            queue = self._waiting.get(ticket.client)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._waiting[ticket.client]
+                self.stats["abandoned"] += 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hands free slots out round-robin, then tells the rest their position."""
+        while self.active < self.max_active and self._waiting:
+            client, queue = next(iter(self._waiting.items()))
+            ticket = queue.popleft()
+            # The client moves to the back of the turn order.
+            del self._waiting[client]
+            if queue:
+                self._waiting[client] = queue
+            self._grant(ticket)
+        for queue in self._waiting.values():
+            for ticket in queue:
+                ticket._notify()
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        """1-based place in the round-robin grant order (0 once granted)."""
+        if ticket.granted:
+            return 0
+        clients = list(self._waiting)
+        turn = clients.index(ticket.client)
+        index = self._waiting[ticket.client].index(ticket)
+        ahead = index
+        for i, client in enumerate(clients):
+            if client != ticket.client:
+                rounds = index + 1 if i < turn else index
+                ahead += min(len(self._waiting[client]), rounds)
+        return ahead + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active": self.active,
+            "waiting": self.waiting,
+            "waiting_clients": len(self._waiting),
+            "max_active": self.max_active,
+            "max_waiting": self.max_waiting,
+            "retry_after": self.retry_after(),
+        }
+
+
+def waiting_event(position: int) -> Dict[str, Any]:
+    return {
+        "status": "progress",
+        "message": f"Waiting for a free slot (position {position})...",
+        "queue_position": position,
+    }
+
+
+async def admitted(
+    events: AsyncIterator[Dict[str, Any]], client: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """Runs `events` in an admission slot, reporting the queue position until then."""
+    controller = get_admission_controller()
+    if not controller.enabled:
+        async for event in events:
+            yield event
+        return
+    ticket = controller.reserve(client, shed=False)
+    try:
+        async for position in ticket.wait():
+            yield waiting_event(position)
+        async for event in events:
+            yield event
+    finally:
+        ticket.release()
+
+
+def client_key(scope) -> str:
+    """The client a request counts against: first X-Forwarded-For hop, else peer."""
+    for name, value in scope.get("headers") or []:
+        if name == b"x-forwarded-for":
+            forwarded = value.decode("latin-1").split(",")[0].strip()
+            if forwarded:
+                return forwarded
+    client = scope.get("client")
+    return client[0] if client else "anonymous"
+
+
+# --- Shared instance ---
+_CONTROLLER: Optional[AdmissionController] = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    global _CONTROLLER
+    if _CONTROLLER is None:
+        with _CONTROLLER_LOCK:
+            if _CONTROLLER is None:
+                _CONTROLLER = AdmissionController(
+                    max_active=max(0, env_int("EVALUATE_MAX_CONCURRENCY", 8)),
+                    max_waiting=max(0, env_int("EVALUATE_MAX_QUEUED", 32)),
+                    default_retry_after=env_float("EVALUATE_RETRY_AFTER", 5.0),
+                )
+    return _CONTROLLER
+
+
+def reset_admission_controller():
+    global _CONTROLLER
+    with _CONTROLLER_LOCK:
+        _CONTROLLER = None
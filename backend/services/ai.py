@@ -1,66 +1,140 @@
 import os
-import re
 import json
-from typing import TypedDict, List, Dict, Any
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TypedDict, List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
+import httpx
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
+from services.config import env_str, env_int, env_float, env_floats
+from services.ocr import COMPACT, get_extract_mode
+from services.parsing import (
+    ParsedEvaluation,
+    ReviewerEvaluation,
+    parse_evaluation_text,
+    parsed_from_structured,
+    record_parse,
+    render_evaluation,
+    structured_output_enabled,
+)
+from services.prescreen import (
+    fast_reject_text,
+    get_prescreen_mode,
+    prescreen_cache_tag,
+    prescreen_results,
+)
+from services.routing import (
+    CASCADE_ESCALATION_FEEDBACK,
+    FAST,
+    STRONG,
+    ModelRouting,
+    get_model_routing,
+    record_escalation,
+    record_result_tier,
+)
+from services.scheduler import get_llm_scheduler
+from services.telemetry import llm_span, make_span, start_timer
+from services.validator import (
+    AUDIT,
+    RETRY,
+    record_verdict,
+    validate_reviewer_output,
+    validator_enabled,
+)
+
 load_dotenv()
 
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Bump whenever a prompt template changes; cached evaluations made with an
+# older prompt are then no longer reused.
+PROMPT_VERSION = "3"
+
+# Graph signal: the deadline ran out, end with the best draft so far.
+DEADLINE = "DEADLINE"
+
+# Speculative draft verdict: a borderline fast-tier draft, sent up the cascade.
+ESCALATE = "ESCALATE"
+
+
+@dataclass(frozen=True)
+class SpeculativeConfig:
+    """Parallel Reviewer drafts per round; 1 draft keeps the serial loop."""
+
+    drafts: int = 1
+    draft_temperatures: Tuple[float, ...] = (0.5, 0.2, 0.8)
+    token_budget: int = 0  # Extra tokens per evaluation for drafts 2..n (0 = no cap)
+
+    @property
+    def enabled(self) -> bool:
+        return self.drafts > 1
+
+    def temperatures(self, count: int) -> List[float]:
+        temps = self.draft_temperatures or (0.5,)
+        return [temps[i % len(temps)] for i in range(count)]
+
+
+def get_speculative_config() -> SpeculativeConfig:
+    return SpeculativeConfig(
+        drafts=max(1, env_int("SPECULATIVE_DRAFTS", 1)),
+        draft_temperatures=env_floats("SPECULATIVE_TEMPERATURES", (0.5, 0.2, 0.8)),
+        token_budget=max(0, env_int("SPECULATIVE_TOKEN_BUDGET", 0)),
+    )
+
 
 # --- 1. State Definition ---
 class GraphState(TypedDict):
     resume_text: str
     job_description: str
+    jd_requirements: List[str]  # Precomputed when the JD was registered
     reviewer_output: str
     feedback_history: List[str]
     conversation_history: List[
         Dict[str, Any]
     ]  # [{"role": "Reviewer", "content": "..."}]
+    reviewer_attempts: List[str]  # Every Reviewer draft, in order
+    reviewer_tiers: List[str]  # Model tier (fast/strong) of each draft
+    model_tier: str  # Tier of the next Reviewer call ("" = routing default)
+    reviewer_parsed: Optional[Dict[str, Any]]  # Fields of the latest draft
+    parse_failures: List[int]  # Attempts whose fields could not be parsed
+    llm_usage: List[Dict[str, Any]]  # Token usage per LLM call
+    spans: List[Dict[str, Any]]  # Timed stages (LLM calls, parsing, checks)
+    prescreen: Optional[Dict[str, Any]]  # Lexical pre-screen result, if enabled
+    auditor_calls_avoided: int  # Audits settled by the local validator
+    deadline: Optional[float]  # time.monotonic() by which the run must end
+    deadline_exceeded: bool  # Run cut short; the evaluation is unaudited
+    speculative_tokens: int  # Tokens spent on drafts beyond the first
+    accepted_draft: Optional[int]  # Speculative draft that passed, if any
     retry_count: int
     # Removed "status" field
     temp_status: str  # Internal use only
     status_message: str  # Human-readable status for UI
 
 
-# --- 2. Node Logic ---
-class ResumeJudgeGraph:
-    def __init__(self, model_name="gpt-4o-mini"):
-        # Look for either key name
-        api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAPI_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY (or OPENAPI_KEY) not found in environment variables."
-            )
+# --- 2. Prompts ---
+# Layout matters for provider-side prompt caching: every call starts with the
+# same static header + JD + resume, and only the role instructions and the
+# newest turns differ. Keep SHARED_CONTEXT_TEMPLATE byte-stable.
+SHARED_CONTEXT_TEMPLATE = """
+        Context: A Reviewer and an Auditor are jointly evaluating one candidate for one role.
+        The job description and the candidate's resume are given below. Role-specific instructions follow.
 
-        self.llm_reviewer = ChatOpenAI(
-            model=model_name, temperature=0.5, api_key=api_key
-        )
-        self.llm_auditor = ChatOpenAI(
-            model=model_name, temperature=0.0, api_key=api_key
-        )
+        [JOB DESCRIPTION]
+        {job_description}
 
-    def node_1_reviewer(self, state: GraphState):
-        """
-        Node 1: The Reviewer
-        Analyzes resume vs JD. Adjusts based on feedback.
+        [RESUME TEXT]
+        {resume_text}
         """
-        print(
-            f"\n... Node 1 (Reviewer) is thinking (Attempt {state['retry_count'] + 1})..."
-        )
-
-        history_text = ""
-        if state["feedback_history"]:
-            history_text = (
-                "\\n\\n--- ADVICE FROM SENIOR MENTOR (Please adjust analysis) ---\\n"
-            )
-            for i, feedback in enumerate(state["feedback_history"]):
-                history_text += f"Tip {i+1}: {feedback}\\n"
 
-        system_msg = """
+REVIEWER_SYSTEM_PROMPT = """
         Role: You are a Professional Talent Acquisition Partner specializing in "Potential-Based Hiring."
         Task: Evaluate the candidate's Resume against the JD by identifying real, relevant connections between their past experience and the role's requirements.
 
@@ -81,76 +155,420 @@ class ResumeJudgeGraph:
            - **สิ่งที่ต้องพัฒนา (Gaps & Growth Areas):** ทักษะทางเทคนิคหรือประสบการณ์ที่ขาดหายไปอย่างชัดเจนเมื่อเทียบกับ JD
         """
 
-        user_msg = f"""
-        [JOB DESCRIPTION]
-        {state['job_description']}
+MENTOR_FEEDBACK_TEMPLATE = """
+        --- ADVICE FROM SENIOR MENTOR (Please adjust analysis) ---
+        {feedback}
 
-        [RESUME TEXT]
-        {state['resume_text']}
-        
-        {history_text}
-        
-        Generate your constructive evaluation now.
+        Rewrite your full evaluation, applying this advice.
+        """
+
+AUDITOR_SYSTEM_PROMPT = """
+        Role: You are a Senior HR Auditor & Quality Controller.
+        Task: Audit the Recruiter's evaluation to ensure it is logically sound, evidence-based, and accurately reflects the candidate's fit for the JD.
+
+        Verification Checklist:
+        1. **Logical Transferable Skills**: Check if the Recruiter missed a skill in the SAME FAMILY. If the JD asks for "Jira" but the candidate has "Asana/Trello", the Recruiter should give credit. HOWEVER, if the JD asks for "Python" and the candidate has "Chemical Engineering Research," do NOT intervene; these are NOT transferable skills.
+        2. **Anti-Hallucination Check**: Did the Recruiter "invent" potential or skills not found in the Resume? If the Recruiter says "the candidate can learn Python" without any proof of coding history, you MUST FAIL the evaluation.
+        3. **No-Nonsense Bias Check**: Ensure the Recruiter is not being "too nice." If a candidate lacks 90% of the core requirements, a score above 3 is illogical. FAIL the evaluation if the score is too high for a weak candidate.
+        4. **If the Reviewer gives a low score (1-3) and correctly identifies that the candidate lacks almost all core requirements, you MUST return 'PASS'. Even if you think the candidate is terrible, as long as the Reviewer agrees they are terrible, the evaluation is ACCURATE.**
+        Response Format:
+        - If the evaluation is accurate, logical, and evidence-based: Return exactly "PASS".
+        - If the evaluation is illogical, misses legitimate skill connections, or is UNREALISTICALLY POSITIVE: Return "FAIL: [ระบุจุดบกพร่องตามหลักการและตรรกะเป็นภาษาไทยเท่านั้น]".
+
+        CRITICAL: All feedback must be strictly in Thai. Do not encourage "Potential" without evidence.
         """
 
-        response = self.llm_reviewer.invoke(
-            [SystemMessage(content=system_msg), HumanMessage(content=user_msg)]
+
+def usage_entry(
+    node: str, attempt: int, response, model: Optional[str] = None
+) -> Dict[str, Any]:
+    """Token usage of one LLM call, split into cached and uncached prompt tokens."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    input_tokens = usage.get("input_tokens", 0) or 0
+    cached = details.get("cache_read", 0) or 0
+    return {
+        "node": node,
+        "attempt": attempt,
+        "model": model,
+        "input_tokens": input_tokens,
+        "cached_input_tokens": cached,
+        "uncached_input_tokens": input_tokens - cached,
+        "output_tokens": usage.get("output_tokens", 0) or 0,
+    }
+
+
+def time_left(state: GraphState) -> Optional[float]:
+    """Seconds until the run's deadline, or None when it has none."""
+    deadline = state.get("deadline")
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def best_draft(state: GraphState) -> str:
+    """The latest Reviewer draft whose fields parsed, else the latest one."""
+    attempts = state.get("reviewer_attempts") or []
+    failures = set(state.get("parse_failures") or [])
+    for attempt in range(len(attempts), 0, -1):
+        if attempt not in failures:
+            return attempts[attempt - 1]
+    return attempts[-1] if attempts else ""
+
+
+def final_tier(state: Dict[str, Any]) -> Optional[str]:
+    """Model tier of the draft that became the result (None if no LLM wrote it)."""
+    text = state.get("reviewer_output", "")
+    attempts = state.get("reviewer_attempts") or []
+    tiers = state.get("reviewer_tiers") or []
+    for draft, tier in reversed(list(zip(attempts, tiers))):
+        if draft == text:
+            return tier
+    return None
+
+
+# --- 3. Node Logic ---
+class ResumeJudgeGraph:
+    def __init__(
+        self,
+        model_name=DEFAULT_MODEL,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None,
+        prescreen_mode: str = "off",
+        validate: bool = True,
+        structured_output: bool = False,
+        routing: Optional[ModelRouting] = None,
+        speculative: Optional["SpeculativeConfig"] = None,
+    ):
+        # Look for either key name
+        api_key = _get_api_key()
+        if not api_key:
+            raise ValueError(
+                "OPENAI_API_KEY (or OPENAPI_KEY) not found in environment variables."
+            )
+
+        # Optional shared HTTP clients keep connections (and TLS sessions)
+        # alive between evaluations instead of opening a new pool per request.
+        # Retries are owned by the LLM scheduler, which paces them globally.
+        # stream_usage keeps token usage available when a call is streamed.
+        client_kwargs = {"max_retries": 0, "stream_usage": True}
+        if http_client is not None:
+            client_kwargs["http_client"] = http_client
+        if http_async_client is not None:
+            client_kwargs["http_async_client"] = http_async_client
+
+        # Kept so they can be closed once this engine is replaced.
+        self.http_client = http_client
+        self.http_async_client = http_async_client
+        self.model_name = model_name
+        self.routing = routing or ModelRouting(reviewer=model_name, auditor=model_name)
+        self.prescreen_mode = prescreen_mode
+        self.validate = validate
+        self.llm_reviewer = ChatOpenAI(
+            model=self.routing.reviewer,
+            temperature=0.5,
+            api_key=api_key,
+            **client_kwargs,
+        )
+        self.llm_auditor = ChatOpenAI(
+            model=self.routing.auditor,
+            temperature=0.0,
+            api_key=api_key,
+            **client_kwargs,
+        )
+        reviewers = {STRONG: self.llm_reviewer}
+        if self.routing.cascade_enabled:
+            reviewers[FAST] = ChatOpenAI(
+                model=self.routing.cascade,
+                temperature=0.5,
+                api_key=api_key,
+                **client_kwargs,
+            )
+        # Structured mode asks for a schema-validated object; include_raw keeps
+        # the raw message for usage accounting and the text-parser fallback.
+        self.structured_output = structured_output
+        self.reviewer_calls = {
+            tier: self._reviewer_runnable(llm) for tier, llm in reviewers.items()
+        }
+        self.reviewer_call = self.reviewer_calls[STRONG]
+
+        # Speculative mode: one Reviewer client per draft temperature.
+        self.speculative = speculative or SpeculativeConfig()
+        self.draft_calls = {}
+        if self.speculative.enabled:
+            self.draft_calls = {
+                tier: [
+                    self._reviewer_runnable(
+                        ChatOpenAI(
+                            model=self.routing.model_for(tier),
+                            temperature=temperature,
+                            api_key=api_key,
+                            **client_kwargs,
+                        )
+                    )
+                    for temperature in self.speculative.temperatures(
+                        self.speculative.drafts
+                    )
+                ]
+                for tier in reviewers
+            }
+        self._app = None
+
+    def _reviewer_runnable(self, llm):
+        if not self.structured_output:
+            return llm
+        # include_raw=True would start the chain with a RunnableParallel, which
+        # drops invoke() kwargs such as the per-call timeout. Keep the model
+        # first and attach the raw message around the parser instead.
+        chain = llm.with_structured_output(ReviewerEvaluation, method="json_schema")
+        parser = chain.steps[1:]
+
+        def with_raw(message):
+            try:
+                parsed, error = message, None
+                for step in parser:
+                    parsed = step.invoke(parsed)
+            except Exception as e:
+                parsed, error = None, e
+            return {"raw": message, "parsed": parsed, "parsing_error": error}
+
+        return chain.first | RunnableLambda(with_raw)
+
+    def get_app(self):
+        """Returns the compiled graph, compiling it on first use."""
+        if self._app is None:
+            self._app = self.build_graph()
+        return self._app
+
+    def _shared_context(self, state: GraphState):
+        # Identical first message for every Reviewer and Auditor call of one
+        # evaluation, so the provider can serve it from its prompt cache.
+        return SystemMessage(
+            content=SHARED_CONTEXT_TEMPLATE.format(
+                job_description=state["job_description"],
+                resume_text=state["resume_text"],
+            )
+        )
+
+    def node_0_prescreen(self, state: GraphState):
+        """
+        Node 0: Lexical Pre-screen (optional)
+        Scores keyword coverage of the JD locally. Below the threshold the
+        resume either gets a local low-score result (fast) or a single
+        Reviewer pass without the Auditor loop (cheap).
+        """
+        timer = start_timer()
+        prescreen = (
+            state.get("prescreen")
+            or prescreen_results(
+                state["job_description"],
+                state.get("jd_requirements") or [],
+                [state["resume_text"]],
+            )[0]
         )
+        match = f"keyword match {prescreen['score']:.0%}"
+        spans = state.get("spans", []) + [
+            make_span("prescreen", timer, fired=prescreen["fired"])
+        ]
+        if not prescreen["fired"]:
+            return {
+                "prescreen": prescreen,
+                "spans": spans,
+                "status_message": f"Pre-screen passed ({match})",
+            }
+
+        print(f"\n... Node 0 (Pre-screen) fired: {match} ({prescreen['mode']})")
+        if prescreen["mode"] != "fast":
+            return {
+                "prescreen": prescreen,
+                "spans": spans,
+                "status_message": f"Pre-screen fired ({match}): single Reviewer pass",
+            }
+
+        evaluation_text = fast_reject_text(state["resume_text"], prescreen)
+        return {
+            "prescreen": prescreen,
+            "spans": spans,
+            "reviewer_output": evaluation_text,
+            "reviewer_attempts": [evaluation_text],
+            "conversation_history": state.get("conversation_history", [])
+            + [{"role": "Pre-screen", "content": evaluation_text, "timestamp": 0}],
+            "temp_status": "PRESCREEN",
+            "status_message": f"Pre-screen fired ({match}): skipped AI agents",
+        }
+
+    def _reviewer_tier(self, state: GraphState) -> str:
+        return state.get("model_tier") or self.routing.first_tier()
+
+    def _reviewer_messages(self, state: GraphState):
+        """
+        Builds the Reviewer conversation for the current attempt.
+        Retries continue the same conversation: each earlier draft is
+        followed by the mentor feedback it received, appended at the end.
+        """
+        messages = [
+            self._shared_context(state),
+            SystemMessage(content=REVIEWER_SYSTEM_PROMPT),
+            HumanMessage(content="Generate your constructive evaluation now."),
+        ]
+        drafts = state.get("reviewer_attempts", [])
+        for draft, feedback in zip(drafts, state["feedback_history"]):
+            messages.append(AIMessage(content=draft))
+            messages.append(
+                HumanMessage(content=MENTOR_FEEDBACK_TEMPLATE.format(feedback=feedback))
+            )
+        return messages
+
+    def _reviewer_result(self, response):
+        """Returns (evaluation text, parsed fields, raw message)."""
+        if not isinstance(response, dict):
+            return response.content, parse_evaluation_text(response.content), response
+
+        raw = response["raw"]
+        if response.get("parsed") is not None:
+            record_parse("structured")
+            evaluation = response["parsed"]
+            return (
+                render_evaluation(evaluation),
+                parsed_from_structured(evaluation),
+                raw,
+            )
+
+        print(f"  > Structured output did not parse: {response.get('parsing_error')}")
+        record_parse("structured_fallbacks")
+        return raw.content, parse_evaluation_text(raw.content), raw
+
+    def _reviewer_update(self, state: GraphState, response, timer, call_stats):
+        """Turns the Reviewer response into a state update."""
+        attempt = state["retry_count"] + 1
+        tier = self._reviewer_tier(state)
+        model = self.routing.model_for(tier)
+        parse_timer = start_timer()
+        text, parsed, message = self._reviewer_result(response)
+        entry = usage_entry("reviewer", attempt, message, model)
+        spans = state.get("spans", []) + [
+            llm_span("reviewer", timer, attempt, entry, call_stats, tier=tier),
+            make_span(
+                "parse",
+                parse_timer,
+                attempt=attempt,
+                source=parsed.source,
+                ok=not parsed.missing_fields(),
+            ),
+        ]
+
+        # A draft whose fields cannot be parsed costs another Reviewer round.
+        failures = list(state.get("parse_failures") or [])
+        if attempt - 1 in failures:
+            record_parse("retry_calls", entry["input_tokens"] + entry["output_tokens"])
+        if parsed.missing_fields():
+            record_parse("failures")
+            failures.append(attempt)
+        elif parsed.source == "text":
+            record_parse("text_parsed")
 
         # LOGGING
         new_entry = {
             "role": "Reviewer",
-            "content": response.content,
+            "content": text,
             "timestamp": state["retry_count"],
+            "model": model,
+            "tier": tier,
         }
         updated_history = state.get("conversation_history", []) + [new_entry]
+        usage = state.get("llm_usage", []) + [entry]
 
         return {
-            "reviewer_output": response.content,
-            "retry_count": state["retry_count"] + 1,
+            "reviewer_output": text,
+            "reviewer_attempts": state.get("reviewer_attempts", []) + [text],
+            "reviewer_tiers": state.get("reviewer_tiers", []) + [tier],
+            "model_tier": tier,
+            "reviewer_parsed": parsed.model_dump(),
+            "parse_failures": failures,
+            "retry_count": attempt,
             "conversation_history": updated_history,
-            "status_message": f"Reviewer finished analysis (Attempt {state['retry_count'] + 1})",
+            "llm_usage": usage,
+            "spans": spans,
+            "status_message": f"Reviewer finished analysis (Attempt {attempt})",
         }
 
-    def node_2_auditor(self, state: GraphState):
-        """
-        Node 2: The Auditor (Mentor)
-        Checks Reviewer output against Resume and JD.
-        """
-        print("\n... Node 2 (Auditor) is verifying...")
-
-        system_msg = """
-        Role: You are a Senior HR Auditor & Quality Controller.
-        Task: Audit the Recruiter's evaluation to ensure it is logically sound, evidence-based, and accurately reflects the candidate's fit for the JD.
-
-        Verification Checklist:
-        1. **Logical Transferable Skills**: Check if the Recruiter missed a skill in the SAME FAMILY. If the JD asks for "Jira" but the candidate has "Asana/Trello", the Recruiter should give credit. HOWEVER, if the JD asks for "Python" and the candidate has "Chemical Engineering Research," do NOT intervene; these are NOT transferable skills.
-        2. **Anti-Hallucination Check**: Did the Recruiter "invent" potential or skills not found in the Resume? If the Recruiter says "the candidate can learn Python" without any proof of coding history, you MUST FAIL the evaluation.
-        3. **No-Nonsense Bias Check**: Ensure the Recruiter is not being "too nice." If a candidate lacks 90% of the core requirements, a score above 3 is illogical. FAIL the evaluation if the score is too high for a weak candidate.
-        4. **If the Reviewer gives a low score (1-3) and correctly identifies that the candidate lacks almost all core requirements, you MUST return 'PASS'. Even if you think the candidate is terrible, as long as the Reviewer agrees they are terrible, the evaluation is ACCURATE.**
-        Response Format:
-        - If the evaluation is accurate, logical, and evidence-based: Return exactly "PASS".
-        - If the evaluation is illogical, misses legitimate skill connections, or is UNREALISTICALLY POSITIVE: Return "FAIL: [ระบุจุดบกพร่องตามหลักการและตรรกะเป็นภาษาไทยเท่านั้น]".
+    def _deadline_update(self, state: GraphState, stage: str, timer=None):
+        """Ends the run early with the best Reviewer draft, left unaudited."""
+        print(f"\n*** Deadline reached during {stage}. Returning best draft. ***")
+        update = {
+            "deadline_exceeded": True,
+            "temp_status": DEADLINE,
+            "reviewer_output": best_draft(state),
+            "status_message": f"Deadline reached during {stage}: "
+            "returning the best evaluation so far (unaudited)",
+        }
+        if timer is not None:
+            attempt = state["retry_count"] + (stage == "reviewer")
+            update["spans"] = state.get("spans", []) + [
+                make_span(stage, timer, attempt=attempt, timed_out=True)
+            ]
+        return update
 
-        CRITICAL: All feedback must be strictly in Thai. Do not encourage "Potential" without evidence.
+    def node_1_reviewer(self, state: GraphState):
+        """
+        Node 1: The Reviewer
+        Analyzes resume vs JD. Adjusts based on feedback.
         """
+        left = time_left(state)
+        if left is not None and left <= 0:
+            return self._deadline_update(state, "reviewer")
+        tier = self._reviewer_tier(state)
+        print(
+            f"\n... Node 1 (Reviewer) is thinking (Attempt {state['retry_count'] + 1}, "
+            f"{tier} model)..."
+        )
+        timer, call_stats = start_timer(), {}
+        try:
+            response = get_llm_scheduler().run_sync(
+                self.reviewer_calls[tier].invoke,
+                self._reviewer_messages(state),
+                call_stats,
+                timeout=left,
+            )
+        except TimeoutError:
+            return self._deadline_update(state, "reviewer", timer)
+        return self._reviewer_update(state, response, timer, call_stats)
 
-        user_msg = f"""
-        [JOB DESCRIPTION]
-        {state['job_description']}
+    async def anode_1_reviewer(self, state: GraphState):
+        """Async twin of node_1_reviewer (used by astream/ainvoke)."""
+        left = time_left(state)
+        if left is not None and left <= 0:
+            return self._deadline_update(state, "reviewer")
+        tier = self._reviewer_tier(state)
+        print(
+            f"\n... Node 1 (Reviewer) is thinking (Attempt {state['retry_count'] + 1}, "
+            f"{tier} model)..."
+        )
+        timer, call_stats = start_timer(), {}
+        try:
+            response = await get_llm_scheduler().run(
+                self.reviewer_calls[tier].ainvoke,
+                self._reviewer_messages(state),
+                call_stats,
+                timeout=left,
+            )
+        except asyncio.TimeoutError:
+            return self._deadline_update(state, "reviewer", timer)
+        return self._reviewer_update(state, response, timer, call_stats)
 
-        [ORIGINAL RESUME TEXT]
-        {state['resume_text']}
-        
+    def _auditor_messages(self, state: GraphState):
+        """Builds the Auditor prompt for the latest Reviewer output."""
+        return [
+            self._shared_context(state),
+            SystemMessage(content=AUDITOR_SYSTEM_PROMPT),
+            HumanMessage(content=f"""
         [REVIEWER'S EVALUATION]
         {state['reviewer_output']}
-        
+
         Verify this evaluation as a Mentor.
-        """
+        """),
+        ]
 
-        response = self.llm_auditor.invoke(
-            [SystemMessage(content=system_msg), HumanMessage(content=user_msg)]
-        )
+    def _auditor_update(self, state: GraphState, response, timer, call_stats):
+        """Turns the Auditor verdict into a state update."""
         result = response.content.strip()
 
         is_pass = result.upper() == "PASS"
@@ -168,35 +586,576 @@ class ResumeJudgeGraph:
 
         graph_status_signal = "PASS" if is_pass else "FAIL"
 
+        # A rejected fast-tier draft moves the rest of the run to the strong model.
+        tier = self._reviewer_tier(state)
         if not is_pass:
             print(f"!!! AUDITOR REJECTED: {result}")
             new_feedback_history = state["feedback_history"] + [result]
+            if tier == FAST:
+                record_escalation("rejected")
+                tier = STRONG
         else:
             print(f"\n>>> AUDITOR APPROVED <<<")
 
+        entry = usage_entry(
+            "auditor", state["retry_count"], response, self.routing.auditor
+        )
+        usage = state.get("llm_usage", []) + [entry]
+        span = llm_span(
+            "auditor",
+            timer,
+            state["retry_count"],
+            entry,
+            call_stats,
+            verdict=graph_status_signal,
+        )
+
         return {
             "feedback_history": new_feedback_history,
             "conversation_history": updated_conv_history,
+            "llm_usage": usage,
+            "spans": state.get("spans", []) + [span],
+            "model_tier": tier,
             "temp_status": graph_status_signal,  # Internal use only
             "status_message": f"Auditor verified: {graph_status_signal}",
         }
 
+    def node_escalate(self, state: GraphState):
+        """
+        Cascade step (no LLM call): a borderline score from the fast model is
+        sent back to the Reviewer, which now runs on the strong model.
+        """
+        timer = start_timer()
+        score = (state.get("reviewer_parsed") or {}).get("score")
+        print(f"\n... Borderline score {score} from the fast model: escalating")
+        record_escalation("borderline")
+        return {
+            "model_tier": STRONG,
+            "feedback_history": state["feedback_history"]
+            + [CASCADE_ESCALATION_FEEDBACK],
+            "conversation_history": state.get("conversation_history", [])
+            + [
+                {
+                    "role": "Cascade",
+                    "content": f"Borderline score {score}: escalating to "
+                    f"{self.routing.reviewer}",
+                    "timestamp": state["retry_count"],
+                }
+            ],
+            "spans": state.get("spans", [])
+            + [make_span("escalate", timer, attempt=state["retry_count"])],
+            "status_message": f"Borderline score {score}: "
+            "escalating to the strong model",
+        }
+
+    def node_validator(self, state: GraphState):
+        """
+        Local check between Reviewer and Auditor (no LLM call).
+        Malformed output goes straight back to the Reviewer; cases the
+        Auditor prompt would have to PASS are passed here.
+        """
+        timer = start_timer()
+        parsed = state.get("reviewer_parsed")
+        verdict, detail = validate_reviewer_output(
+            state["reviewer_output"], ParsedEvaluation(**parsed) if parsed else None
+        )
+        record_verdict(verdict)
+        spans = state.get("spans", []) + [
+            make_span("validator", timer, attempt=state["retry_count"], verdict=verdict)
+        ]
+        if verdict == AUDIT:
+            return {
+                "temp_status": AUDIT,
+                "spans": spans,
+                "status_message": "Validator: format OK, sending to Auditor",
+            }
+
+        print(f"\n... Validator settled the audit locally: {verdict}")
+        update = {
+            "conversation_history": state.get("conversation_history", [])
+            + [
+                {
+                    "role": "Validator",
+                    "content": detail,
+                    "timestamp": state["retry_count"],
+                }
+            ],
+            "auditor_calls_avoided": state.get("auditor_calls_avoided", 0) + 1,
+            "spans": spans,
+            "temp_status": "FAIL" if verdict == RETRY else "PASS",
+        }
+        if verdict == RETRY:
+            update["feedback_history"] = state["feedback_history"] + [detail]
+            update["status_message"] = "Validator: malformed evaluation, retrying"
+        else:
+            update["status_message"] = "Validator verified: PASS"
+        return update
+
+    def node_2_auditor(self, state: GraphState):
+        """
+        Node 2: The Auditor (Mentor)
+        Checks Reviewer output against Resume and JD.
+        """
+        left = time_left(state)
+        if left is not None and left <= 0:
+            return self._deadline_update(state, "auditor")
+        print("\n... Node 2 (Auditor) is verifying...")
+        timer, call_stats = start_timer(), {}
+        try:
+            response = get_llm_scheduler().run_sync(
+                self.llm_auditor.invoke,
+                self._auditor_messages(state),
+                call_stats,
+                timeout=left,
+            )
+        except TimeoutError:
+            return self._deadline_update(state, "auditor", timer)
+        return self._auditor_update(state, response, timer, call_stats)
+
+    async def anode_2_auditor(self, state: GraphState):
+        """Async twin of node_2_auditor (used by astream/ainvoke)."""
+        left = time_left(state)
+        if left is not None and left <= 0:
+            return self._deadline_update(state, "auditor")
+        print("\n... Node 2 (Auditor) is verifying...")
+        timer, call_stats = start_timer(), {}
+        try:
+            response = await get_llm_scheduler().run(
+                self.llm_auditor.ainvoke,
+                self._auditor_messages(state),
+                call_stats,
+                timeout=left,
+            )
+        except asyncio.TimeoutError:
+            return self._deadline_update(state, "auditor", timer)
+        return self._auditor_update(state, response, timer, call_stats)
+
+    # --- Speculative drafts ---
+    # One round runs several Reviewer drafts at once. Each draft goes through
+    # the validator and, if needed, its own Auditor call; the first draft to
+    # pass ends the round and the others are cancelled. If none passes, the
+    # first draft and its feedback continue the conversation, as in the
+    # serial loop.
+    def _draft_count(self, state: GraphState) -> int:
+        budget = self.speculative.token_budget
+        if budget and state.get("speculative_tokens", 0) >= budget:
+            return 1  # Extra-token budget spent: fall back to one draft
+        return self.speculative.drafts
+
+    def _draft_record(
+        self, state: GraphState, tier: str, index: int, response, timer, call_stats
+    ):
+        """A finished draft, before its verdict."""
+        attempt = state["retry_count"] + 1
+        text, parsed, message = self._reviewer_result(response)
+        entry = {
+            **usage_entry("reviewer", attempt, message, self.routing.model_for(tier)),
+            "draft": index,
+        }
+        if parsed.missing_fields():
+            record_parse("failures")
+        elif parsed.source == "text":
+            record_parse("text_parsed")
+        return {
+            "draft": index,
+            "text": text,
+            "parsed": parsed,
+            "usage": [entry],
+            "spans": [
+                llm_span(
+                    "reviewer",
+                    timer,
+                    attempt,
+                    entry,
+                    call_stats,
+                    tier=tier,
+                    draft=index,
+                )
+            ],
+            "verdict": None,  # Stays None if the draft is cancelled
+            "feedback": "",
+            "validated": False,
+        }
+
+    def _draft_check(self, record: Dict[str, Any], tier: str) -> bool:
+        """Local verdict for a draft; True when it still needs an Auditor call."""
+        if tier == FAST and self.routing.is_borderline(record["parsed"].score):
+            record["verdict"], record["feedback"] = (
+                ESCALATE,
+                CASCADE_ESCALATION_FEEDBACK,
+            )
+            return False
+        if not self.validate:
+            return True
+        verdict, detail = validate_reviewer_output(record["text"], record["parsed"])
+        record_verdict(verdict)
+        if verdict == AUDIT:
+            return True
+        record["validated"] = True
+        record["verdict"] = "FAIL" if verdict == RETRY else "PASS"
+        record["feedback"] = detail
+        return False
+
+    def _draft_audited(self, state: GraphState, record, response, timer, call_stats):
+        result = response.content.strip()
+        record["verdict"] = "PASS" if result.upper() == "PASS" else "FAIL"
+        record["feedback"] = result
+        entry = {
+            **usage_entry(
+                "auditor", state["retry_count"] + 1, response, self.routing.auditor
+            ),
+            "draft": record["draft"],
+        }
+        record["usage"].append(entry)
+        record["spans"].append(
+            llm_span(
+                "auditor",
+                timer,
+                state["retry_count"] + 1,
+                entry,
+                call_stats,
+                verdict=record["verdict"],
+                draft=record["draft"],
+            )
+        )
+
+    def _draft_audit_messages(self, state: GraphState, record):
+        return self._auditor_messages({**state, "reviewer_output": record["text"]})
+
+    def _run_draft(self, state, tier, index, messages, records, round_over):
+        """
+        Sync twin of _arun_draft. A thread cannot be cancelled mid-call: once
+        `round_over` is set, a losing draft finishes its Reviewer call but
+        is not audited.
+        """
+        timer, call_stats = start_timer(), {}
+        try:
+            response = get_llm_scheduler().run_sync(
+                self.draft_calls[tier][index].invoke,
+                messages,
+                call_stats,
+                timeout=time_left(state),
+            )
+            record = self._draft_record(state, tier, index, response, timer, call_stats)
+            records.append(record)
+            if round_over.is_set():
+                return None
+            if self._draft_check(record, tier):
+                timer, call_stats = start_timer(), {}
+                response = get_llm_scheduler().run_sync(
+                    self.llm_auditor.invoke,
+                    self._draft_audit_messages(state, record),
+                    call_stats,
+                    timeout=time_left(state),
+                )
+                self._draft_audited(state, record, response, timer, call_stats)
+        except TimeoutError:
+            return None
+        return record
+
+    async def _arun_draft(self, state, tier, index, messages, records):
+        """Generates, checks and audits one draft; appends it to `records`."""
+        timer, call_stats = start_timer(), {}
+        try:
+            response = await get_llm_scheduler().run(
+                self.draft_calls[tier][index].ainvoke,
+                messages,
+                call_stats,
+                timeout=time_left(state),
+            )
+            record = self._draft_record(state, tier, index, response, timer, call_stats)
+            records.append(record)
+            if self._draft_check(record, tier):
+                timer, call_stats = start_timer(), {}
+                response = await get_llm_scheduler().run(
+                    self.llm_auditor.ainvoke,
+                    self._draft_audit_messages(state, record),
+                    call_stats,
+                    timeout=time_left(state),
+                )
+                self._draft_audited(state, record, response, timer, call_stats)
+        except asyncio.TimeoutError:
+            return None
+        return record
+
+    def _round_update(
+        self, state: GraphState, tier: str, count: int, records, accepted
+    ):
+        """Folds one round of drafts into a state update."""
+        attempt = state["retry_count"] + 1
+        records = sorted(records, key=lambda r: r["draft"])
+        history = list(state.get("conversation_history", []))
+        usage = list(state.get("llm_usage", []))
+        spans = list(state.get("spans", []))
+        extra_tokens = 0
+        avoided = 0
+        for record in records:
+            history.append(
+                {
+                    "role": "Reviewer",
+                    "content": record["text"],
+                    "timestamp": state["retry_count"],
+                    "model": self.routing.model_for(tier),
+                    "tier": tier,
+                    "draft": record["draft"],
+                }
+            )
+            if record["verdict"] is not None:
+                role = {ESCALATE: "Cascade"}.get(record["verdict"], "Auditor")
+                if record["validated"]:
+                    role = "Validator"
+                    avoided += 1
+                history.append(
+                    {
+                        "role": role,
+                        "content": record["feedback"] or record["verdict"],
+                        "timestamp": state["retry_count"],
+                        "draft": record["draft"],
+                    }
+                )
+            usage += record["usage"]
+            spans += record["spans"]
+            if record["draft"] > 0:
+                extra_tokens += sum(
+                    u["input_tokens"] + u["output_tokens"] for u in record["usage"]
+                )
+
+        update = {
+            "retry_count": attempt,
+            "conversation_history": history,
+            "llm_usage": usage,
+            "spans": spans,
+            "speculative_tokens": state.get("speculative_tokens", 0) + extra_tokens,
+            "auditor_calls_avoided": state.get("auditor_calls_avoided", 0) + avoided,
+        }
+        if accepted is not None:
+            print(f"\n>>> DRAFT {accepted['draft'] + 1} of {count} PASSED <<<")
+            return {
+                **update,
+                "reviewer_output": accepted["text"],
+                "reviewer_attempts": state.get("reviewer_attempts", [])
+                + [accepted["text"]],
+                "reviewer_tiers": state.get("reviewer_tiers", []) + [tier],
+                "reviewer_parsed": accepted["parsed"].model_dump(),
+                "model_tier": tier,
+                "accepted_draft": accepted["draft"],
+                "temp_status": "PASS",
+                "status_message": f"Draft {accepted['draft'] + 1} of {count} "
+                f"verified: PASS (Attempt {attempt})",
+            }
+
+        if not records:
+            return {**update, **self._deadline_update(state, "reviewer")}
+        # The lowest-numbered draft continues the conversation.
+        lead = records[0]
+        failures = list(state.get("parse_failures") or [])
+        if lead["parsed"].missing_fields():
+            failures.append(attempt)
+        update.update(
+            {
+                "reviewer_output": lead["text"],
+                "reviewer_attempts": state.get("reviewer_attempts", [])
+                + [lead["text"]],
+                "reviewer_tiers": state.get("reviewer_tiers", []) + [tier],
+                "reviewer_parsed": lead["parsed"].model_dump(),
+                "parse_failures": failures,
+            }
+        )
+        left = time_left(state)
+        if lead["verdict"] is None or (left is not None and left <= 0):
+            return {**update, **self._deadline_update({**state, **update}, "auditor")}
+
+        next_tier = tier
+        if tier == FAST:
+            reasons = {r["verdict"] for r in records}
+            record_escalation("borderline" if ESCALATE in reasons else "rejected")
+            next_tier = STRONG
+        print(f"!!! NO DRAFT PASSED (Attempt {attempt}): {lead['feedback']}")
+        return {
+            **update,
+            "feedback_history": state["feedback_history"] + [lead["feedback"]],
+            "model_tier": next_tier,
+            "temp_status": "FAIL",
+            "status_message": f"No draft of {count} passed (Attempt {attempt})",
+        }
+
+    def _speculate_start(self, state: GraphState):
+        tier = self._reviewer_tier(state)
+        count = self._draft_count(state)
+        print(
+            f"\n... Speculative round {state['retry_count'] + 1}: "
+            f"{count} Reviewer drafts ({tier} model)..."
+        )
+        return tier, count, self._reviewer_messages(state)
+
+    def node_speculate(self, state: GraphState):
+        """
+        Speculative round (sync): drafts and audits run in threads. Drafts
+        still running when one passes are not waited for.
+        """
+        left = time_left(state)
+        if left is not None and left <= 0:
+            return self._deadline_update(state, "reviewer")
+        tier, count, messages = self._speculate_start(state)
+        records: List[Dict[str, Any]] = []
+        accepted = None
+        errors: List[BaseException] = []
+        round_over = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=count, thread_name_prefix="draft")
+        try:
+            pending = {
+                pool.submit(
+                    self._run_draft, state, tier, i, messages, records, round_over
+                )
+                for i in range(count)
+            }
+            while pending and accepted is None:
+                left = time_left(state)
+                if left is not None and left <= 0:
+                    break  # Deadline
+                done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+                accepted = self._first_pass(accepted, done, errors)
+        finally:
+            round_over.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._raise_if_all_failed(errors, count)
+        # Copies: threads still running may go on changing their records.
+        finished = [
+            {**r, "usage": list(r["usage"]), "spans": list(r["spans"])}
+            for r in list(records)
+            if accepted is None or r["verdict"] is not None
+        ]
+        return self._round_update(state, tier, count, finished, accepted)
+
+    async def anode_speculate(self, state: GraphState):
+        """Speculative round (async): the first draft to pass cancels the rest."""
+        left = time_left(state)
+        if left is not None and left <= 0:
+            return self._deadline_update(state, "reviewer")
+        tier, count, messages = self._speculate_start(state)
+        records: List[Dict[str, Any]] = []
+        accepted = None
+        errors: List[BaseException] = []
+        tasks = [
+            asyncio.create_task(self._arun_draft(state, tier, i, messages, records))
+            for i in range(count)
+        ]
+        try:
+            pending = set(tasks)
+            while pending and accepted is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                accepted = self._first_pass(accepted, done, errors)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._raise_if_all_failed(errors, count)
+        # Drafts cancelled before their verdict are dropped, as in node_speculate.
+        finished = [r for r in records if accepted is None or r["verdict"] is not None]
+        return self._round_update(state, tier, count, finished, accepted)
+
+    @staticmethod
+    def _first_pass(accepted, done, errors: List[BaseException]):
+        """
+        Keeps the accepted draft; among simultaneous passes, the lowest-numbered.
+        Drafts that raised (e.g. out of retries) are skipped into `errors`.
+        """
+        finished = []
+        for draft in done:
+            error = draft.exception()
+            if error is None:
+                finished.append(draft.result())
+            else:
+                print(f"  > Draft failed ({type(error).__name__}): {error}")
+                errors.append(error)
+        if accepted is not None:
+            return accepted
+        passed = [r for r in finished if r is not None and r["verdict"] == "PASS"]
+        return min(passed, key=lambda r: r["draft"]) if passed else None
+
+    @staticmethod
+    def _raise_if_all_failed(errors: List[BaseException], count: int):
+        """A round fails only when every one of its drafts did."""
+        if len(errors) == count:
+            raise errors[0]
+
     def build_graph(self):
         workflow = StateGraph(GraphState)
 
         # Add Nodes
-        workflow.add_node("reviewer", self.node_1_reviewer)
-        workflow.add_node("auditor", self.node_2_auditor)
+        # Each node carries a sync and an async implementation, so the same
+        # compiled graph serves invoke() and astream()/ainvoke() without
+        # blocking the event loop on LLM calls.
+        workflow.add_node(
+            "reviewer",
+            RunnableLambda(self.node_1_reviewer, afunc=self.anode_1_reviewer),
+        )
+        workflow.add_node(
+            "auditor",
+            RunnableLambda(self.node_2_auditor, afunc=self.anode_2_auditor),
+        )
+
+        # The local validator (if on) sits between Reviewer and Auditor
+        review_check = "auditor"
+        if self.validate:
+            workflow.add_node("validator", self.node_validator)
+            review_check = "validator"
+
+        def prescreen_fired(state: GraphState) -> bool:
+            return bool((state.get("prescreen") or {}).get("fired"))
+
+        # In speculative mode the review loop is the "speculate" node; the
+        # serial Reviewer remains for the pre-screen's single cheap pass.
+        loop_entry = "reviewer"
+        if self.speculative.enabled:
+            workflow.add_node(
+                "speculate",
+                RunnableLambda(self.node_speculate, afunc=self.anode_speculate),
+            )
+            loop_entry = "speculate"
 
         # Set Entry Point
-        workflow.set_entry_point("reviewer")
+        if self.prescreen_mode == "off":
+            workflow.set_entry_point(loop_entry)
+        else:
+            workflow.add_node("prescreen", self.node_0_prescreen)
+            workflow.set_entry_point("prescreen")
+
+            def check_prescreen(state: GraphState):
+                if not prescreen_fired(state):
+                    return "loop"
+                return "end" if self.prescreen_mode == "fast" else "reviewer"
 
-        # Add Edges
-        workflow.add_edge("reviewer", "auditor")
+            workflow.add_conditional_edges(
+                "prescreen",
+                check_prescreen,
+                {"end": END, "reviewer": "reviewer", "loop": loop_entry},
+            )
 
         # Conditional Edge Logic
+        def check_reviewer(state: GraphState):
+            if state.get("temp_status") == DEADLINE:
+                return "end"
+            # A pre-screened (cheap) resume gets one Reviewer pass, no audit.
+            if prescreen_fired(state):
+                return "end"
+            if state.get("model_tier") == FAST and self.routing.is_borderline(
+                (state.get("reviewer_parsed") or {}).get("score")
+            ):
+                return "escalate"
+            return "check"
+
+        reviewer_routes = {"end": END, "check": review_check}
+        if self.routing.cascade_enabled:
+            workflow.add_node("escalate", self.node_escalate)
+            workflow.add_edge("escalate", "reviewer")
+            reviewer_routes["escalate"] = "escalate"
+        workflow.add_conditional_edges("reviewer", check_reviewer, reviewer_routes)
+
         def check_auditor_verdict(state: GraphState):
-            if state.get("temp_status") == "PASS":
+            if state.get("temp_status") in ("PASS", DEADLINE):
                 return "end"
             if state["retry_count"] >= 3:
                 print(
@@ -208,73 +1167,244 @@ class ResumeJudgeGraph:
         workflow.add_conditional_edges(
             "auditor", check_auditor_verdict, {"end": END, "retry": "reviewer"}
         )
+        if self.speculative.enabled:
+            workflow.add_conditional_edges(
+                "speculate", check_auditor_verdict, {"end": END, "retry": "speculate"}
+            )
+        if self.validate:
+
+            def check_validator_verdict(state: GraphState):
+                if state.get("temp_status") == AUDIT:
+                    return "audit"
+                return check_auditor_verdict(state)
+
+            workflow.add_conditional_edges(
+                "validator",
+                check_validator_verdict,
+                {"end": END, "retry": "reviewer", "audit": "auditor"},
+            )
 
         return workflow.compile()
 
 
+# --- 4. Shared Engine ---
+# One judge (LLM clients + compiled graph) per process, reused by every
+# request. It is rebuilt only when the model or connection settings change.
+_ENGINE: Optional[ResumeJudgeGraph] = None
+_ENGINE_KEY: Optional[tuple] = None
+_ENGINE_LOCK = threading.Lock()
+_CLOSING = set()  # aclose() tasks of replaced engines, kept until they finish
+
+
+def _get_api_key():
+    return os.getenv("OPENAI_API_KEY") or os.getenv("OPENAPI_KEY")
+
+
+def get_model_name() -> str:
+    return env_str("OPENAI_MODEL", DEFAULT_MODEL)
+
+
+def get_evaluation_deadline() -> float:
+    """Default per-evaluation time budget in seconds (0 = none)."""
+    return env_float("EVALUATION_DEADLINE", 0.0)
+
+
+def model_signature() -> str:
+    """Every model that can shape an evaluation, for result cache keys."""
+    return get_model_routing(get_model_name()).cache_tag()
+
+
+def _engine_config(model_name: Optional[str] = None) -> tuple:
+    return (
+        get_model_routing(model_name or get_model_name()),
+        _get_api_key(),
+        env_int("LLM_MAX_CONNECTIONS", 100),
+        env_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 20),
+        env_float("LLM_KEEPALIVE_EXPIRY", 60.0),
+        env_float("LLM_HTTP_TIMEOUT", 120.0),
+        get_prescreen_mode(),
+        validator_enabled(),
+        structured_output_enabled(),
+        get_speculative_config(),
+    )
+
+
+def _build_engine(config: tuple) -> ResumeJudgeGraph:
+    routing, _, max_conn, max_keepalive, keepalive_expiry, timeout = config[:6]
+    prescreen, validate, structured_output, speculative = config[6:]
+    limits = httpx.Limits(
+        max_connections=max_conn,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+    judge = ResumeJudgeGraph(
+        model_name=routing.reviewer,
+        http_client=httpx.Client(limits=limits, timeout=timeout),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout),
+        prescreen_mode=prescreen,
+        validate=validate,
+        structured_output=structured_output,
+        routing=routing,
+        speculative=speculative,
+    )
+    judge.get_app()
+    return judge
+
+
+def _close_engine_clients(engine: Optional[ResumeJudgeGraph]):
+    """
+    Closes the connection pools of an engine that is no longer shared.
+    Calls still running on it fail like any dropped connection.
+    """
+    if engine is None:
+        return
+    if engine.http_client is not None:
+        engine.http_client.close()
+    client = engine.http_async_client
+    if client is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        task = loop.create_task(client.aclose())
+        _CLOSING.add(task)
+        task.add_done_callback(_CLOSING.discard)
+        return
+    try:
+        asyncio.run(client.aclose())
+    except Exception as e:
+        # Its connections may belong to an event loop that is already gone.
+        print(f"  > Could not close old LLM client: {e}")
+
+
+def get_judge_engine(model_name: Optional[str] = None) -> ResumeJudgeGraph:
+    """
+    Returns the process-wide ResumeJudgeGraph with its compiled graph.
+    Built lazily on first use; rebuilt only if the configuration changed.
+    """
+    global _ENGINE, _ENGINE_KEY
+    config = _engine_config(model_name)
+    engine = _ENGINE
+    if engine is not None and _ENGINE_KEY == config:
+        return engine
+
+    replaced = None
+    with _ENGINE_LOCK:
+        if _ENGINE is None or _ENGINE_KEY != config:
+            print(f"  > Building judge engine (models={config[0].cache_tag()})")
+            replaced = _ENGINE
+            _ENGINE = _build_engine(config)
+            _ENGINE_KEY = config
+        engine = _ENGINE
+    _close_engine_clients(replaced)
+    return engine
+
+
+def reset_judge_engine():
+    """Drops the shared engine so the next call rebuilds it."""
+    global _ENGINE, _ENGINE_KEY
+    with _ENGINE_LOCK:
+        replaced = _ENGINE
+        _ENGINE = None
+        _ENGINE_KEY = None
+    _close_engine_clients(replaced)
+
+
+def pipeline_version() -> str:
+    """PROMPT_VERSION plus the settings that change what an evaluation says."""
+    version = PROMPT_VERSION + prescreen_cache_tag()
+    if structured_output_enabled():
+        version += "+structured"
+    if get_extract_mode() == COMPACT:
+        version += "+compact"
+    return version
+
+
+# Kept for callers that need a single field; each is one parser pass.
 def extract_score(text):
-    # Try multiple patterns from strict to loose
-    patterns = [
-        r"(?:Score|คะแนน)\s*(?:\(0-10\))?:\s*(\d+(\.\d+)?)",  # Score: 8.5
-        r"(?:Score|คะแนน)\s*[-]*\s*(\d+(\.\d+)?)",  # Score - 8.5
-        r"(\d+(\.\d+)?)\s*\/\s*10",  # 8.5 / 10
-    ]
-    for p in patterns:
-        match = re.search(p, text, re.IGNORECASE)
-        if match:
-            return match.group(1)
-
-    # Fallback: Look for the first standalone number between 0-10 on a line starting with Score/คะแนน
-    fallback = re.search(r"(?:Score|คะแนน).*?(\d+(\.\d+)?)", text, re.IGNORECASE)
-    if fallback:
-        val = float(fallback.group(1))
-        if 0 <= val <= 10:
-            return str(val)
-
-    return "N/A"
+    return parse_evaluation_text(text).score or "N/A"
 
 
 def extract_name(text):
-    match = re.search(r"(?:Name|ชื่อ)\s*[:\-]?\s*(.*)", text, re.IGNORECASE)
-    if match:
-        return match.group(1).strip().strip("*")
-    return "Candidate"
+    return parse_evaluation_text(text).name or "Candidate"
 
 
 def extract_email(text):
-    # Standard email regex
-    match = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", text)
-    if match:
-        return match.group(0)
-    return "N/A"
+    return parse_evaluation_text(text).email or "N/A"
 
 
-def evaluate_resume(resume_text: str, job_description: str):
-    judge_graph = ResumeJudgeGraph()
-    app = judge_graph.build_graph()
+def final_parsed(final_state: Dict[str, Any]) -> ParsedEvaluation:
+    """Fields of the final evaluation, reusing what the Reviewer node parsed."""
+    text = final_state.get("reviewer_output", "")
+    parsed = final_state.get("reviewer_parsed")
+    if parsed and (final_state.get("reviewer_attempts") or [None])[-1] == text:
+        return ParsedEvaluation(**parsed)
+    return parse_evaluation_text(text)
+
 
-    initial_state = {
+def initial_graph_state(
+    resume_text: str,
+    job_description: str,
+    jd_requirements: Optional[List[str]] = None,
+    prescreen: Optional[Dict[str, Any]] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Starting state for one run of the judge graph."""
+    return {
+        "deadline": deadline,
+        "deadline_exceeded": False,
         "resume_text": resume_text,
         "job_description": job_description,
+        "jd_requirements": jd_requirements or [],
+        "prescreen": prescreen,
+        "auditor_calls_avoided": 0,
+        "speculative_tokens": 0,
+        "accepted_draft": None,
+        "reviewer_parsed": None,
+        "parse_failures": [],
         "reviewer_output": "",
         "feedback_history": [],
+        "reviewer_attempts": [],
+        "reviewer_tiers": [],
+        "model_tier": "",
+        "llm_usage": [],
+        "spans": [],
         "conversation_history": [],
         "retry_count": 0,
         "temp_status": "START",
+        "status_message": "Starting Multi-Agent Analysis...",
     }
 
+
+def evaluate_resume(resume_text: str, job_description: str):
+    app = get_judge_engine().get_app()
+
+    initial_state = initial_graph_state(resume_text, job_description)
+
     final_state = app.invoke(initial_state)
 
     evaluation_text = final_state["reviewer_output"]
-    score = extract_score(evaluation_text)
-    name = extract_name(evaluation_text)
-    email = extract_email(evaluation_text)
+    parsed = final_parsed(final_state)
     conversation_log = final_state["conversation_history"]
+    tier = final_tier(final_state)
+    if tier is not None:
+        record_result_tier(tier)
 
     return {
-        "score": score,
-        "name": name,
-        "email": email,
+        "score": parsed.score or "N/A",
+        "name": parsed.name or "Candidate",
+        "email": parsed.email or "N/A",
+        "evaluation": parsed.fields(),
+        "parse_failures": len(final_state.get("parse_failures") or []),
         "analysis": evaluation_text,
         "conversation_log": conversation_log,
+        "llm_usage": final_state.get("llm_usage", []),
+        "spans": final_state.get("spans", []),
+        "prescreen": final_state.get("prescreen"),
+        "auditor_calls_avoided": final_state.get("auditor_calls_avoided", 0),
+        "model_tier": tier,
+        "accepted_draft": final_state.get("accepted_draft"),
+        "speculative_tokens": final_state.get("speculative_tokens", 0),
     }
@@ -0,0 +1,154 @@
+import hashlib
+import sys
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional
+
+from services.config import env_bool, env_int
+from services.dedup import Fingerprint, fingerprint
+from services.ocr import PDFBuffer, resume_sections
+from services.prescreen import term_counts
+from services.tokens import estimate_tokens
+
+# --- Extracted-resume artifacts ---
+# Everything derived from the PDF alone: the extracted text, its token count,
+# its sections and, when the pre-screen or the duplicate check is on, the
+# lexical term counts and the MinHash signature they use. None of it depends
+# on the JD, so re-running the same resumes against an edited JD reuses it
+# instead of parsing every PDF again. Results that do depend on the JD stay
+# in the result cache (services/cache.py).
+
+
+@dataclass
+class ResumeArtifacts:
+    text: str
+    token_count: int
+    sections: Dict[str, str]
+    term_counts: Optional[Counter] = None  # Lexical vector for the pre-screen
+    fingerprint: Optional[Fingerprint] = None  # For the near-duplicate check
+    nbytes: int = field(default=0, compare=False)
+
+
+def _footprint(artifacts: ResumeArtifacts) -> int:
+    # Approximate: the strings plus the signature, not object headers.
+    nbytes = sys.getsizeof(artifacts.text) + sum(
+        sys.getsizeof(body) for body in artifacts.sections.values()
+    )
+    if artifacts.term_counts is not None:
+        nbytes += sum(sys.getsizeof(term) + 8 for term in artifacts.term_counts)
+    if artifacts.fingerprint is not None:
+        nbytes += artifacts.fingerprint.signature.nbytes
+    return nbytes
+
+
+def build_artifacts(
+    text: str, counts: bool = False, signature: bool = False
+) -> ResumeArtifacts:
+    """The text features; term counts and the signature only when asked for."""
+    artifacts = ResumeArtifacts(
+        text=text, token_count=estimate_tokens(text), sections=resume_sections(text)
+    )
+    return complete_artifacts(artifacts, counts, signature)
+
+
+def complete_artifacts(
+    artifacts: ResumeArtifacts, counts: bool = False, signature: bool = False
+) -> ResumeArtifacts:
+    """`artifacts`, or a copy that adds the features asked for and missing."""
+    add_counts = counts and artifacts.term_counts is None
+    add_signature = signature and artifacts.fingerprint is None
+    if artifacts.nbytes and not (add_counts or add_signature):
+        return artifacts
+    # A copy, so a cached entry's size never changes under the cache.
+    artifacts = replace(
+        artifacts,
+        term_counts=(
+            term_counts(artifacts.text) if add_counts else artifacts.term_counts
+        ),
+        fingerprint=(
+            fingerprint(artifacts.text) if add_signature else artifacts.fingerprint
+        ),
+    )
+    artifacts.nbytes = _footprint(artifacts)
+    return artifacts
+
+
+def artifact_key(file_bytes: PDFBuffer, extract_mode: str) -> str:
+    """Content address of one PDF as extracted in one mode."""
+    digest = hashlib.sha256(extract_mode.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(file_bytes)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """LRU cache of ResumeArtifacts, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ResumeArtifacts]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[ResumeArtifacts]:
+        with self._lock:
+            artifacts = self._entries.get(key)
+            if artifacts is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return artifacts
+
+    def put(self, key: str, artifacts: ResumeArtifacts):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            if artifacts.nbytes > self.max_bytes:
+                return
+            self._entries[key] = artifacts
+            self._bytes += artifacts.nbytes
+            while self._bytes > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= oldest.nbytes
+                self.stats["evictions"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# --- Shared instance ---
+_CACHE: Optional[ArtifactCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def artifact_cache_enabled() -> bool:
+    return env_bool("ARTIFACT_CACHE_ENABLED", True)
+
+
+def get_artifact_cache() -> ArtifactCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ArtifactCache(
+                    max_bytes=env_int("ARTIFACT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+                )
+    return _CACHE
+
+
+def reset_artifact_cache():
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = None
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from services.config import env_bool, env_int, env_float, env_str
+
+
+def evaluation_cache_key(
+    file_bytes: bytes, job_description: str, model_name: str, prompt_version: str
+) -> str:
+    """Content address of one evaluation: same PDF + JD + model + prompts."""
+    digest = hashlib.sha256()
+    for part in (
+        file_bytes,
+        job_description.encode("utf-8"),
+        model_name.encode("utf-8"),
+        prompt_version.encode("utf-8"),
+    ):
+        # Length-prefix every part so different splits never collide.
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+# --- Persistent tier (optional) ---
+@lru_cache(maxsize=1)
+def _cached_evaluation_model():
+    # sqlmodel is only imported when the persistent tier is switched on.
+    from sqlmodel import Field, SQLModel
+
+    class CachedEvaluation(SQLModel, table=True):
+        __tablename__ = "cached_evaluation"
+
+        key: str = Field(primary_key=True)
+        payload: str
+        expires_at: float = Field(index=True)
+
+    return CachedEvaluation
+
+
+class SQLiteResultStore:
+    """Second-level cache in a local SQLite file, shared by all workers."""
+
+    def __init__(self, path: str):
+        from sqlmodel import Session, create_engine, delete
+
+        self._model = _cached_evaluation_model()
+        self._session = Session
+        self._delete = delete
+        self._engine = create_engine(
+            f"sqlite:///{path}", connect_args={"check_same_thread": False}
+        )
+        self._model.__table__.create(self._engine, checkfirst=True)
+
+    def get(self, key: str, now: float) -> Optional[tuple]:
+        with self._session(self._engine) as session:
+            row = session.get(self._model, key)
+            if row is None:
+                return None
+            if row.expires_at <= now:
+                session.delete(row)
+                session.commit()
+                return None
+            return json.loads(row.payload), row.expires_at
+
+    def put(self, key: str, payload: str, expires_at: float, now: float):
+        with self._session(self._engine) as session:
+            # Expired rows are purged on write so the file stays bounded by TTL.
+            session.exec(self._delete(self._model).where(self._model.expires_at <= now))
+            session.merge(self._model(key=key, payload=payload, expires_at=expires_at))
+            session.commit()
+
+
+# --- Result cache ---
+class ResultCache:
+    """
+    LRU cache of final `completed` events, bounded by total bytes and TTL.
+    An optional SQLiteResultStore acts as a slower, persistent second tier.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        store: Optional[SQLiteResultStore] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "store_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def _drop(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _insert(self, key: str, value: Dict[str, Any], size: int, expires_at: float):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+
+    def _get_memory(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, _, expires_at = entry
+            if expires_at <= now:
+                self._drop(key)
+                self.stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self.stats["memory_hits"] += 1
+            return value
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = self._clock()
+        value = self._get_memory(key, now)
+        if value is not None:
+            return value
+
+        if self.store is not None:
+            found = self.store.get(key, now)
+            if found is not None:
+                value, expires_at = found
+                size = len(json.dumps(value).encode("utf-8"))
+                self._insert(key, value, size, expires_at)
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self.stats["store_hits"] += 1
+                return value
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        payload = json.dumps(value)
+        now = self._clock()
+        expires_at = now + self.ttl_seconds
+        self._insert(key, value, len(payload.encode("utf-8")), expires_at)
+        if self.store is not None:
+            self.store.put(key, payload, expires_at, now)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.store is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, value: Dict[str, Any]):
+        if self.store is None:
+            return self.put(key, value)
+        await asyncio.to_thread(self.put, key, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self.store is not None,
+            }
+
+
+# --- Shared instance ---
+_CACHE: Optional[ResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def result_cache_enabled() -> bool:
+    # Opt-out switch for deployments that must stay fully stateless.
+    return env_bool("RESULT_CACHE_ENABLED", True)
+
+
+def get_result_cache() -> ResultCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                db_path = env_str("RESULT_CACHE_DB", "")
+                _CACHE = ResultCache(
+                    max_bytes=env_int("RESULT_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+                    ttl_seconds=env_float("RESULT_CACHE_TTL", 3600.0),
+                    store=SQLiteResultStore(db_path) if db_path else None,
+                )
+    return _CACHE
+
+
+def reset_result_cache():
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = None
@@ -0,0 +1,50 @@
+import os
+from typing import Tuple
+
+# --- Environment helpers ---
+# All tunables are read from environment variables so that the same build
+# runs unchanged on a laptop, a container or a serverless instance.
+
+
+def env_str(name: str, default: str = "") -> str:
+    value = os.getenv(name)
+    return value.strip() if value and value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    try:
+        return int(value) if value not in (None, "") else default
+    except ValueError:
+        print(f"  > Warning: {name}={value!r} is not an integer, using {default}")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    try:
+        return float(value) if value not in (None, "") else default
+    except ValueError:
+        print(f"  > Warning: {name}={value!r} is not a number, using {default}")
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_floats(name: str, default: Tuple[float, ...]) -> Tuple[float, ...]:
+    """Comma-separated numbers, e.g. "0.5,0.2,0.8"."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return tuple(float(item) for item in value.split(",") if item.strip())
+    except ValueError:
+        print(
+            f"  > Warning: {name}={value!r} is not a list of numbers, using {default}"
+        )
+        return default
@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.config import env_float, env_int, env_str
+from services.prescreen import THAI_NGRAM, THAI_RUN_RE
+
+# --- Near-duplicate resume detection ---
+# Candidates resubmit the same resume with small edits, and recruiters upload
+# the same file under different names. After extraction every resume gets a
+# MinHash signature over shingles of its normalized tokens; a bounded index
+# per JD (and pipeline settings) finds earlier resumes whose estimated Jaccard
+# similarity reaches DUPLICATE_THRESHOLD, before any LLM call is made.
+SHINGLE_TOKENS = 3
+NUM_PERM = 128
+MAX_SCOPES = 16  # JD/settings combinations kept; the least recent is dropped
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+EMPTY_SLOT = np.iinfo(np.uint64).max  # Never produced by a MinHash value
+
+# Words and numbers ("3.75" stays whole), or runs of Thai script.
+TOKEN_RE = re.compile(r"[\u0e00-\u0e7f]+|[^\W_]+(?:\.[^\W_]+)*")
+
+_rng = np.random.default_rng(0x5C2)
+_PERM_A = _rng.integers(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+DUPLICATE_MODES = ("off", "flag", "reuse")
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    digest: str  # sha256 of the normalized token stream (exact duplicates)
+    signature: np.ndarray  # NUM_PERM MinHash values (near duplicates)
+
+
+def normalized_tokens(text: str) -> List[str]:
+    """
+    Case, width and layout folded away. Unlike the pre-screen tokenizer,
+    numbers, short words and stopwords stay: resumes that differ only in
+    dates, years of experience or GPA are not the same resume.
+    """
+    tokens = []
+    for token in TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold()):
+        if THAI_RUN_RE.fullmatch(token) and len(token) > THAI_NGRAM:
+            # Thai has no spaces: overlapping trigrams, as in the pre-screen.
+            tokens.extend(token[i : i + THAI_NGRAM] for i in range(len(token) - 2))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _folded(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def same_candidate(result: Dict[str, Any], text: str) -> bool:
+    """
+    Whether the name and email in an evaluation (the original's) also appear
+    in `text` (the copy's). A template resume sent by someone else must not
+    be answered with another candidate's evaluation.
+    """
+    folded = _folded(text)
+    for key, unknown in (("candidate_name", "candidate"), ("email", "n/a")):
+        value = _folded(str(result.get(key) or ""))
+        if value and value != unknown and value not in folded:
+            return False
+    return True
+
+
+def fingerprint(text: str) -> Fingerprint:
+    tokens = normalized_tokens(text)
+    digest = hashlib.sha256(" ".join(tokens).encode("utf-8")).hexdigest()
+    if len(tokens) <= SHINGLE_TOKENS:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {
+            " ".join(tokens[i : i + SHINGLE_TOKENS])
+            for i in range(len(tokens) - SHINGLE_TOKENS + 1)
+        }
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    # a < 2^32 and h < 2^32, so a*h + b stays below 2^64.
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % MERSENNE_PRIME
+    return Fingerprint(digest, permuted.min(axis=1))
+
+
+class DuplicateEntry:
+    """
+    An indexed resume. Once its own evaluation completes, `result_key` is
+    where the result cache holds it; the result itself is not kept here, so
+    it lives only as long as the cache's byte budget and TTL allow.
+    """
+
+    def __init__(self, scope: str, slot: int, file_name: str, digest: str):
+        self.scope = scope
+        self.slot = slot
+        self.file_name = file_name
+        self.digest = digest
+        self.created_at = time.time()
+        self.result_key: Optional[str] = None
+        self.score: Optional[str] = None
+        self.settled = False  # Completed, or failed and removed
+        self._settled = asyncio.Event()
+
+    async def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """The original's result-cache key, or None if it failed (or timed out)."""
+        if not self.settled:
+            try:
+                await asyncio.wait_for(self._settled.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.result_key
+
+
+@dataclass
+class DuplicateMatch:
+    entry: DuplicateEntry
+    similarity: float
+    exact: bool
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "file_name": self.entry.file_name,
+            "similarity": round(self.similarity, 4),
+            "exact": self.exact,
+            "score": self.entry.score,
+        }
+
+
+class _Scope:
+    """Fixed-size ring of signatures for one JD; the oldest slot is reused."""
+
+    def __init__(self, capacity: int):
+        self.signatures = np.full((capacity, NUM_PERM), EMPTY_SLOT, dtype=np.uint64)
+        self.entries: List[Optional[DuplicateEntry]] = [None] * capacity
+        self.digests: Dict[str, DuplicateEntry] = {}
+        self.next_slot = 0
+
+
+class DuplicateIndex:
+    def __init__(self, threshold: float, capacity: int):
+        self.threshold = threshold
+        self.capacity = max(1, capacity)
+        self._scopes: "OrderedDict[str, _Scope]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "checked": 0,
+            "exact_duplicates": 0,
+            "near_duplicates": 0,
+            "reused": 0,
+            "flagged": 0,
+            "originals_failed": 0,
+            "other_candidate": 0,
+            "evictions": 0,
+        }
+
+    def find_or_add(
+        self, scope_key: str, resume: Fingerprint, file_name: str
+    ) -> Tuple[Optional[DuplicateMatch], Optional[DuplicateEntry]]:
+        """
+        The closest earlier resume at or above the threshold, or else a new
+        entry for this one. Done under one lock, so of two copies arriving
+        together exactly one becomes the original.
+        """
+        with self._lock:
+            self.stats["checked"] += 1
+            scope = self._scopes.get(scope_key)
+            if scope is None:
+                scope = self._scopes[scope_key] = _Scope(self.capacity)
+                if len(self._scopes) > MAX_SCOPES:
+                    _, dropped = self._scopes.popitem(last=False)
+                    self.stats["evictions"] += len(dropped.digests)
+            self._scopes.move_to_end(scope_key)
+
+            same = scope.digests.get(resume.digest)
+            if same is not None:
+                self.stats["exact_duplicates"] += 1
+                return DuplicateMatch(same, 1.0, True), None
+            similarity = (scope.signatures == resume.signature).mean(axis=1)
+            best = int(similarity.argmax())
+            if similarity[best] >= self.threshold:
+                self.stats["near_duplicates"] += 1
+                match = DuplicateMatch(
+                    scope.entries[best], float(similarity[best]), False
+                )
+                return match, None
+
+            slot = scope.next_slot
+            scope.next_slot = (slot + 1) % self.capacity
+            old = scope.entries[slot]
+            if old is not None:
+                scope.digests.pop(old.digest, None)
+                self.stats["evictions"] += 1
+            entry = DuplicateEntry(scope_key, slot, file_name, resume.digest)
+            scope.entries[slot] = entry
+            scope.signatures[slot] = resume.signature
+            scope.digests[resume.digest] = entry
+            return None, entry
+
+    def complete(self, entry: DuplicateEntry, result_key: str, score: Optional[str]):
+        entry.result_key = result_key
+        entry.score = score
+        entry.settled = True
+        entry._settled.set()
+
+    def abandon(self, entry: DuplicateEntry):
+        """The original failed: later copies must not wait for or match it."""
+        self.forget(entry)
+        with self._lock:
+            self.stats["originals_failed"] += 1
+        entry.settled = True
+        entry._settled.set()
+
+    def forget(self, entry: DuplicateEntry):
+        """Drops an entry, e.g. once the result cache no longer holds its result."""
+        with self._lock:
+            scope = self._scopes.get(entry.scope)
+            if scope is not None and scope.entries[entry.slot] is entry:
+                scope.entries[entry.slot] = None
+                scope.signatures[entry.slot] = EMPTY_SLOT
+                scope.digests.pop(entry.digest, None)
+
+    def record_other_candidate(self):
+        with self._lock:
+            self.stats["other_candidate"] += 1
+
+    def record_skip(self, mode: str):
+        with self._lock:
+            self.stats["reused" if mode == "reuse" else "flagged"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "skipped": self.stats["reused"] + self.stats["flagged"],
+                "entries": sum(len(s.digests) for s in self._scopes.values()),
+                "scopes": len(self._scopes),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "mode": get_duplicate_mode(),
+            }
+
+
+# --- Settings ---
+def get_duplicate_mode() -> str:
+    # off: no check | flag: stop with a `duplicate` error, no LLM call
+    # reuse: answer with the earlier evaluation of the same resume
+    mode = env_str("DUPLICATE_MODE", "off").lower()
+    return mode if mode in DUPLICATE_MODES else "off"
+
+
+# --- Shared instance ---
+_INDEX: Optional[DuplicateIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = DuplicateIndex(
+                    threshold=env_float("DUPLICATE_THRESHOLD", 0.9),
+                    capacity=env_int("DUPLICATE_INDEX_SIZE", 500),
+                )
+    return _INDEX
+
+
+def reset_duplicate_index():
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = None
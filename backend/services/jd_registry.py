@@ -0,0 +1,295 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from services.config import env_float, env_int, env_str
+from services.tokens import estimate_tokens
+
+
+class JobDescriptionProfile(BaseModel):
+    """A registered JD plus everything derived from it at registration."""
+
+    jd_id: str
+    content: str
+    normalized_text: str
+    token_count: int
+    requirements: List[str]
+    created_at: float
+
+
+# --- Per-JD precomputation ---
+BULLET_RE = re.compile(r"^\s*(?:[-*•●▪◦·]|\d{1,2}[.)]|\(\d{1,2}\))\s+")
+HEADING_RE = re.compile(r"^[A-Za-z\u0e00-\u0e7f /&()-]{3,40}:?$")
+REQUIREMENT_HEADINGS = (
+    "requirement",
+    "qualification",
+    "skill",
+    "responsibilit",
+    "must have",
+    "nice to have",
+    "คุณสมบัติ",
+    "ทักษะ",
+    "หน้าที่",
+    "ความรับผิดชอบ",
+)
+
+
+def normalize_jd_text(text: str) -> str:
+    """NFC-normalizes, unifies bullets and collapses layout whitespace."""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n")
+    lines = []
+    for raw in text.split("\n"):
+        line = re.sub(r"[ \t\u00a0\u200b]+", " ", raw).strip()
+        if not line:
+            continue
+        line = BULLET_RE.sub("- ", line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _is_heading(line: str) -> bool:
+    return not line.startswith("- ") and bool(HEADING_RE.match(line))
+
+
+def extract_requirements(normalized_text: str) -> List[str]:
+    """
+    Pulls the requirement list out of a normalized JD: bullet lines, plus
+    every line under a Requirements/Skills/Responsibilities-style heading.
+    Falls back to all non-heading lines after the title.
+    """
+    requirements = []
+    in_section = False
+    for line in normalized_text.split("\n"):
+        if _is_heading(line):
+            lowered = line.lower()
+            in_section = any(h in lowered for h in REQUIREMENT_HEADINGS)
+            continue
+        if line.startswith("- ") or in_section:
+            item = line[2:] if line.startswith("- ") else line
+            if item not in requirements:
+                requirements.append(item)
+
+    if not requirements:
+        lines = normalized_text.split("\n")[1:]
+        requirements = [line for line in lines if not _is_heading(line)]
+    return requirements
+
+
+def jd_id_for(normalized_text: str) -> str:
+    return hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()[:16]
+
+
+def build_profile(content: str, created_at: Optional[float] = None):
+    normalized = normalize_jd_text(content)
+    return JobDescriptionProfile(
+        jd_id=jd_id_for(normalized),
+        content=content,
+        normalized_text=normalized,
+        token_count=estimate_tokens(normalized),
+        requirements=extract_requirements(normalized),
+        created_at=created_at if created_at is not None else time.time(),
+    )
+
+
+# --- Storage ---
+@lru_cache(maxsize=1)
+def _job_description_model():
+    from sqlmodel import Field, SQLModel
+
+    class JobDescriptionRecord(SQLModel, table=True):
+        __tablename__ = "job_description"
+
+        jd_id: str = Field(primary_key=True)
+        content: str
+        normalized_text: str
+        token_count: int
+        requirements_json: str
+        created_at: float = Field(index=True)
+
+    return JobDescriptionRecord
+
+
+def default_registry_path() -> str:
+    # The temp dir is writable on serverless hosts and shared by all
+    # workers of one instance; point JD_REGISTRY_DB elsewhere to persist.
+    return os.path.join(tempfile.gettempdir(), "skrut_jd_registry.db")
+
+
+class JobDescriptionRegistry:
+    """
+    JDs keyed by content-hash id in a small SQLite file, so every worker
+    process sees the same JDs. The latest registration is the "current" JD.
+
+    A JD expires `ttl_seconds` after its last registration, and only the
+    `max_entries` most recent are kept (0 = no limit for either). Expired
+    and surplus rows are deleted on every registration.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        memo_size: int = 64,
+        ttl_seconds: float = 0.0,
+        max_entries: int = 0,
+    ):
+        from sqlmodel import Session, create_engine, delete, select
+
+        self._model = _job_description_model()
+        self._session = Session
+        self._select = select
+        self._delete = delete
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._engine = create_engine(
+            f"sqlite:///{path}",
+            connect_args={"check_same_thread": False, "timeout": 10},
+        )
+        self._model.__table__.create(self._engine, checkfirst=True)
+        # Profiles never change for a given id, so they can be memoized.
+        self._memo: "OrderedDict[str, JobDescriptionProfile]" = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+
+    def _to_profile(self, row) -> JobDescriptionProfile:
+        return JobDescriptionProfile(
+            jd_id=row.jd_id,
+            content=row.content,
+            normalized_text=row.normalized_text,
+            token_count=row.token_count,
+            requirements=json.loads(row.requirements_json),
+            created_at=row.created_at,
+        )
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self._ttl > 0 and created_at <= now - self._ttl
+
+    def _live(self, query, now: float):
+        if self._ttl > 0:
+            query = query.where(self._model.created_at > now - self._ttl)
+        return query
+
+    def _prune(self, session, now: float):
+        ids = self._select(self._model.jd_id)
+        doomed = []
+        if self._ttl > 0:
+            doomed += session.exec(
+                ids.where(self._model.created_at <= now - self._ttl)
+            ).all()
+        if self._max_entries > 0:
+            doomed += session.exec(
+                self._live(ids, now)
+                .order_by(self._model.created_at.desc())
+                .offset(self._max_entries)
+            ).all()
+        if not doomed:
+            return
+        session.exec(self._delete(self._model).where(self._model.jd_id.in_(doomed)))
+        with self._lock:
+            for jd_id in doomed:
+                self._memo.pop(jd_id, None)
+
+    def _remember(self, profile: JobDescriptionProfile):
+        with self._lock:
+            self._memo[profile.jd_id] = profile
+            self._memo.move_to_end(profile.jd_id)
+            while len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+
+    def register(self, content: str) -> JobDescriptionProfile:
+        """Processes a JD once and makes it the current one."""
+        profile = build_profile(content)
+        with self._session(self._engine) as session:
+            row = session.get(self._model, profile.jd_id)
+            if row is None:
+                row = self._model(
+                    jd_id=profile.jd_id,
+                    content=profile.content,
+                    normalized_text=profile.normalized_text,
+                    token_count=profile.token_count,
+                    requirements_json=json.dumps(
+                        profile.requirements, ensure_ascii=False
+                    ),
+                    created_at=profile.created_at,
+                )
+            else:
+                # Re-registering identical text just makes it current again.
+                row.created_at = profile.created_at
+            session.add(row)
+            session.flush()
+            self._prune(session, profile.created_at)
+            session.commit()
+            session.refresh(row)
+            profile = self._to_profile(row)
+        self._remember(profile)
+        return profile
+
+    def get(self, jd_id: str) -> Optional[JobDescriptionProfile]:
+        now = time.time()
+        with self._lock:
+            memo = self._memo.get(jd_id)
+        if memo is not None and not self._expired(memo.created_at, now):
+            return memo
+        with self._session(self._engine) as session:
+            row = session.get(self._model, jd_id)
+            if row is None or self._expired(row.created_at, now):
+                return None
+            profile = self._to_profile(row)
+        self._remember(profile)
+        return profile
+
+    def current(self) -> Optional[JobDescriptionProfile]:
+        with self._session(self._engine) as session:
+            row = session.exec(
+                self._live(self._select(self._model), time.time())
+                .order_by(self._model.created_at.desc())
+                .limit(1)
+            ).first()
+            return self._to_profile(row) if row is not None else None
+
+    def resolve(self, jd_id: Optional[str] = None):
+        """The requested JD, or the current one when no id is given."""
+        return self.get(jd_id) if jd_id else self.current()
+
+    def list(self, limit: int = 50) -> List[JobDescriptionProfile]:
+        with self._session(self._engine) as session:
+            rows = session.exec(
+                self._live(self._select(self._model), time.time())
+                .order_by(self._model.created_at.desc())
+                .limit(limit)
+            ).all()
+            return [self._to_profile(row) for row in rows]
+
+
+# --- Shared instance ---
+_REGISTRY: Optional[JobDescriptionRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_jd_registry() -> JobDescriptionRegistry:
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                path = env_str("JD_REGISTRY_DB", default_registry_path())
+                _REGISTRY = JobDescriptionRegistry(
+                    path,
+                    ttl_seconds=env_float("JD_REGISTRY_TTL", 7 * 24 * 3600.0),
+                    max_entries=env_int("JD_REGISTRY_MAX_ENTRIES", 200),
+                )
+    return _REGISTRY
+
+
+def reset_jd_registry():
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        _REGISTRY = None
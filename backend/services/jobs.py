@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from services.config import env_float, env_int
+
+# --- Background evaluation jobs ---
+# POST /jobs queues an evaluation and returns at once; a fixed pool of worker
+# tasks on the app's event loop runs the queued jobs. Every event a job emits
+# is kept in order, so a client can (re)connect to GET /jobs/{id}/events at
+# any offset and replay what it missed before following the live stream.
+# Finished jobs are dropped after a short TTL.
+
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = ("completed", "error")
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when the bounded job queue has no room."""
+
+
+class EvaluationJob:
+    def __init__(
+        self, job_id: str, file_name: str, run: Callable[[], AsyncIterator[dict]]
+    ):
+        self.job_id = job_id
+        self.file_name = file_name
+        self.status = QUEUED
+        self.events: List[Dict[str, Any]] = []
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._run = run  # Holds the upload until the job has run
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    async def _append(self, event: Dict[str, Any]):
+        async with self._changed:
+            self.events.append(event)
+            if event.get("status") in FINISHED:
+                self.status = event["status"]
+                self.finished_at = time.time()
+            self._changed.notify_all()
+
+    async def execute(self):
+        self.status = RUNNING
+        run, self._run = self._run, None
+        try:
+            async for event in run():
+                await self._append(event)
+        except Exception as e:
+            print(f"Error: job {self.job_id} failed: {e}")
+            await self._append({"status": "error", "message": str(e)})
+        if not self.finished:
+            await self._append(
+                {"status": "error", "message": "Evaluation ended without a result."}
+            )
+
+    async def stream(self, offset: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """Events from `offset` on, each tagged with its offset; ends when done."""
+        position = max(0, offset)
+        while True:
+            async with self._changed:
+                while position >= len(self.events) and not self.finished:
+                    await self._changed.wait()
+                pending = self.events[position:]
+                done = self.finished
+            for event in pending:
+                yield {**event, "offset": position}
+                position += 1
+            if done and position >= len(self.events):
+                return
+
+    def snapshot(self) -> Dict[str, Any]:
+        result = self.events[-1] if self.finished else None
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "file_name": self.file_name,
+            "events": len(self.events),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": result,
+        }
+
+
+class JobManager:
+    """Bounded queue plus a fixed pool of worker tasks, with TTL cleanup."""
+
+    def __init__(self, workers: int, max_queued: int, ttl_seconds: float):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, EvaluationJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def _ensure_workers(self):
+        # Workers live on the loop that serves requests; they are (re)started
+        # lazily, e.g. after the app was restarted on a fresh loop.
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [
+            loop.create_task(self._worker(), name=f"evaluation-job-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def _worker(self):
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                await job.execute()
+                self.stats["completed" if job.status == "completed" else "failed"] += 1
+            finally:
+                queue.task_done()
+
+    def _expire(self, now: float):
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(
+        self, file_name: str, run: Callable[[], AsyncIterator[dict]]
+    ) -> EvaluationJob:
+        """Queues run() as a job; raises JobQueueFull when the queue is full."""
+        self._ensure_workers()
+        self._expire(time.time())
+        job = EvaluationJob(uuid.uuid4().hex, file_name, run)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise JobQueueFull(
+                f"Job queue is full ({self.max_queued} waiting). Try again later."
+            )
+        self._jobs[job.job_id] = job
+        self.stats["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[EvaluationJob]:
+        self._expire(time.time())
+        return self._jobs.get(job_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        jobs = list(self._jobs.values())
+        return {
+            **self.stats,
+            "queued": sum(1 for job in jobs if job.status == QUEUED),
+            "running": sum(1 for job in jobs if job.status == RUNNING),
+            "retained": len(jobs),
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+# --- Shared instance ---
+_MANAGER: Optional[JobManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _MANAGER
+    if _MANAGER is None:
+        with _MANAGER_LOCK:
+            if _MANAGER is None:
+                _MANAGER = JobManager(
+                    workers=max(1, env_int("JOB_WORKERS", 4)),
+                    max_queued=max(1, env_int("JOB_MAX_QUEUED", 100)),
+                    ttl_seconds=env_float("JOB_RESULT_TTL", 900.0),
+                )
+    return _MANAGER
+
+
+def reset_job_manager():
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is not None:
+            _MANAGER.shutdown()
+        _MANAGER = None
@@ -1,32 +1,447 @@
-import pymupdf as fitz
-import io
+import asyncio
+import math
+import multiprocessing
+import re
+import threading
+import unicodedata
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple, Union
 
+from pydantic import BaseModel
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+from services.config import env_int, env_float, env_str
+from services.tokens import estimate_tokens
+
+# Uploads arrive as one bytearray (see read_upload in main.py); plain bytes
+# are accepted too.
+PDFBuffer = Union[bytes, bytearray]
+
+
+class PDFLimitError(Exception):
+    """Raised when a PDF exceeds one of the configured extraction limits."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+# --- Limits ---
+def get_max_pdf_bytes() -> int:
+    return env_int("MAX_PDF_BYTES", 10 * 1024 * 1024)
+
+
+def get_max_batch_bytes() -> int:
+    """Upper bound on the whole body of one POST /evaluate/batch."""
+    return env_int("MAX_BATCH_BYTES", 50 * 1024 * 1024)
+
+
+def get_max_pdf_pages() -> int:
+    return env_int("MAX_PDF_PAGES", 50)
+
+
+def get_extract_timeout() -> float:
+    return env_float("PDF_EXTRACT_TIMEOUT", 30.0)
+
+
+def get_pages_per_chunk() -> int:
+    return max(1, env_int("PDF_PAGES_PER_CHUNK", 8))
+
+
+def get_upload_chunk_bytes() -> int:
+    return max(4096, env_int("UPLOAD_CHUNK_BYTES", 256 * 1024))
+
+
+# --- Extraction modes ---
+# "plain" sends each page's get_text() as is. "compact" rebuilds the text
+# from PyMuPDF's line layout: repeated headers/footers and page numbers are
+# dropped, whitespace is collapsed and recognized sections are put in a
+# fixed order. The resume is sent to the LLM several times per evaluation,
+# so every character saved here is saved several times over.
+PLAIN = "plain"
+COMPACT = "compact"
+EXTRACT_MODES = (PLAIN, COMPACT)
+
+
+def get_extract_mode() -> str:
+    mode = env_str("PDF_EXTRACT_MODE", PLAIN).lower()
+    if mode not in EXTRACT_MODES:
+        print(f"  > Warning: PDF_EXTRACT_MODE={mode!r} is unknown, using {PLAIN}")
+        return PLAIN
+    return mode
+
+
+def check_pdf_size(size: int):
+    max_bytes = get_max_pdf_bytes()
+    if size > max_bytes:
+        raise PDFLimitError(
+            "max_bytes",
+            f"PDF is too large ({size // 1024} KB). Maximum is {max_bytes // 1024} KB.",
+        )
+
+
+def check_page_count(page_count: int):
+    max_pages = get_max_pdf_pages()
+    if page_count > max_pages:
+        raise PDFLimitError(
+            "max_pages",
+            f"PDF has {page_count} pages. Maximum is {max_pages} pages.",
+        )
+
+
+# --- Worker functions (run inside the extraction pool) ---
+def _pdf_stream(file_bytes: PDFBuffer):
+    # PyMuPDF copies a bytearray into new bytes but reads a memoryview in place.
+    return memoryview(file_bytes) if isinstance(file_bytes, bytearray) else file_bytes
+
+
+# PyMuPDF is imported on first use, so the app (and its health checks) can
+# start without loading it.
+def _count_pages(file_bytes: PDFBuffer) -> int:
+    import pymupdf as fitz
+
+    with fitz.open(stream=_pdf_stream(file_bytes), filetype="pdf") as doc:
+        return doc.page_count
+
+
+# A line of a page: (text, top, bottom), positions as a share of page height.
+PageLine = Tuple[str, float, float]
+
+
+def _page_lines(page) -> List[PageLine]:
+    """The page's text lines in reading order, from PyMuPDF's dict output."""
+    height = page.rect.height or 1.0
+    lines = []
+    for block in page.get_text("dict", sort=True)["blocks"]:
+        if block.get("type") != 0:
+            continue  # Image block
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"])
+            if text.strip():
+                _, y0, _, y1 = line["bbox"]
+                lines.append((text, y0 / height, y1 / height))
+    return lines
+
+
+def _page_content(page, mode: str):
+    return _page_lines(page) if mode == COMPACT else page.get_text()
+
+
+def _extract_page_range(
+    file_bytes: PDFBuffer, start: int, stop: int, mode: str = PLAIN
+) -> list:
+    import pymupdf as fitz
+
+    with fitz.open(stream=_pdf_stream(file_bytes), filetype="pdf") as doc:
+        return [
+            _page_content(doc[i], mode) for i in range(start, min(stop, doc.page_count))
+        ]
+
+
+# --- Compact mode ---
+FURNITURE_BAND = 0.06  # Top/bottom share of a page where headers/footers live
+PAGE_NUMBER_RE = re.compile(
+    r"^(?:-\s*)?(?:page|หน้า)?\s*\d{1,3}(?:\s*(?:/|of|จาก)\s*\d{1,3})?(?:\s*-)?$",
+    re.IGNORECASE,
+)
+SPACE_RE = re.compile(r"[ \t\u00a0\u200b]+")
+SECTION_ORDER = ("contact", "summary", "experience", "education", "skills")
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "contact": (
+        "contact",
+        "contact information",
+        "contact details",
+        "personal information",
+        "personal details",
+        "ข้อมูลติดต่อ",
+        "ข้อมูลส่วนตัว",
+    ),
+    "summary": (
+        "summary",
+        "profile",
+        "professional summary",
+        "objective",
+        "career objective",
+        "about me",
+        "เกี่ยวกับฉัน",
+        "วัตถุประสงค์",
+    ),
+    "experience": (
+        "experience",
+        "work experience",
+        "professional experience",
+        "employment",
+        "employment history",
+        "work history",
+        "career history",
+        "internship",
+        "internships",
+        "ประสบการณ์",
+        "ประสบการณ์ทำงาน",
+        "ประวัติการทำงาน",
+    ),
+    "education": (
+        "education",
+        "academic background",
+        "education and training",
+        "การศึกษา",
+        "ประวัติการศึกษา",
+    ),
+    "skills": (
+        "skills",
+        "technical skills",
+        "core skills",
+        "key skills",
+        "competencies",
+        "core competencies",
+        "technologies",
+        "ทักษะ",
+        "ความสามารถ",
+        "ทักษะและความสามารถ",
+    ),
+    # Recognized so they end the section before them; kept in document order.
+    "projects": ("projects", "personal projects", "โครงการ", "ผลงาน"),
+    "certifications": (
+        "certifications",
+        "certificates",
+        "licenses",
+        "awards",
+        "ใบรับรอง",
+        "รางวัล",
+    ),
+    "languages": ("languages", "ภาษา"),
+}
+_HEADING_LOOKUP = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+
+class CompactResume(BaseModel):
+    """Token-lean resume text plus what compact extraction found in it."""
+
+    text: str
+    sections: Dict[str, str]  # Section name -> its text, in output order
+    token_count: int
+    dropped_lines: int  # Header/footer/page-number lines removed
+
+
+def _clean_line(text: str) -> str:
+    return SPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _furniture_key(text: str) -> str:
+    # "Page 2 of 5" and "Page 3 of 5" are the same footer.
+    return re.sub(r"\d+", "#", text.lower())
+
+
+def _is_furniture_position(top: float, bottom: float) -> bool:
+    return bottom <= FURNITURE_BAND or top >= 1 - FURNITURE_BAND
+
+
+def _match_heading(line: str) -> Tuple[Optional[str], str]:
+    """(section, rest of the line) when the line opens a section."""
+    head, sep, rest = line.partition(":")
+    # Exact match only: "- Skills: ..." in a bullet list is not a heading.
+    section = _HEADING_LOOKUP.get(SPACE_RE.sub(" ", head).strip().rstrip(" .-").lower())
+    if section is None:
+        return None, ""
+    return section, rest.strip()
+
+
+def build_compact_resume(pages: List[List[PageLine]]) -> CompactResume:
+    """Drops page furniture and regroups lines by resume section."""
+    repeats: Dict[str, int] = {}
+    for page in pages:
+        keys = {
+            _furniture_key(_clean_line(text))
+            for text, top, bottom in page
+            if _is_furniture_position(top, bottom)
+        }
+        for key in keys:
+            repeats[key] = repeats.get(key, 0) + 1
+    # A header/footer is a band line on at least half the pages (min. two).
+    min_repeats = max(2, math.ceil(len(pages) / 2))
+
+    sections: Dict[str, List[str]] = {"contact": []}
+    current, dropped = "contact", 0
+    for page in pages:
+        for text, top, bottom in page:
+            line = _clean_line(text)
+            if not line:
+                continue
+            if _is_furniture_position(top, bottom) and (
+                PAGE_NUMBER_RE.match(line)
+                or repeats.get(_furniture_key(line), 0) >= min_repeats
+            ):
+                dropped += 1
+                continue
+            section, rest = _match_heading(line)
+            if section is not None:
+                current = section
+                sections.setdefault(current, [])
+                if rest:
+                    sections[current].append(rest)
+                continue
+            sections[current].append(line)
+
+    found = [name for name, lines in sections.items() if lines]
+    if found == ["contact"]:
+        # No headings recognized: keep the cleaned text as one block.
+        text = "\n".join(sections["contact"])
+        return CompactResume(
+            text=text,
+            sections={},
+            token_count=estimate_tokens(text),
+            dropped_lines=dropped,
+        )
+
+    ordered = [name for name in SECTION_ORDER if name in found]
+    ordered += [name for name in found if name not in ordered]
+    blocks = {name: "\n".join(sections[name]) for name in ordered}
+    text = "\n".join(f"[{name.upper()}]\n{body}" for name, body in blocks.items())
+    return CompactResume(
+        text=text,
+        sections=blocks,
+        token_count=estimate_tokens(text),
+        dropped_lines=dropped,
+    )
+
+
+SECTION_MARKER_RE = re.compile(r"^\[([A-Z]+)\]$")  # As written by compact mode
+
+
+def resume_sections(text: str) -> Dict[str, str]:
+    """Section name -> its text, from extracted text of either mode."""
+    sections: Dict[str, List[str]] = {"contact": []}
+    current = "contact"
+    for raw in text.split("\n"):
+        line = _clean_line(raw)
+        if not line:
+            continue
+        marker = SECTION_MARKER_RE.match(line)
+        if marker:
+            section, rest = marker.group(1).lower(), ""
+        else:
+            section, rest = _match_heading(line)
+        if section is not None:
+            current = section
+            sections.setdefault(current, [])
+            if rest:
+                sections[current].append(rest)
+            continue
+        sections[current].append(line)
+
+    found = {name: "\n".join(lines) for name, lines in sections.items() if lines}
+    return {} if list(found) == ["contact"] else found
+
+
+def _finalize_text(pages: list, mode: str = PLAIN) -> str:
+    if mode == COMPACT:
+        clean_text = build_compact_resume(pages).text
+    else:
+        # One join instead of repeated string concatenation (linear, not quadratic).
+        clean_text = "\n".join(pages).strip()
+
+    # Heuristic: If text is extremely short, it's likely a scanned document or empty
+    if len(clean_text) < 50:
+        print(
+            f"  > Warning: Text length is only {len(clean_text)} chars. Likely a scanned/image PDF."
+        )
+        return ""
+
+    return clean_text
+
+
+# --- Extraction pool ---
+# PyMuPDF is not thread-safe, so parallel page ranges need separate
+# processes. Where process pools are unavailable (e.g. no /dev/shm on some
+# serverless runtimes) we fall back to a single extraction thread, which
+# still keeps the event loop free.
+_POOL: Optional[Executor] = None
+_POOL_PARALLEL = False
+_POOL_LOCK = threading.Lock()
+
+
+def get_extraction_pool():
+    """Returns (executor, supports_parallel_pages), creating it on first use."""
+    global _POOL, _POOL_PARALLEL
+    if _POOL is not None:
+        return _POOL, _POOL_PARALLEL
+
+    with _POOL_LOCK:
+        if _POOL is None:
+            kind = env_str("PDF_EXTRACT_EXECUTOR", "process").lower()
+            workers = max(1, env_int("PDF_EXTRACT_WORKERS", 2))
+            if kind == "process":
+                try:
+                    _POOL = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    _POOL_PARALLEL = True
+                except (OSError, NotImplementedError, ImportError) as e:
+                    print(
+                        f"  > Warning: process pool unavailable ({e}), using a thread."
+                    )
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="pdf-extract"
+                )
+                _POOL_PARALLEL = False
+    return _POOL, _POOL_PARALLEL
+
+
+def shutdown_extraction_pool():
+    global _POOL, _POOL_PARALLEL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+        _POOL_PARALLEL = False
+
+
+def recycle_extraction_pool(pool: Executor):
+    """
+    Replaces `pool` if it is still the current one and stops its workers.
+    shutdown() alone lets a worker finish the PDF it is stuck on, so a few
+    hostile files would keep every worker busy. Worker threads cannot be
+    stopped, but the next extraction gets a fresh thread.
+    """
+    global _POOL, _POOL_PARALLEL
+    with _POOL_LOCK:
+        if _POOL is not pool:
+            return
+        _POOL = None
+        _POOL_PARALLEL = False
+    # ProcessPoolExecutor has no public way to stop a running task.
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def extract_text_from_pdf(file_bytes: PDFBuffer, mode: Optional[str] = None) -> str:
     """
     Extracts text from a digital PDF file using PyMuPDF from memory bytes.
-    Supports Serverless/Read-Only environments.
+    Supports Serverless/Read-Only environments. `mode` is "plain" or
+    "compact" (default: PDF_EXTRACT_MODE).
+    Raises PDFLimitError if the document exceeds the configured limits.
     """
+    import pymupdf as fitz
+
+    mode = mode or get_extract_mode()
+    check_pdf_size(len(file_bytes))
     doc = None
     try:
         # Open PDF from memory stream
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        full_text = ""
-
-        if len(doc) > 0:
-            for page in doc:
-                full_text += page.get_text() + "\n"
-
-        clean_text = full_text.strip()
-
-        # Heuristic: If text is extremely short, it's likely a scanned document or empty
-        if len(clean_text) < 50:
-            print(
-                f"  > Warning: Text length is only {len(clean_text)} chars. Likely a scanned/image PDF."
-            )
-            return ""
+        doc = fitz.open(stream=_pdf_stream(file_bytes), filetype="pdf")
+        check_page_count(doc.page_count)
+        return _finalize_text([_page_content(page, mode) for page in doc], mode)
 
-        return clean_text
+    except PDFLimitError:
+        raise
 
     except Exception as e:
         print(f"Error processing PDF stream: {e}")
@@ -35,3 +450,65 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
     finally:
         if doc:
             doc.close()
+
+
+async def extract_text_from_pdf_async(
+    file_bytes: PDFBuffer, timeout: Optional[float] = None, mode: Optional[str] = None
+) -> str:
+    """
+    Non-blocking variant of extract_text_from_pdf for the async endpoints.
+    Runs in the bounded extraction pool; large documents are split into
+    page ranges that are extracted in parallel and joined in order.
+    `timeout` (e.g. what is left of a request deadline) can only shorten
+    PDF_EXTRACT_TIMEOUT. Raises PDFLimitError on size, page-count or
+    timeout limits.
+    """
+    mode = mode or get_extract_mode()
+    check_pdf_size(len(file_bytes))
+    timeout = (
+        get_extract_timeout()
+        if timeout is None
+        else min(get_extract_timeout(), max(timeout, 0.0))
+    )
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + timeout
+
+    async def run(pool, parallel):
+        page_count = await loop.run_in_executor(pool, _count_pages, file_bytes)
+        check_page_count(page_count)
+
+        chunk = get_pages_per_chunk() if parallel else max(page_count, 1)
+        ranges = [(i, i + chunk) for i in range(0, page_count, chunk)]
+        parts = await asyncio.gather(
+            *[
+                loop.run_in_executor(pool, _extract_page_range, file_bytes, a, b, mode)
+                for a, b in ranges
+            ]
+        )
+        return _finalize_text([page for part in parts for page in part], mode)
+
+    for attempt in range(2):
+        pool, parallel = get_extraction_pool()
+        try:
+            return await asyncio.wait_for(
+                run(pool, parallel), timeout=give_up_at - loop.time()
+            )
+        except PDFLimitError:
+            raise
+        except asyncio.TimeoutError:
+            # The worker is still parsing; replace it so the next extraction
+            # does not queue behind this document.
+            recycle_extraction_pool(pool)
+            raise PDFLimitError(
+                "timeout", f"PDF extraction timed out after {timeout:g} seconds."
+            )
+        except BrokenProcessPool as e:
+            if attempt == 0 and get_extraction_pool()[0] is not pool:
+                continue  # Recycled for another request's timeout: try again
+            # A crashed worker poisons the pool; recreate it on the next call.
+            print(f"Error processing PDF stream: extraction worker died ({e})")
+            recycle_extraction_pool(pool)
+            return ""
+        except Exception as e:
+            print(f"Error processing PDF stream: {e}")
+            return ""
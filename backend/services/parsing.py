@@ -0,0 +1,202 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from services.config import env_bool
+
+
+# --- Structured Reviewer output ---
+class ReviewerEvaluation(BaseModel):
+    """Schema the Reviewer fills in when structured output is enabled."""
+
+    name: str = Field(
+        description="EXACT candidate name from the resume, no translation"
+    )
+    email: str = Field(description="Candidate email address, or N/A")
+    score: float = Field(description="Realistic fit score from 0 to 10")
+    strengths: str = Field(description="จุดแข็ง: clear, evidenced strengths (Thai)")
+    transferable_skills: str = Field(
+        description="ทักษะที่นำมาปรับใช้ได้: same-family skills only (Thai)"
+    )
+    gaps: str = Field(description="สิ่งที่ต้องพัฒนา: missing skills vs the JD (Thai)")
+
+
+def structured_output_enabled() -> bool:
+    return env_bool("REVIEWER_STRUCTURED_OUTPUT", False)
+
+
+def format_score(score: float) -> str:
+    return f"{score:g}"
+
+
+def render_evaluation(evaluation: ReviewerEvaluation) -> str:
+    """Renders a structured evaluation in the Reviewer's text layout."""
+    return f"""0. **Candidate Metadata**:
+   - Name: {evaluation.name}
+   - Email: {evaluation.email}
+1. Score (0-10): {format_score(evaluation.score)}
+2. Analysis:
+   - **จุดแข็ง (Strengths):** {evaluation.strengths}
+   - **ทักษะที่นำมาปรับใช้ได้ (Transferable Skills):** {evaluation.transferable_skills}
+   - **สิ่งที่ต้องพัฒนา (Gaps & Growth Areas):** {evaluation.gaps}"""
+
+
+# --- Text parser (fallback) ---
+class ParsedEvaluation(BaseModel):
+    """Fields recovered from a Reviewer evaluation; None when not found."""
+
+    name: Optional[str] = None
+    email: Optional[str] = None
+    score: Optional[str] = None
+    strengths: Optional[str] = None
+    transferable_skills: Optional[str] = None
+    gaps: Optional[str] = None
+    email_header: bool = False
+    source: str = "text"
+
+    def missing_fields(self) -> List[str]:
+        """Headers/values the rest of the pipeline cannot do without."""
+        missing = []
+        if self.score is None or not 0 <= float(self.score) <= 10:
+            missing.append("Score (0-10)")
+        if self.name is None:
+            missing.append("Name")
+        if not self.email_header:
+            missing.append("Email")
+        return missing
+
+    def fields(self) -> Dict[str, Any]:
+        return self.model_dump(exclude={"email_header"})
+
+
+EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+NUMBER = r"\d+(?:\.\d+)?"
+NUMBER_RE = re.compile(NUMBER)
+# One alternation scanned once, left to right. Score alternatives are listed
+# strict-to-loose, so at any "Score" the strictest form that fits wins.
+EVALUATION_FIELDS_RE = re.compile(
+    # "name": "..." -- JSON left behind by a failed structured parse
+    rf'"(?P<json_key>name|email|score)"\s*:\s*"?(?P<json_value>[^"\n,}}]*)'
+    rf"|(?:Score|คะแนน)\s*(?:"
+    rf"(?:\(0-10\))?\**:\**\s*(?P<score>{NUMBER})"  # Score (0-10): 8.5
+    rf"|-*\s*(?P<score_dash>{NUMBER})"  # Score - 8.5
+    rf"|[^\n]*?(?P<score_loose>{NUMBER})"  # Score ... 8.5 (same line)
+    rf")"
+    rf"|(?P<ratio>{NUMBER})\s*/\s*10"  # 8.5 / 10
+    rf"|(?P<email_header>E-?mail|อีเมล)\s*[:\-]\s*(?P<email_line>[^\n]*)"
+    rf"|(?:Name|ชื่อ)\s*[:\-]?\s*(?P<name>[^\n]*)"
+    rf"|(?P<email>[\w\.-]+@[\w\.-]+\.\w+)"
+    rf"|(?P<section>Strengths|Transferable Skills|Gaps(?: & Growth Areas)?)",
+    re.IGNORECASE,
+)
+SECTION_FIELDS = {
+    "strengths": "strengths",
+    "transferable skills": "transferable_skills",
+    "gaps": "gaps",
+    "gaps & growth areas": "gaps",
+}
+SCORE_PRECEDENCE = ("score", "score_dash", "ratio")
+
+
+def _clean(value: str) -> str:
+    return value.strip().strip('*",').strip()
+
+
+def parse_evaluation_text(text: str) -> ParsedEvaluation:
+    """Recovers every field from free-text Reviewer output in one pass."""
+    found: Dict[str, str] = {}
+    emails = []  # (position, address)
+    sections = []  # (field, content start, header line start)
+    for match in EVALUATION_FIELDS_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "json_value":
+            kind = match.group("json_key").lower()
+            value = match.group("json_value").strip()
+            if kind == "email":
+                found.setdefault("email_header", "1")
+                if EMAIL_RE.fullmatch(value):
+                    emails.append((match.start(), value))
+            elif kind != "score" or NUMBER_RE.fullmatch(value):
+                found.setdefault(kind, value)
+            continue
+        if kind == "email_line":
+            found.setdefault("email_header", "1")
+            inner = EMAIL_RE.search(match.group(kind))
+            if inner:
+                emails.append((match.start(kind) + inner.start(), inner.group(0)))
+            continue
+        if kind == "name":
+            inner = EMAIL_RE.search(match.group(kind))
+            if inner:
+                emails.append((match.start(kind) + inner.start(), inner.group(0)))
+        if kind == "email":
+            emails.append((match.start(), match.group(0)))
+        elif kind == "section":
+            field = SECTION_FIELDS[match.group(kind).lower()]
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            sections.append((field, match.end(), line_start))
+        else:
+            found.setdefault(kind, match.group(kind))
+
+    parsed = ParsedEvaluation(email_header="email_header" in found)
+    for kind in SCORE_PRECEDENCE:
+        if kind in found:
+            parsed.score = found[kind]
+            break
+    else:
+        if "score_loose" in found and 0 <= float(found["score_loose"]) <= 10:
+            parsed.score = str(float(found["score_loose"]))
+    if "name" in found:
+        parsed.name = _clean(found["name"])
+    if emails:
+        parsed.email = min(emails)[1]
+    for i, (field, start, _) in enumerate(sections):
+        end = sections[i + 1][2] if i + 1 < len(sections) else len(text)
+        if getattr(parsed, field) is None:
+            setattr(parsed, field, _clean(text[start:end].lstrip(')*:" ')) or None)
+    return parsed
+
+
+def parsed_from_structured(evaluation: ReviewerEvaluation) -> ParsedEvaluation:
+    return ParsedEvaluation(
+        name=evaluation.name,
+        email=evaluation.email,
+        score=format_score(evaluation.score),
+        strengths=evaluation.strengths,
+        transferable_skills=evaluation.transferable_skills,
+        gaps=evaluation.gaps,
+        email_header=True,
+        source="structured",
+    )
+
+
+# --- Aggregate counters ---
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "structured": 0,  # Schema-validated Reviewer outputs
+    "structured_fallbacks": 0,  # Schema parse failed; text parser used instead
+    "text_parsed": 0,  # Text parser found every required field
+    "failures": 0,  # Required fields missing -> another Reviewer round
+    "retry_calls": 0,  # Reviewer calls spent re-asking after a failure
+    "retry_tokens": 0,  # ... and their tokens
+}
+
+
+def record_parse(outcome: str, tokens: int = 0):
+    with _STATS_LOCK:
+        _STATS[outcome] += 1
+        if outcome == "retry_calls":
+            _STATS["retry_tokens"] += tokens
+
+
+def parse_snapshot() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def reset_parse_stats():
+    with _STATS_LOCK:
+        for key in _STATS:
+            _STATS[key] = 0
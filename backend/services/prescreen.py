@@ -0,0 +1,196 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.config import env_float, env_str
+from services.parsing import EMAIL_RE, ReviewerEvaluation, render_evaluation
+
+# --- Tokenization (English + Thai) ---
+# Latin-script words are split on non-word characters (keeping tech tokens
+# such as "c++", "c#" and "node.js"). Thai is written without spaces, so Thai
+# runs are turned into overlapping character trigrams instead of words.
+LATIN_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+THAI_RUN_RE = re.compile(r"[฀-๿]+")
+THAI_NGRAM = 3
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it of on or our the to
+    we will with you your their this that who what can able must should
+    years year experience work working job role team company etc e.g i.e
+    """.split())
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 0.5
+BM25_B = 0.3
+REFERENCE_RESUME_TOKENS = 400
+
+
+def tokenize(text: str) -> List[str]:
+    text = text.lower()
+    tokens = [
+        t
+        for t in LATIN_TOKEN_RE.findall(text)
+        if len(t) > 1 and t not in STOPWORDS and not t.isdigit()
+    ]
+    for run in THAI_RUN_RE.findall(text):
+        if len(run) < THAI_NGRAM:
+            continue
+        tokens.extend(run[i : i + THAI_NGRAM] for i in range(len(run) - 2))
+    return tokens
+
+
+def term_counts(text: str) -> Counter:
+    return Counter(tokenize(text))
+
+
+# --- Scorer ---
+class LexicalPrescreen:
+    """
+    Requirement-coverage scorer for one JD.
+
+    Every requirement line gets the same weight budget, spread over its
+    terms (so a long Thai line does not outweigh "Python"), scaled by how
+    specific each term is across lines (IDF). A resume's score is the share
+    of that weight it covers, with BM25 saturation so repeating a keyword
+    does not inflate the result. Scores fall in [0, 1].
+    """
+
+    def __init__(self, job_description: str, requirements: Sequence[str]):
+        lines = list(requirements) or job_description.split("\n")
+        line_terms = [set(tokenize(line)) for line in lines]
+        line_terms = [terms for terms in line_terms if terms]
+
+        self.vocabulary = sorted(set().union(*line_terms))
+        self.index = {term: i for i, term in enumerate(self.vocabulary)}
+        share = np.zeros(len(self.vocabulary), dtype=np.float64)
+        df = np.zeros(len(self.vocabulary), dtype=np.float64)
+        for terms in line_terms:
+            cols = [self.index[t] for t in terms]
+            share[cols] += 1.0 / len(terms)
+            df[cols] += 1
+        idf = np.log1p((len(line_terms) + 1) / (df + 0.5))
+        self.weights = share * idf
+        self.total_weight = float(self.weights.sum()) or 1.0
+
+    def count_matrix(
+        self, resume_counts: Sequence[Counter]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(n_resumes x vocab) term counts, plus each resume's total length."""
+        matrix = np.zeros((len(resume_counts), len(self.vocabulary)), dtype=np.float64)
+        lengths = np.zeros(len(resume_counts), dtype=np.float64)
+        for row, counts in enumerate(resume_counts):
+            lengths[row] = sum(counts.values())
+            for term, count in counts.items():
+                col = self.index.get(term)
+                if col is not None:
+                    matrix[row, col] = count
+        return matrix, lengths
+
+    def score_counts(self, resume_counts: Sequence[Counter]) -> np.ndarray:
+        if not resume_counts or not self.vocabulary:
+            return np.zeros(len(resume_counts))
+        tf, lengths = self.count_matrix(resume_counts)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / REFERENCE_RESUME_TOKENS)
+        saturated = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+        # One matrix-vector product scores the whole batch.
+        return (saturated @ self.weights) / ((BM25_K1 + 1) * self.total_weight)
+
+    def score_batch(self, resume_texts: Sequence[str]) -> np.ndarray:
+        return self.score_counts([term_counts(text) for text in resume_texts])
+
+    def missing_requirements(
+        self, counts: Counter, requirements: Sequence[str], limit=5
+    ):
+        """Requirement lines that share no term with the resume."""
+        missing = []
+        for line in requirements:
+            terms = set(tokenize(line))
+            if terms and not any(t in counts for t in terms):
+                missing.append(line)
+            if len(missing) >= limit:
+                break
+        return missing
+
+
+@lru_cache(maxsize=32)
+def get_prescreen_scorer(job_description: str, requirements: Tuple[str, ...]):
+    """One scorer per JD; its vocabulary and weights are built once."""
+    return LexicalPrescreen(job_description, requirements)
+
+
+# --- Settings ---
+PRESCREEN_MODES = ("off", "fast", "cheap")
+
+
+def get_prescreen_mode() -> str:
+    # off: no pre-screen | fast: local low-score result, no LLM call
+    # cheap: a single Reviewer call without the Auditor loop
+    mode = env_str("PRESCREEN_MODE", "off").lower()
+    return mode if mode in PRESCREEN_MODES else "off"
+
+
+def get_prescreen_threshold() -> float:
+    return env_float("PRESCREEN_THRESHOLD", 0.1)
+
+
+def prescreen_cache_tag() -> str:
+    """Keeps cached results apart when the pre-screen settings differ."""
+    mode = get_prescreen_mode()
+    if mode == "off":
+        return ""
+    return f"+prescreen:{mode}:{get_prescreen_threshold()}"
+
+
+def prescreen_results(
+    job_description: str,
+    requirements: Sequence[str],
+    resume_texts: Sequence[str],
+    resume_counts: Optional[Sequence[Optional[Counter]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Scores resumes against one JD; used per evaluation and per batch.
+    `resume_counts` holds term counts already computed (None = from the text).
+    """
+    scorer = get_prescreen_scorer(job_description, tuple(requirements))
+    known = resume_counts or [None] * len(resume_texts)
+    counts = [
+        c if c is not None else term_counts(text)
+        for c, text in zip(known, resume_texts)
+    ]
+    scores = scorer.score_counts(counts)
+    threshold = get_prescreen_threshold()
+    mode = get_prescreen_mode()
+    return [
+        {
+            "score": round(float(score), 4),
+            "threshold": threshold,
+            "mode": mode,
+            "fired": bool(score < threshold),
+            "missing_requirements": scorer.missing_requirements(c, requirements),
+        }
+        for score, c in zip(scores, counts)
+    ]
+
+
+def fast_reject_text(resume_text: str, prescreen: Dict[str, Any]) -> str:
+    """A Reviewer-shaped low-score evaluation built without any LLM call."""
+    first_line = next((l.strip() for l in resume_text.split("\n") if l.strip()), "")
+    email = EMAIL_RE.search(resume_text)
+    # Map coverage below the threshold onto the 0-2 band of the 0-10 scale.
+    ratio = prescreen["score"] / prescreen["threshold"] if prescreen["threshold"] else 0
+    evaluation = ReviewerEvaluation(
+        name=first_line[:80] or "Candidate",
+        email=email.group(0) if email else "N/A",
+        score=round(min(2.0, 2.0 * ratio), 1),
+        strengths="ไม่พบหลักฐานใน Resume ที่ตรงกับคุณสมบัติหลักของตำแหน่งนี้",
+        transferable_skills="No relevant skills found for this role",
+        gaps="; ".join(prescreen["missing_requirements"]) or "คุณสมบัติหลักตาม JD",
+    )
+    return (
+        render_evaluation(evaluation)
+        + f"\n\n(คัดกรองเบื้องต้นอัตโนมัติ: ความสอดคล้องกับ JD {math.floor(prescreen['score'] * 100)}%"
+        + f" ต่ำกว่าเกณฑ์ {math.floor(prescreen['threshold'] * 100)}%)"
+    )
@@ -0,0 +1,98 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from services.config import env_float, env_str
+
+# --- Per-node model routing ---
+# The Reviewer and the Auditor can run on different models. With a cascade
+# model set, the first Reviewer pass runs on that fast, cheap model; a
+# borderline score or an Auditor rejection moves the rest of the run to the
+# strong Reviewer model.
+FAST = "fast"
+STRONG = "strong"
+
+CASCADE_ESCALATION_FEEDBACK = (
+    "A senior reviewer is double-checking this borderline score. Re-examine "
+    "the evidence in the resume and give your final, carefully justified score."
+)
+
+
+@dataclass(frozen=True)
+class ModelRouting:
+    reviewer: str
+    auditor: str
+    cascade: str = ""  # Fast model for the first Reviewer pass ("" = off)
+    borderline_min: float = 4.0
+    borderline_max: float = 7.0
+
+    @property
+    def cascade_enabled(self) -> bool:
+        return bool(self.cascade) and self.cascade != self.reviewer
+
+    def first_tier(self) -> str:
+        return FAST if self.cascade_enabled else STRONG
+
+    def model_for(self, tier: str) -> str:
+        return self.cascade if tier == FAST else self.reviewer
+
+    def is_borderline(self, score: Optional[str]) -> bool:
+        """Scores in [borderline_min, borderline_max] are worth a second look."""
+        if score is None:
+            return False
+        return self.borderline_min <= float(score) <= self.borderline_max
+
+    def cache_tag(self) -> str:
+        """Identifies every model that can shape an evaluation."""
+        tag = self.reviewer
+        if self.auditor != self.reviewer:
+            tag += f"/{self.auditor}"
+        if self.cascade_enabled:
+            tag += (
+                f"/cascade:{self.cascade}"
+                f"@{self.borderline_min:g}-{self.borderline_max:g}"
+            )
+        return tag
+
+
+def get_model_routing(default_model: str) -> ModelRouting:
+    """Routing from REVIEWER_MODEL / AUDITOR_MODEL / CASCADE_MODEL."""
+    return ModelRouting(
+        reviewer=env_str("REVIEWER_MODEL", default_model),
+        auditor=env_str("AUDITOR_MODEL", default_model),
+        cascade=env_str("CASCADE_MODEL", ""),
+        borderline_min=env_float("CASCADE_BORDERLINE_MIN", 4.0),
+        borderline_max=env_float("CASCADE_BORDERLINE_MAX", 7.0),
+    )
+
+
+# --- Aggregate counters ---
+# Which tier produced each final evaluation, and why runs escalated.
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "fast_results": 0,
+    "strong_results": 0,
+    "escalated_borderline": 0,
+    "escalated_rejected": 0,
+}
+
+
+def record_result_tier(tier: str):
+    with _STATS_LOCK:
+        _STATS[f"{tier}_results"] += 1
+
+
+def record_escalation(reason: str):
+    with _STATS_LOCK:
+        _STATS[f"escalated_{reason}"] += 1
+
+
+def routing_snapshot() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        return dict(_STATS)
+
+
+def reset_routing_stats():
+    with _STATS_LOCK:
+        for key in _STATS:
+            _STATS[key] = 0
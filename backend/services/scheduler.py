@@ -0,0 +1,415 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from services.config import env_int, env_float
+from services.tokens import estimate_message_tokens
+
+
+@lru_cache(maxsize=1)
+def retryable_errors() -> tuple:
+    """Errors worth retrying. Rate limits also pause the whole scheduler."""
+    import openai  # Deferred: the SDK is slow to import and only needed for calls
+
+    return (
+        openai.RateLimitError,
+        openai.APIConnectionError,  # includes APITimeoutError
+        openai.InternalServerError,
+    )
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Reads Retry-After (or retry-after-ms) from an OpenAI error response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class LLMScheduler:
+    """
+    Shared gate in front of every outbound LLM call.
+
+    Keeps a sliding window of request and token usage to stay under the
+    provider's RPM/TPM budgets, queues callers in FIFO order when a budget
+    is exhausted, and retries 429/5xx/connection errors with jittered
+    exponential backoff (honoring Retry-After). A limit of 0 disables it.
+    """
+
+    def __init__(
+        self,
+        rpm_limit: int,
+        tpm_limit: int,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        completion_tokens: int = 800,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_tokens = completion_tokens
+        self.window_seconds = window_seconds
+        self._clock = clock
+        # Each entry is [timestamp, tokens]; tokens are corrected after the call.
+        self._window: deque = deque()
+        self._window_tokens = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._async_gate: Optional[asyncio.Lock] = None
+        self._sync_gate = threading.Lock()
+        self.stats = {
+            "calls": 0,
+            "queued": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "rate_limited": 0,
+            "retries": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "estimated_tokens": 0,
+            "actual_tokens": 0,
+            "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
+        }
+
+    # --- Budget accounting ---
+    def _prune(self, now: float):
+        while self._window and self._window[0][0] <= now - self.window_seconds:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+
+    def _reserve(self, tokens: int):
+        """Returns (entry, 0.0) when admitted, or (None, seconds_to_wait)."""
+        with self._lock:
+            now = self._clock()
+            if now < self._paused_until:
+                return None, self._paused_until - now
+            self._prune(now)
+
+            rpm_ok = not self.rpm_limit or len(self._window) < self.rpm_limit
+            # An oversized request is still admitted into an empty window.
+            tpm_ok = (
+                not self.tpm_limit
+                or not self._window
+                or self._window_tokens + tokens <= self.tpm_limit
+            )
+            if rpm_ok and tpm_ok:
+                entry = [now, tokens]
+                self._window.append(entry)
+                self._window_tokens += tokens
+                return entry, 0.0
+
+            if not rpm_ok:
+                wait = self._window[0][0] + self.window_seconds - now
+            else:
+                # Wait until enough old tokens leave the window.
+                excess = self._window_tokens + tokens - self.tpm_limit
+                freed = 0
+                wait = self.window_seconds
+                for timestamp, used in self._window:
+                    freed += used
+                    if freed >= excess:
+                        wait = timestamp + self.window_seconds - now
+                        break
+            return None, max(wait, 0.001)
+
+    def _settle(self, entry: list, response: Any):
+        if isinstance(response, dict):  # with_structured_output(include_raw=True)
+            response = response.get("raw")
+        usage = getattr(response, "usage_metadata", None) or {}
+        actual = usage.get("total_tokens")
+        cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["prompt_tokens"] += usage.get("input_tokens") or 0
+            self.stats["cached_prompt_tokens"] += cached
+            if actual:
+                self.stats["actual_tokens"] += actual
+                if any(e is entry for e in self._window):
+                    self._window_tokens += actual - entry[1]
+                entry[1] = actual
+
+    def release(self, entry: list, keep: int = 0):
+        """
+        Shrinks the reservation of a call that was never made or never
+        finished to `keep` tokens, dropping it from the window at 0.
+        """
+        with self._lock:
+            for i, e in enumerate(self._window):
+                if e is entry:
+                    keep = max(0, min(keep, entry[1]))
+                    self._window_tokens -= entry[1] - keep
+                    entry[1] = keep
+                    if not keep:
+                        del self._window[i]
+                    return
+
+    def _unfinished_tokens(self, tokens: int, error: Optional[BaseException]) -> int:
+        """
+        What a call that did not complete still counts against the window:
+        nothing for a 429, which the provider turned away, else the prompt
+        it may have been sent, without the completion estimate.
+        """
+        import openai
+
+        if isinstance(error, openai.RateLimitError):
+            return 0
+        return max(0, tokens - self.completion_tokens)
+
+    def _on_error(self, error: Exception, attempt: int) -> float:
+        import openai
+
+        delay = retry_after_seconds(error)
+        backoff = min(self.max_delay, self.base_delay * (2**attempt))
+        if delay is None:
+            # Full jitter: spread retries so workers do not stampede together.
+            delay = random.uniform(0, backoff)
+        else:
+            delay += random.uniform(0, min(1.0, backoff * 0.1))
+
+        with self._lock:
+            self.stats["retries"] += 1
+            if isinstance(error, openai.RateLimitError):
+                self.stats["rate_limited"] += 1
+                # Everyone waits: the provider told us the whole key is throttled.
+                self._paused_until = max(self._paused_until, self._clock() + delay)
+        return delay
+
+    def _queue_enter(self):
+        with self._lock:
+            self.stats["queue_depth"] += 1
+            self.stats["max_queue_depth"] = max(
+                self.stats["max_queue_depth"], self.stats["queue_depth"]
+            )
+
+    def _queue_leave(self, waited: float):
+        with self._lock:
+            self.stats["queue_depth"] -= 1
+            self.stats["wait_seconds_total"] += waited
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+            if waited > 0.001:
+                self.stats["queued"] += 1
+
+    def estimate(self, messages) -> int:
+        tokens = estimate_message_tokens(messages) + self.completion_tokens
+        with self._lock:
+            self.stats["estimated_tokens"] += tokens
+        return tokens
+
+    # --- Async path ---
+    async def acquire(self, tokens: int) -> list:
+        if self._async_gate is None:
+            self._async_gate = asyncio.Lock()
+        start = self._clock()
+        self._queue_enter()
+        try:
+            # The gate keeps waiting callers in FIFO order.
+            async with self._async_gate:
+                while True:
+                    entry, wait = self._reserve(tokens)
+                    if entry is not None:
+                        return entry
+                    await asyncio.sleep(wait)
+        finally:
+            self._queue_leave(self._clock() - start)
+
+    async def run(
+        self,
+        call: Callable,
+        messages,
+        call_stats: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        Awaits `call(messages, **kwargs)` within the budgets, with retries.
+        `call_stats`, if given, receives this call's retries and queue wait.
+        `timeout` bounds the whole call, queueing and backoff included, and
+        raises asyncio.TimeoutError when it runs out.
+        """
+        if timeout is None:
+            return await self._run(call, messages, call_stats, **kwargs)
+        try:
+            return await asyncio.wait_for(
+                self._run(call, messages, call_stats, **kwargs), max(timeout, 0.0)
+            )
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise
+
+    async def _run(self, call: Callable, messages, call_stats, **kwargs):
+        tokens = self.estimate(messages)
+        call_stats = call_stats if call_stats is not None else {}
+        call_stats.update(retries=0, queue_seconds=0.0)
+        while True:
+            start = self._clock()
+            entry = await self.acquire(tokens)
+            call_stats["queue_seconds"] += self._clock() - start
+            try:
+                response = await call(messages, **kwargs)
+            except BaseException as e:
+                # Failed, cancelled or timed-out calls never settle; only what
+                # the provider counted may keep holding the window.
+                self.release(entry, self._unfinished_tokens(tokens, e))
+                if not isinstance(e, retryable_errors()):
+                    raise
+                attempt = call_stats["retries"]
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self.stats["failures"] += 1
+                    raise
+                delay = self._on_error(e, attempt)
+                print(
+                    f"  > LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s"
+                )
+                call_stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            self._settle(entry, response)
+            return response
+
+    # --- Sync path (evaluate_resume) ---
+    def acquire_sync(self, tokens: int, give_up_at: Optional[float] = None) -> list:
+        """Raises TimeoutError when the budget frees up only after `give_up_at`."""
+        start = self._clock()
+        self._queue_enter()
+        try:
+            with self._sync_gate:
+                while True:
+                    entry, wait = self._reserve(tokens)
+                    if entry is not None:
+                        return entry
+                    if give_up_at is not None and self._clock() + wait > give_up_at:
+                        raise TimeoutError("LLM budget frees up after the deadline")
+                    time.sleep(wait)
+        finally:
+            self._queue_leave(self._clock() - start)
+
+    def run_sync(
+        self,
+        call: Callable,
+        messages,
+        call_stats: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        Sync twin of run(). With `timeout`, what is left of it is passed to
+        the client as the request timeout, and queueing or a retry that
+        cannot finish in time raises TimeoutError.
+        """
+        give_up_at = None if timeout is None else self._clock() + max(timeout, 0.0)
+        try:
+            return self._run_sync(call, messages, call_stats, give_up_at, **kwargs)
+        except TimeoutError:
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise
+
+    def _run_sync(self, call: Callable, messages, call_stats, give_up_at, **kwargs):
+        tokens = self.estimate(messages)
+        call_stats = call_stats if call_stats is not None else {}
+        call_stats.update(retries=0, queue_seconds=0.0)
+        while True:
+            start = self._clock()
+            entry = self.acquire_sync(tokens, give_up_at)
+            call_stats["queue_seconds"] += self._clock() - start
+            if give_up_at is not None:
+                left = give_up_at - self._clock()
+                if left <= 0:
+                    self.release(entry)
+                    raise TimeoutError("Deadline reached before the LLM call")
+                kwargs["timeout"] = left
+            try:
+                response = call(messages, **kwargs)
+            except BaseException as e:
+                self.release(entry, self._unfinished_tokens(tokens, e))
+                if not isinstance(e, retryable_errors()):
+                    raise
+                attempt = call_stats["retries"]
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self.stats["failures"] += 1
+                    raise
+                delay = self._on_error(e, attempt)
+                if give_up_at is not None and self._clock() + delay >= give_up_at:
+                    raise TimeoutError("No time left to retry the LLM call") from e
+                print(
+                    f"  > LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s"
+                )
+                call_stats["retries"] += 1
+                time.sleep(delay)
+                continue
+            self._settle(entry, response)
+            return response
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(self._clock())
+            calls = self.stats["calls"] or 1
+            return {
+                **self.stats,
+                "wait_seconds_avg": round(self.stats["wait_seconds_total"] / calls, 4),
+                "window_requests": len(self._window),
+                "window_tokens": self._window_tokens,
+                "rpm_limit": self.rpm_limit,
+                "tpm_limit": self.tpm_limit,
+            }
+
+
+# --- Shared instance ---
+_SCHEDULER: Optional[LLMScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULER is None:
+                _SCHEDULER = LLMScheduler(
+                    rpm_limit=env_int("LLM_RPM_LIMIT", 500),
+                    tpm_limit=env_int("LLM_TPM_LIMIT", 200000),
+                    max_retries=env_int("LLM_MAX_RETRIES", 5),
+                    base_delay=env_float("LLM_BACKOFF_BASE", 1.0),
+                    max_delay=env_float("LLM_BACKOFF_MAX", 60.0),
+                    completion_tokens=env_int("LLM_EST_COMPLETION_TOKENS", 800),
+                )
+    return _SCHEDULER
+
+
+def reset_llm_scheduler():
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        _SCHEDULER = None
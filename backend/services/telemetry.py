@@ -0,0 +1,251 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+# --- Aggregate metrics (Prometheus text format) ---
+# A small in-process registry instead of a client library: a handful of
+# labelled counters and histograms, rendered on GET /metrics.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float):
+        series = self.values.setdefault(labels, [0] * (len(self.buckets) + 2))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = bound if bound == "+Inf" else f"{bound:g}"
+                bucket_labels = labels + (("le", le),)
+                lines.append(
+                    f"{self.name}_bucket{_labels(bucket_labels)} {cumulative:g}"
+                )
+            lines.append(f"{self.name}_sum{_labels(labels)} {series[-1]:.6g}")
+            lines.append(f"{self.name}_count{_labels(labels)} {cumulative:g}")
+        return lines
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+_METRICS_LOCK = threading.Lock()
+STAGE_SECONDS = Histogram(
+    "skrut_stage_duration_seconds",
+    "Duration of one pipeline stage (upload_read, extraction, reviewer, auditor, ...).",
+)
+EVALUATION_SECONDS = Histogram(
+    "skrut_evaluation_duration_seconds", "End-to-end duration of one evaluation."
+)
+EVALUATIONS = Counter(
+    "skrut_evaluations_total",
+    "Finished evaluations by outcome (completed, cached, error).",
+)
+LLM_CALLS = Counter("skrut_llm_calls_total", "LLM calls by graph node.")
+LLM_TOKENS = Counter(
+    "skrut_llm_tokens_total", "LLM tokens by graph node and kind (prompt, completion)."
+)
+LLM_RETRIES = Counter(
+    "skrut_llm_retries_total", "Retried LLM calls (429/5xx/connection) by graph node."
+)
+LLM_MODEL_TOKENS = Counter(
+    "skrut_llm_model_tokens_total",
+    "LLM tokens by graph node, model and kind (prompt, completion).",
+)
+AUDITOR_VERDICTS = Counter(
+    "skrut_auditor_verdicts_total", "Auditor verdicts (PASS, FAIL)."
+)
+_METRICS = (
+    STAGE_SECONDS,
+    EVALUATION_SECONDS,
+    EVALUATIONS,
+    LLM_CALLS,
+    LLM_TOKENS,
+    LLM_RETRIES,
+    LLM_MODEL_TOKENS,
+    AUDITOR_VERDICTS,
+)
+
+
+def observe_span(span: Dict[str, Any]):
+    """Feeds one finished span into the aggregate metrics."""
+    stage = span["stage"]
+    node = (("node", stage),)
+    with _METRICS_LOCK:
+        STAGE_SECONDS.observe((("stage", stage),), span["duration_ms"] / 1000.0)
+        if "input_tokens" in span:
+            LLM_CALLS.inc(node)
+            LLM_TOKENS.inc(node + (("kind", "prompt"),), span["input_tokens"])
+            LLM_TOKENS.inc(node + (("kind", "completion"),), span["output_tokens"])
+            LLM_RETRIES.inc(node, span.get("retries", 0))
+            if span.get("model"):
+                by_model = node + (("model", span["model"]),)
+                LLM_MODEL_TOKENS.inc(
+                    by_model + (("kind", "prompt"),), span["input_tokens"]
+                )
+                LLM_MODEL_TOKENS.inc(
+                    by_model + (("kind", "completion"),), span["output_tokens"]
+                )
+        if stage == "auditor" and "verdict" in span:
+            AUDITOR_VERDICTS.inc((("verdict", span["verdict"]),))
+
+
+def observe_evaluation(outcome: str, seconds: float):
+    with _METRICS_LOCK:
+        EVALUATIONS.inc((("outcome", outcome),))
+        EVALUATION_SECONDS.observe((("outcome", outcome),), seconds)
+
+
+def render_metrics(gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+    """Prometheus exposition text; `gauges` maps name -> (help, value)."""
+    lines: List[str] = []
+    with _METRICS_LOCK:
+        for metric in _METRICS:
+            lines.extend(metric.render())
+    for name, (help_text, value) in (gauges or {}).items():
+        lines += [
+            f"# HELP {name} {help_text}",
+            f"# TYPE {name} gauge",
+            f"{name} {value:g}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    with _METRICS_LOCK:
+        for metric in _METRICS:
+            metric.values.clear()
+
+
+# --- Per-request spans ---
+Timer = Tuple[float, float]  # (wall clock, perf counter) at the start
+
+
+def start_timer() -> Timer:
+    return time.time(), time.perf_counter()
+
+
+def make_span(stage: str, timer: Timer, **attrs) -> Dict[str, Any]:
+    """Closes one timed stage that began at `timer` and records it."""
+    span = {
+        "stage": stage,
+        "started_at": round(timer[0], 4),
+        "duration_ms": round((time.perf_counter() - timer[1]) * 1000, 2),
+        **attrs,
+    }
+    observe_span(span)
+    return span
+
+
+def llm_span(
+    stage: str,
+    timer: Timer,
+    attempt: int,
+    usage: Dict[str, Any],
+    call_stats: Dict[str, Any],
+    **attrs,
+) -> Dict[str, Any]:
+    """Span of one Reviewer/Auditor call, with its tokens and scheduler retries."""
+    return make_span(
+        stage,
+        timer,
+        attempt=attempt,
+        model=usage.get("model"),
+        input_tokens=usage["input_tokens"],
+        output_tokens=usage["output_tokens"],
+        retries=call_stats.get("retries", 0),
+        queue_ms=round(call_stats.get("queue_seconds", 0.0) * 1000, 2),
+        **attrs,
+    )
+
+
+class RequestTrace:
+    """Spans of one evaluation request, summarized on the final event."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def span(self, stage: str, **attrs):
+        """Times the block; attributes may be added to the yielded dict."""
+        timer = start_timer()
+        try:
+            yield attrs
+        finally:
+            self.spans.append(make_span(stage, timer, **attrs))
+
+    def add(self, span: Dict[str, Any]):
+        self.spans.append(span)
+
+    def extend(self, spans: List[Dict[str, Any]]):
+        """Adds spans recorded elsewhere (the graph's state)."""
+        self.spans.extend(spans)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def finish(self, outcome: str):
+        observe_evaluation(outcome, self.elapsed())
+
+    def summary(self) -> Dict[str, Any]:
+        stages: Dict[str, float] = {}
+        for span in self.spans:
+            stages[span["stage"]] = stages.get(span["stage"], 0) + span["duration_ms"]
+        llm = [s for s in self.spans if "input_tokens" in s]
+        return {
+            "total_ms": round(self.elapsed() * 1000, 2),
+            "stages_ms": {stage: round(ms, 2) for stage, ms in stages.items()},
+            "llm_calls": len(llm),
+            "prompt_tokens": sum(s["input_tokens"] for s in llm),
+            "completion_tokens": sum(s["output_tokens"] for s in llm),
+            "retries": sum(s.get("retries", 0) for s in llm),
+            "spans": [
+                {
+                    **span,
+                    "offset_ms": round(
+                        max(0.0, span["started_at"] - self.started_at) * 1000, 2
+                    ),
+                }
+                for span in self.spans
+            ],
+        }
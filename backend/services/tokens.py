@@ -0,0 +1,30 @@
+from typing import Iterable
+
+# --- Token estimation ---
+# A cheap, offline approximation of the OpenAI tokenizer. English text runs
+# at roughly 4 characters per token; Thai and other non-Latin scripts are
+# much denser, so non-ASCII characters are counted at ~1.5 per token.
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_CHARS_PER_TOKEN = 1.5
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return int(
+        ascii_chars / ASCII_CHARS_PER_TOKEN
+        + non_ascii / NON_ASCII_CHARS_PER_TOKEN
+        + 0.999
+    )
+
+
+def estimate_message_tokens(messages: Iterable) -> int:
+    """Estimates prompt tokens for a list of LangChain messages."""
+    total = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        total += estimate_tokens(str(content)) + MESSAGE_OVERHEAD_TOKENS
+    return total
@@ -0,0 +1,76 @@
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from services.config import env_bool
+from services.parsing import ParsedEvaluation, parse_evaluation_text
+
+# --- Deterministic checks on Reviewer output ---
+# The Auditor prompt must PASS a low score that says core requirements are
+# missing; these are the ways the Reviewer prompt tends to say it.
+MISSING_CORE_RE = re.compile(
+    r"no relevant skills found"
+    r"|lacks? (?:almost )?all (?:of the )?core requirements"
+    r"|ไม่พบทักษะที่เกี่ยวข้อง"
+    r"|ไม่มีทักษะที่เกี่ยวข้อง"
+    r"|ขาดคุณสมบัติหลัก",
+    re.IGNORECASE,
+)
+AUTO_PASS_MAX_SCORE = 3.0
+
+MALFORMED_FEEDBACK_TEMPLATE = (
+    "FAIL: รูปแบบผลการประเมินไม่ถูกต้อง ไม่พบ {missing} "
+    "กรุณาเขียนผลการประเมินใหม่ทั้งหมดโดยใช้หัวข้อ 0, 1 และ 2 ตามที่กำหนด"
+)
+
+# Verdicts
+AUDIT = "AUDIT"
+RETRY = "RETRY"
+AUTO_PASS = "PASS"
+
+
+def validator_enabled() -> bool:
+    return env_bool("REVIEW_VALIDATOR_ENABLED", True)
+
+
+def validate_reviewer_output(
+    text: str, parsed: Optional[ParsedEvaluation] = None
+) -> Tuple[str, str]:
+    """
+    Returns (verdict, detail):
+    RETRY with mentor feedback when the output is malformed, PASS when the
+    outcome is already fixed by the Auditor's own rules, AUDIT otherwise.
+    """
+    parsed = parsed or parse_evaluation_text(text)
+    missing = parsed.missing_fields()
+    if missing:
+        return RETRY, MALFORMED_FEEDBACK_TEMPLATE.format(missing=", ".join(missing))
+    if float(parsed.score) <= AUTO_PASS_MAX_SCORE and MISSING_CORE_RE.search(text):
+        return AUTO_PASS, "PASS (low score with core requirements missing)"
+    return AUDIT, ""
+
+
+# --- Aggregate counters ---
+_STATS_LOCK = threading.Lock()
+_STATS = {"checked": 0, "audited": 0, "retried": 0, "auto_passed": 0}
+
+
+def record_verdict(verdict: str):
+    key = {AUDIT: "audited", RETRY: "retried", AUTO_PASS: "auto_passed"}[verdict]
+    with _STATS_LOCK:
+        _STATS["checked"] += 1
+        _STATS[key] += 1
+
+
+def validator_snapshot() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        return {
+            **_STATS,
+            "auditor_calls_avoided": _STATS["retried"] + _STATS["auto_passed"],
+        }
+
+
+def reset_validator_stats():
+    with _STATS_LOCK:
+        for key in _STATS:
+            _STATS[key] = 0
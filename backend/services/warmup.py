@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from services.config import env_bool
+
+# --- Startup warm-up ---
+# main.py imports the heavy modules only when they are first needed, so a
+# cold instance answers health checks quickly. Without a warm-up the first
+# evaluation then pays for importing LangChain/LangGraph and PyMuPDF,
+# building the LLM clients and graph, and starting the extraction pool.
+# WARMUP_ON_STARTUP does that work in a background thread right after
+# startup, while the server already accepts connections.
+
+
+def warmup_enabled() -> bool:
+    return env_bool("WARMUP_ON_STARTUP", False)
+
+
+_STATE_LOCK = threading.Lock()
+_STATE: Dict[str, Any] = {"status": "idle", "steps_ms": {}, "errors": {}}
+
+
+def _import_ai():
+    import services.ai  # noqa: F401  LangChain, LangGraph, the OpenAI SDK
+
+
+def _build_judge():
+    from services.ai import _get_api_key, get_judge_engine
+
+    if not _get_api_key():
+        raise RuntimeError("OPENAI_API_KEY is not set")
+    get_judge_engine()  # LLM clients, HTTP pools and the compiled graph
+
+
+def _sample_pdf() -> bytes:
+    import pymupdf as fitz
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Warm-up " * 20)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _load_pdf_engine():
+    from services.ocr import extract_text_from_pdf
+
+    extract_text_from_pdf(_sample_pdf())
+
+
+def _start_extraction_pool():
+    from services.ocr import _count_pages, get_extraction_pool
+
+    pool, parallel = get_extraction_pool()
+    # Spawned workers import PyMuPDF on their first task; give each one a task.
+    workers = getattr(pool, "_max_workers", 1) if parallel else 1
+    pdf = _sample_pdf()
+    for future in [pool.submit(_count_pages, pdf) for _ in range(workers)]:
+        future.result()
+
+
+WARMUP_STEPS: Dict[str, Callable[[], None]] = {
+    "import_ai": _import_ai,
+    "judge_engine": _build_judge,
+    "pdf_engine": _load_pdf_engine,
+    "extraction_pool": _start_extraction_pool,
+}
+
+
+def warm_up() -> Dict[str, Any]:
+    """Runs every warm-up step; a failing step is recorded and skipped."""
+    with _STATE_LOCK:
+        _STATE.update(status="running", steps_ms={}, errors={})
+    started = time.perf_counter()
+    for name, step in WARMUP_STEPS.items():
+        step_start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"  > Warning: warm-up step {name} failed: {e}")
+            with _STATE_LOCK:
+                _STATE["errors"][name] = str(e)
+            continue
+        with _STATE_LOCK:
+            _STATE["steps_ms"][name] = round(
+                (time.perf_counter() - step_start) * 1000, 2
+            )
+    total_ms = round((time.perf_counter() - started) * 1000, 2)
+    print(f"  > Warm-up finished in {total_ms} ms")
+    with _STATE_LOCK:
+        _STATE.update(status="done", total_ms=total_ms)
+    return warmup_snapshot()
+
+
+def start_warmup() -> asyncio.Task:
+    """Schedules warm_up() on a worker thread; the event loop stays free."""
+    return asyncio.get_running_loop().create_task(
+        asyncio.to_thread(warm_up), name="warmup"
+    )
+
+
+def warmup_snapshot() -> Dict[str, Any]:
+    with _STATE_LOCK:
+        return {
+            **_STATE,
+            "steps_ms": dict(_STATE["steps_ms"]),
+            "errors": dict(_STATE["errors"]),
+        }
+
+
+def reset_warmup_state():
+    with _STATE_LOCK:
+        _STATE.clear()
+        _STATE.update(status="idle", steps_ms={}, errors={})
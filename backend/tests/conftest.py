@@ -0,0 +1,207 @@
+import asyncio
+import re
+import time
+from typing import Any, List, Optional
+
+import httpx
+import openai
+import pymupdf as fitz
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+REVIEWER_TEXT = """
+0. **Candidate Metadata**:
+   - Name: Somchai Jaidee
+   - Email: somchai@example.com
+1. Score (0-10): 7
+2. Analysis: Solid Python and FastAPI background.
+"""
+
+
+class StubChatModel(BaseChatModel):
+    """Offline stand-in for ChatOpenAI with a configurable per-call delay."""
+
+    delay: float = 0.0
+    reviewer_text: str = REVIEWER_TEXT
+    reviewer_replies: List[str] = []  # Consumed first, then reviewer_text
+    auditor_verdicts: List[str] = []
+    calls: List[str] = []
+    prompts: List[List[BaseMessage]] = []
+    usage: Optional[dict] = None
+    delays: List[float] = []  # Per call, consumed before `delay` applies
+    cancelled: int = 0  # Async calls cancelled while in flight
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        is_auditor = any("HR Auditor" in str(m.content) for m in messages)
+        self.calls.append("auditor" if is_auditor else "reviewer")
+        self.prompts.append(list(messages))
+        if not is_auditor:
+            if self.reviewer_replies:
+                return self.reviewer_replies.pop(0)
+            return self.reviewer_text
+        if self.auditor_verdicts:
+            return self.auditor_verdicts.pop(0)
+        return "PASS"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay = self.delays.pop(0) if self.delays else self.delay
+        timeout = kwargs.get("timeout")
+        if timeout is not None and delay > timeout:
+            # What the OpenAI client does when the request timeout runs out.
+            time.sleep(timeout)
+            raise openai.APITimeoutError(request=httpx.Request("POST", "/stub"))
+        time.sleep(delay)
+        message = AIMessage(content=self._respond(messages), usage_metadata=self.usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _await_delay(self):
+        try:
+            await asyncio.sleep(self.delays.pop(0) if self.delays else self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await self._await_delay()
+        finally:
+            self.in_flight -= 1
+        message = AIMessage(content=self._respond(messages), usage_metadata=self.usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema, *, include_raw=False, **kwargs):
+        """Mimics ChatOpenAI's json_schema mode: the reply text is the JSON."""
+
+        def parse(message):
+            try:
+                parsed, error = schema.model_validate_json(message.content), None
+            except ValueError as e:
+                parsed, error = None, e
+            if include_raw:
+                return {"raw": message, "parsed": parsed, "parsing_error": error}
+            return parsed
+
+        return self | RunnableLambda(parse)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ):
+        """Streams the reply word by word; used when a stream handler listens."""
+        await self._await_delay()
+        for piece in re.split(r"(?<=\s)", self._respond(messages)):
+            if piece:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self.usage)
+        )
+
+
+@pytest.fixture(autouse=True)
+def fresh_shared_state(monkeypatch, tmp_path):
+    """Keeps caches, budgets and registered JDs from leaking between tests."""
+    from services.admission import reset_admission_controller
+    from services.artifacts import reset_artifact_cache
+    from services.cache import reset_result_cache
+    from services.dedup import reset_duplicate_index
+    from services.parsing import reset_parse_stats
+    from services.routing import reset_routing_stats
+    from services.jd_registry import reset_jd_registry
+    from services.jobs import reset_job_manager
+    from services.scheduler import reset_llm_scheduler
+    from services.telemetry import reset_metrics
+    from services.validator import reset_validator_stats
+    from services.warmup import reset_warmup_state
+
+    monkeypatch.setenv("JD_REGISTRY_DB", str(tmp_path / "jd_registry.db"))
+    resets = (
+        reset_admission_controller,
+        reset_result_cache,
+        reset_artifact_cache,
+        reset_duplicate_index,
+        reset_llm_scheduler,
+        reset_jd_registry,
+        reset_validator_stats,
+        reset_parse_stats,
+        reset_routing_stats,
+        reset_metrics,
+        reset_job_manager,
+        reset_warmup_state,
+    )
+    for reset in resets:
+        reset()
+    yield
+    for reset in resets:
+        reset()
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Replaces ChatOpenAI in services.ai with a shared StubChatModel."""
+    import services.ai
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    stub = StubChatModel(
+        calls=[], prompts=[], auditor_verdicts=[], reviewer_replies=[], delays=[]
+    )
+    monkeypatch.setattr(services.ai, "ChatOpenAI", lambda **kwargs: stub)
+    services.ai.reset_judge_engine()
+    yield stub
+    services.ai.reset_judge_engine()
+
+
+@pytest.fixture
+def job_description():
+    """Registers a JD and returns its profile."""
+    from services.jd_registry import get_jd_registry
+
+    return get_jd_registry().register(
+        "Backend Developer: Python, FastAPI, PostgreSQL, Docker"
+    )
+
+
+def make_pdf(pages: int = 1, text: str = "") -> bytes:
+    """Builds a small digital PDF in memory."""
+    body = text or (
+        "Somchai Jaidee - somchai@example.com\n"
+        "Experience: 4 years Python, FastAPI and PostgreSQL development.\n"
+        "Skills: Docker, Linux, REST APIs, unit testing."
+    )
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{body}\nPage {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def resume_pdf() -> bytes:
+    return make_pdf()
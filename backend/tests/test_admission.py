@@ -0,0 +1,183 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from main import app
+from services.admission import AdmissionController, get_admission_controller
+
+
+def test_slots_are_shared_round_robin_across_clients():
+    controller = AdmissionController(max_active=1, max_waiting=10)
+    running = controller.reserve("a")
+    a1, a2, a3 = (controller.reserve("a") for _ in range(3))
+    b1 = controller.reserve("b")
+
+    assert running.granted
+    assert [controller.position(t) for t in (a1, b1, a2, a3)] == [1, 2, 3, 4]
+
+    running.release()
+    assert a1.granted and controller.position(b1) == 1
+    a1.release()
+    assert b1.granted  # B's turn, ahead of A's backlog
+    assert controller.position(a2) == 1
+
+
+def test_waiter_that_gives_up_leaves_the_queue():
+    controller = AdmissionController(max_active=1, max_waiting=10)
+    running = controller.reserve("a")
+    waiting = controller.reserve("b")
+
+    waiting.release()
+    running.release()
+
+    assert controller.snapshot()["waiting"] == 0
+    assert controller.snapshot()["abandoned"] == 1
+    assert controller.active == 0
+
+
+def test_full_queue_is_answered_with_503(monkeypatch, resume_pdf):
+    monkeypatch.setenv("EVALUATE_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("EVALUATE_MAX_QUEUED", "0")
+    get_admission_controller().reserve("someone-else")
+    client = TestClient(app)
+
+    response = client.post(
+        "/evaluate", files={"file": ("cv.pdf", resume_pdf, "application/pdf")}
+    )
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+    assert response.json()["code"] == "overloaded"
+    assert client.get("/stats").json()["admission"]["rejected"] == 1
+
+
+def _multipart(pdf: bytes):
+    request = httpx.Request(
+        "POST", "http://test", files={"file": ("cv.pdf", pdf, "application/pdf")}
+    )
+    return request.read(), request.headers["content-type"]
+
+
+def test_queued_request_reports_its_position_before_its_upload_is_read(
+    monkeypatch, stub_llm, job_description, resume_pdf
+):
+    monkeypatch.setenv("EVALUATE_MAX_CONCURRENCY", "1")
+    body, content_type = _multipart(resume_pdf)
+    upload_read = []
+
+    async def upload():
+        upload_read.append(True)
+        yield body
+
+    async def run():
+        controller = get_admission_controller()
+        holder = controller.reserve("someone-else")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            request = asyncio.create_task(
+                client.post(
+                    "/evaluate",
+                    params={"cache": "false"},
+                    content=upload(),
+                    headers={"content-type": content_type},
+                )
+            )
+            while controller.waiting == 0:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            # Nothing runs, and nothing is buffered, while it waits.
+            assert stub_llm.calls == [] and upload_read == []
+            holder.release()
+            return await request
+
+    response = asyncio.run(run())
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0]["queue_position"] == 1
+    assert events[-1]["status"] == "completed"
+    assert get_admission_controller().snapshot()["active"] == 0
+
+
+def test_error_after_the_wait_ends_the_stream(monkeypatch, resume_pdf):
+    monkeypatch.setenv("EVALUATE_MAX_CONCURRENCY", "1")
+
+    async def run():
+        controller = get_admission_controller()
+        holder = controller.reserve("someone-else")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            request = asyncio.create_task(
+                client.post("/evaluate", files={"upload": ("cv.pdf", resume_pdf)})
+            )
+            while controller.waiting == 0:
+                await asyncio.sleep(0.01)
+            holder.release()
+            return await request
+
+    response = asyncio.run(run())
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0]["queue_position"] == 1
+    assert events[-1]["status"] == "error" and events[-1]["code"] == 422
+
+
+def test_batch_items_and_jobs_share_the_slots(
+    monkeypatch, stub_llm, job_description, resume_pdf
+):
+    monkeypatch.setenv("EVALUATE_MAX_CONCURRENCY", "1")
+
+    async def run():
+        controller = get_admission_controller()
+        holder = controller.reserve("someone-else")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            files = [("files", (f"cv_{i}.pdf", resume_pdf)) for i in range(2)]
+            batch = asyncio.create_task(
+                client.post("/evaluate/batch", params={"cache": "false"}, files=files)
+            )
+            job = await client.post(
+                "/jobs",
+                params={"cache": "false"},
+                files={"file": ("cv.pdf", resume_pdf, "application/pdf")},
+            )
+            while controller.waiting < 3:
+                await asyncio.sleep(0.01)
+            assert stub_llm.calls == []
+            holder.release()
+            batch_response = await batch
+            job_events = await client.get(job.json()["events_url"])
+            return batch_response, job_events
+
+    batch, job = asyncio.run(run())
+
+    batch_events = [json.loads(line) for line in batch.text.splitlines()]
+    assert batch_events[-1]["completed"] == 2
+    assert any("queue_position" in e for e in batch_events)
+    job_events = [json.loads(line) for line in job.text.splitlines()]
+    assert job_events[-1]["status"] == "completed"
+    assert len(stub_llm.calls) == 6
+    snapshot = get_admission_controller().snapshot()
+    # The holder, each batch file twice (extraction, judging) and the job.
+    assert snapshot["active"] == 0 and snapshot["admitted"] == 6
+
+
+def test_batch_is_shed_before_its_uploads_are_read(monkeypatch, resume_pdf):
+    monkeypatch.setenv("EVALUATE_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("EVALUATE_MAX_QUEUED", "0")
+    get_admission_controller().reserve("someone-else")
+    client = TestClient(app)
+
+    response = client.post(
+        "/evaluate/batch", files=[("files", ("cv.pdf", resume_pdf, "application/pdf"))]
+    )
+
+    assert response.status_code == 503
+    assert response.json()["code"] == "overloaded"
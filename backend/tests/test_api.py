@@ -1,7 +1,7 @@
-import os
-import pytest
+import json
+
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+
 from main import app
 
 client = TestClient(app)
@@ -10,11 +10,11 @@ client = TestClient(app)
 def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok", "mode": "privacy-focused"}
+    assert response.json()["status"] == "ok"
+    assert response.json()["mode"] == "privacy-focused"
 
 
 def test_get_job_description():
-    # Ensure a JD file exists or handle empty
     response = client.get("/job-description")
     assert response.status_code == 200
     assert "content" in response.json()
@@ -30,34 +30,18 @@ def test_update_job_description():
     assert get_res.json()["content"] == new_jd
 
 
-@patch("services.ocr.extract_text_from_pdf")
-@patch("services.ai.evaluate_resume")
-def test_evaluate_endpoint(mock_evaluate, mock_ocr):
-    # 1. Setup Mocks
-    mock_ocr.return_value = "Candidate Resume Text..."
-    mock_evaluate.return_value = {
-        "score": "8.5",
-        "recommendation": "Hire",
-        "analysis": "Great fit.",
-        "conversation_log": [{"role": "Reviewer", "content": "Hello", "timestamp": 1}],
-    }
-
-    # 2. Create Dummy PDF
-    file_content = b"%PDF-1.4 dummy content"
-    files = {"file": ("test_resume.pdf", file_content, "application/pdf")}
+def test_evaluate_endpoint(stub_llm, job_description, resume_pdf):
+    files = {"file": ("test_resume.pdf", resume_pdf, "application/pdf")}
 
-    # 3. Call Endpoint
     response = client.post("/evaluate", files=files)
 
-    # 4. assertions
     assert response.status_code == 200
-    data = response.json()
-
-    assert data["score"] == "8.5"
-    assert data["recommendation"] == "Hire"
-    assert data["analysis"] == "Great fit."
-    assert len(data["conversation_log"]) == 1
-
-    # Verify mocks were called
-    mock_ocr.assert_called_once()
-    mock_evaluate.assert_called_once()
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert events[0]["status"] == "progress"
+    data = events[-1]
+    assert data["status"] == "completed"
+    assert data["score"] == "7"
+    assert data["candidate_name"] == "Somchai Jaidee"
+    assert data["analysis"]
+    assert [m["role"] for m in data["conversation_log"]][-1] == "Auditor"
+    assert stub_llm.calls == ["reviewer", "auditor"]
@@ -0,0 +1,137 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+from services.artifacts import ArtifactCache, build_artifacts, get_artifact_cache
+from services.jd_registry import get_jd_registry
+from services.ocr import resume_sections
+from tests.conftest import make_pdf
+
+client = TestClient(app)
+
+PLAIN_RESUME = (
+    "Somchai Jaidee\n"
+    "Experience\n"
+    "Backend developer at Siam Pay, 2019-2024.\n"
+    "Skills: Python, FastAPI, Docker"
+)
+
+
+def _evaluate(pdf: bytes, cache="true"):
+    response = client.post(
+        "/evaluate",
+        params={"cache": cache},
+        files={"file": ("cv.pdf", pdf, "application/pdf")},
+    )
+    return [json.loads(line) for line in response.text.splitlines()][-1]
+
+
+def _count_extractions(monkeypatch):
+    calls = []
+    extract = main.extract_text_from_pdf_async
+
+    async def counting(*args, **kwargs):
+        calls.append(1)
+        return await extract(*args, **kwargs)
+
+    monkeypatch.setattr(main, "extract_text_from_pdf_async", counting)
+    return calls
+
+
+def test_edited_jd_reuses_the_extracted_resume(
+    monkeypatch, stub_llm, job_description, resume_pdf
+):
+    extractions = _count_extractions(monkeypatch)
+    first = _evaluate(resume_pdf)
+    get_jd_registry().register("Backend Developer: Python, FastAPI, Kubernetes")
+
+    second = _evaluate(resume_pdf)
+
+    assert second["status"] == "completed" and second["cached"] is False
+    assert second["jd_id"] != first["jd_id"]
+    assert len(extractions) == 1
+    extraction = next(
+        s for s in second["timings"]["spans"] if s["stage"] == "extraction"
+    )
+    assert extraction["cached"] is True
+    assert get_artifact_cache().snapshot()["hits"] == 1
+
+
+def test_prescreen_scores_the_cached_term_counts(
+    monkeypatch, stub_llm, job_description, resume_pdf
+):
+    monkeypatch.setenv("PRESCREEN_MODE", "cheap")
+    first = _evaluate(resume_pdf)
+    get_jd_registry().register("Backend Developer: Python, FastAPI, Kubernetes")
+
+    second = _evaluate(resume_pdf)
+
+    assert first["prescreen"]["score"] > 0
+    assert second["prescreen"]["score"] > 0
+    assert get_artifact_cache().snapshot()["hits"] == 1
+
+
+def test_cache_can_be_switched_off(monkeypatch, stub_llm, job_description):
+    monkeypatch.setenv("ARTIFACT_CACHE_ENABLED", "false")
+    extractions = _count_extractions(monkeypatch)
+
+    _evaluate(make_pdf())
+    get_jd_registry().register("Backend Developer: Python, FastAPI, Kubernetes")
+    _evaluate(make_pdf())
+
+    assert len(extractions) == 2
+    assert get_artifact_cache().snapshot()["entries"] == 0
+
+
+def test_nothing_is_kept_without_the_result_cache(
+    monkeypatch, stub_llm, job_description
+):
+    _evaluate(make_pdf(), cache="false")
+    monkeypatch.setenv("RESULT_CACHE_ENABLED", "false")
+    _evaluate(make_pdf(text=PLAIN_RESUME))
+
+    snapshot = get_artifact_cache().snapshot()
+    assert snapshot["entries"] == 0 and snapshot["hits"] + snapshot["misses"] == 0
+
+
+def test_features_are_built_only_when_used(
+    monkeypatch, stub_llm, job_description, resume_pdf
+):
+    _evaluate(resume_pdf)
+    (plain,) = get_artifact_cache()._entries.values()
+    monkeypatch.setenv("DUPLICATE_MODE", "flag")
+    get_jd_registry().register("Backend Developer: Python, FastAPI, Kubernetes")
+    _evaluate(resume_pdf)
+
+    (signed,) = get_artifact_cache()._entries.values()
+    assert plain.term_counts is None and plain.fingerprint is None
+    assert signed.fingerprint is not None and signed.term_counts is None
+    assert signed.nbytes > plain.nbytes
+    assert get_artifact_cache().snapshot()["bytes"] == signed.nbytes
+
+
+def test_cache_evicts_by_total_bytes():
+    artifacts = build_artifacts(PLAIN_RESUME, counts=True, signature=True)
+    cache = ArtifactCache(max_bytes=artifacts.nbytes * 2)
+
+    for key in ("a", "b", "c"):
+        cache.put(key, artifacts)
+
+    assert cache.get("a") is None
+    assert cache.get("c") is artifacts
+    assert cache.snapshot()["bytes"] == artifacts.nbytes * 2
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_sections_are_found_in_plain_and_compact_text():
+    compact = "[CONTACT]\nSomchai Jaidee\n[SKILLS]\nPython, FastAPI, Docker"
+
+    assert resume_sections(PLAIN_RESUME) == {
+        "contact": "Somchai Jaidee",
+        "experience": "Backend developer at Siam Pay, 2019-2024.",
+        "skills": "Python, FastAPI, Docker",
+    }
+    assert resume_sections(compact)["skills"] == "Python, FastAPI, Docker"
+    assert resume_sections("Just one paragraph of text.") == {}
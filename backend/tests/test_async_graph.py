@@ -0,0 +1,108 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from main import app
+from services.ai import ResumeJudgeGraph, evaluate_resume
+
+
+def _events(body: str):
+    return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+async def _post_evaluate(client: httpx.AsyncClient, pdf: bytes):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    response = await client.post("/evaluate", files=files)
+    return _events(response.text)
+
+
+def test_concurrent_evaluations_overlap_llm_waits(
+    stub_llm, job_description, resume_pdf
+):
+    stub_llm.delay = 0.3
+    n_requests = 6
+
+    async def run():
+        # A small worker: sync LLM calls would be capped by these two threads.
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=2)
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *[_post_evaluate(client, resume_pdf) for _ in range(n_requests)]
+            )
+            return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+
+    for events in results:
+        assert events[-1]["status"] == "completed"
+        assert events[-1]["score"] == "7"
+
+    # One evaluation = reviewer + auditor = 2 stubbed LLM latencies.
+    one_evaluation = 2 * stub_llm.delay
+    assert elapsed < one_evaluation * 2, elapsed
+    assert len(stub_llm.calls) == 2 * n_requests
+
+
+def test_health_check_not_blocked_by_evaluation(stub_llm, job_description, resume_pdf):
+    stub_llm.delay = 0.5
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            evaluation = asyncio.create_task(_post_evaluate(client, resume_pdf))
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            health = await client.head("/")
+            health_latency = time.perf_counter() - start
+            await evaluation
+            return health, health_latency
+
+    health, health_latency = asyncio.run(run())
+    assert health.status_code == 200
+    assert health_latency < stub_llm.delay
+
+
+def test_sync_evaluate_resume_still_works(stub_llm):
+    stub_llm.auditor_verdicts = ["FAIL: คะแนนสูงเกินไป"]
+
+    result = evaluate_resume("Resume text", "Backend Developer")
+
+    assert result["score"] == "7"
+    assert result["name"] == "Somchai Jaidee"
+    assert result["email"] == "somchai@example.com"
+    assert [entry["role"] for entry in result["conversation_log"]] == [
+        "Reviewer",
+        "Auditor",
+        "Reviewer",
+        "Auditor",
+    ]
+
+
+def test_async_graph_matches_sync_graph(stub_llm):
+    graph = ResumeJudgeGraph().build_graph()
+    state = {
+        "resume_text": "Resume text",
+        "job_description": "Backend Developer",
+        "reviewer_output": "",
+        "feedback_history": [],
+        "conversation_history": [],
+        "retry_count": 0,
+        "temp_status": "START",
+    }
+
+    sync_state = graph.invoke(dict(state))
+    async_state = asyncio.run(graph.ainvoke(dict(state)))
+
+    assert sync_state["reviewer_output"] == async_state["reviewer_output"]
+    assert sync_state["temp_status"] == async_state["temp_status"] == "PASS"
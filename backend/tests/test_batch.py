@@ -0,0 +1,133 @@
+import json
+from collections import defaultdict
+
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+
+client = TestClient(app)
+
+
+def _post_batch(uploads):
+    files = [("files", (name, data, "application/pdf")) for name, data in uploads]
+    response = client.post("/evaluate/batch", files=files)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_batch_streams_tagged_events_for_every_file(
+    stub_llm, job_description, resume_pdf
+):
+    events = _post_batch([(f"cv_{i}.pdf", resume_pdf) for i in range(3)])
+
+    by_file = defaultdict(list)
+    for event in events[:-1]:
+        by_file[event["file_id"]].append(event)
+
+    assert sorted(by_file) == ["0", "1", "2"]
+    for file_id, file_events in by_file.items():
+        assert all(e["file_name"] == f"cv_{file_id}.pdf" for e in file_events)
+        assert file_events[-1]["status"] == "completed"
+        assert file_events[-1]["score"] == "7"
+        assert {e["status"] for e in file_events[:-1]} == {"progress"}
+
+    assert events[-1] == {
+        "status": "batch_completed",
+        "total": 3,
+        "completed": 3,
+        "failed": 0,
+        "duplicates": 0,
+    }
+
+
+def test_batch_respects_concurrency_limit(
+    stub_llm, job_description, resume_pdf, monkeypatch
+):
+    monkeypatch.setenv("EVALUATE_BATCH_CONCURRENCY", "2")
+    stub_llm.delay = 0.05
+
+    events = _post_batch([(f"cv_{i}.pdf", resume_pdf) for i in range(6)])
+
+    assert events[-1]["completed"] == 6
+    assert stub_llm.max_in_flight == 2
+
+
+def test_batch_isolates_failed_files(stub_llm, job_description, resume_pdf):
+    events = _post_batch([("good.pdf", resume_pdf), ("bad.pdf", b"not a pdf")])
+
+    final = {e["file_name"]: e for e in events[:-1] if e["status"] != "progress"}
+    assert final["good.pdf"]["status"] == "completed"
+    assert final["bad.pdf"]["status"] == "error"
+    assert events[-1]["completed"] == 1
+    assert events[-1]["failed"] == 1
+
+
+def test_batch_reads_each_file_in_its_slot(
+    stub_llm, job_description, resume_pdf, monkeypatch
+):
+    monkeypatch.setenv("EVALUATE_BATCH_CONCURRENCY", "1")
+    extracted, reads = [], []
+    read_upload, extract = main.read_upload, main.extract_text_from_pdf_async
+
+    async def counting_read(file):
+        reads.append(len(extracted))
+        return await read_upload(file)
+
+    async def counting_extract(*args, **kwargs):
+        text = await extract(*args, **kwargs)
+        extracted.append(text)
+        return text
+
+    monkeypatch.setattr(main, "read_upload", counting_read)
+    monkeypatch.setattr(main, "extract_text_from_pdf_async", counting_extract)
+    files = [
+        ("files", (f"cv_{i}.pdf", resume_pdf, "application/pdf")) for i in range(3)
+    ]
+
+    response = client.post("/evaluate/batch?cache=false", files=files)
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+
+    assert events[-1]["completed"] == 3
+    # Read up front, every file would be read before the first extraction.
+    assert reads == [0, 1, 2]
+
+
+def test_batch_over_the_total_limit_is_rejected(
+    stub_llm, job_description, resume_pdf, monkeypatch
+):
+    monkeypatch.setenv("MAX_BATCH_BYTES", str(2 * len(resume_pdf)))
+    files = [
+        ("files", (f"cv_{i}.pdf", resume_pdf, "application/pdf")) for i in range(3)
+    ]
+
+    response = client.post("/evaluate/batch", files=files)
+
+    assert response.status_code == 413
+    assert response.json()["code"] == "max_bytes"
+    assert stub_llm.calls == []
+
+
+def test_batch_without_content_length_is_cut_off(
+    stub_llm, job_description, monkeypatch
+):
+    monkeypatch.setenv("MAX_BATCH_BYTES", "100000")
+    boundary = "batchboundary"
+    part = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="files"; '
+        f'filename="cv.pdf"\r\nContent-Type: application/pdf\r\n\r\n'
+    ).encode()
+
+    def body():
+        yield part
+        for _ in range(50):
+            yield b"x" * 10_000
+
+    response = client.post(
+        "/evaluate/batch",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert response.status_code == 413
+    assert stub_llm.calls == []
@@ -0,0 +1,53 @@
+import json
+
+from bench.corpus import build_corpus
+from bench.run import check_baseline, check_thresholds, main
+
+
+def test_corpus_is_deterministic():
+    first = build_corpus(4, seed=3)
+    second = build_corpus(4, seed=3)
+
+    assert [(name, pages) for name, pages, _ in first] == [
+        (name, pages) for name, pages, _ in second
+    ]
+    assert all(pdf.startswith(b"%PDF") for _, _, pdf in first)
+
+
+def test_threshold_and_baseline_checks():
+    report = {"api": {"4": {"p95_ms": 900.0, "p99_ms": 1000.0, "throughput_rps": 2}}}
+
+    assert check_thresholds(report, {"api.4.p95_ms": {"max": 1000}}) == []
+    assert check_thresholds(report, {"api.4.p95_ms": {"max": 500}}) == [
+        "api.4.p95_ms = 900.0 > max 500"
+    ]
+    assert check_thresholds(report, {"api.16.p95_ms": {"max": 1}}) == []
+
+    baseline = {"api": {"4": {"p95_ms": 600.0, "p99_ms": 1000.0, "throughput_rps": 2}}}
+    assert check_baseline(report, baseline, tolerance=0.25) == [
+        "api.4.p95_ms = 900.0 (baseline 600.0)"
+    ]
+
+
+def test_bench_smoke_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACT_EXECUTOR", "thread")
+    output = tmp_path / "report.json"
+
+    code = main(
+        [
+            "--corpus-size=3",
+            "--concurrency=1,2",
+            "--latency=0",
+            "--tokens-per-second=100000",
+            f"--output={output}",
+        ]
+    )
+
+    report = json.loads(output.read_text())
+    assert code == 0
+    assert report["extraction"]["documents"] == 3
+    assert report["extraction"]["compact_token_reduction"] > 0
+    for scenario in ("graph", "api"):
+        for level in ("1", "2"):
+            assert report[scenario][level]["errors"] == 0
+            assert report[scenario][level]["llm_calls_per_resume"] >= 2
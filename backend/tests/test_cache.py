@@ -0,0 +1,116 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.cache import ResultCache, SQLiteResultStore, evaluation_cache_key
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _evaluate(pdf: bytes, **params):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    response = client.post("/evaluate", files=files, params=params)
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_cache_key_depends_on_every_input():
+    base = evaluation_cache_key(b"pdf", "jd", "gpt-4o-mini", "1")
+
+    assert base == evaluation_cache_key(b"pdf", "jd", "gpt-4o-mini", "1")
+    assert base != evaluation_cache_key(b"pdf2", "jd", "gpt-4o-mini", "1")
+    assert base != evaluation_cache_key(b"pdf", "jd2", "gpt-4o-mini", "1")
+    assert base != evaluation_cache_key(b"pdf", "jd", "gpt-4o", "1")
+    assert base != evaluation_cache_key(b"pdf", "jd", "gpt-4o-mini", "2")
+    assert evaluation_cache_key(b"ab", "c", "m", "1") != evaluation_cache_key(
+        b"a", "bc", "m", "1"
+    )
+
+
+def test_lru_evicts_by_total_bytes():
+    cache = ResultCache(max_bytes=100, ttl_seconds=60)
+    cache.put("a", {"v": "x" * 30})
+    cache.put("b", {"v": "y" * 30})
+    cache.get("a")  # "a" becomes most recently used
+    cache.put("c", {"v": "z" * 30})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.snapshot()["evictions"] == 1
+    assert cache.snapshot()["bytes"] <= 100
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResultCache(max_bytes=1000, ttl_seconds=10, clock=clock)
+    cache.put("a", {"score": "7"})
+
+    clock.now += 9
+    assert cache.get("a") == {"score": "7"}
+    clock.now += 2
+    assert cache.get("a") is None
+
+    stats = cache.snapshot()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["expirations"] == 1
+    assert stats["entries"] == 0
+
+
+def test_sqlite_tier_survives_new_memory_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    clock = FakeClock()
+    ResultCache(1000, 10, store=SQLiteResultStore(path), clock=clock).put(
+        "a", {"score": "7"}
+    )
+
+    fresh = ResultCache(1000, 10, store=SQLiteResultStore(path), clock=clock)
+    assert fresh.get("a") == {"score": "7"}
+    assert fresh.snapshot()["store_hits"] == 1
+    assert fresh.get("a") == {"score": "7"}
+    assert fresh.snapshot()["memory_hits"] == 1
+
+    clock.now += 11
+    assert ResultCache(1000, 10, SQLiteResultStore(path), clock).get("a") is None
+
+
+def test_reupload_is_served_from_cache(stub_llm, job_description, resume_pdf):
+    first = _evaluate(resume_pdf)
+    calls_after_first = len(stub_llm.calls)
+    second = _evaluate(resume_pdf)
+
+    assert first[-1]["cached"] is False
+    assert second[-1]["cached"] is True
+    assert second[-1]["analysis"] == first[-1]["analysis"]
+    assert len(stub_llm.calls) == calls_after_first
+
+    stats = client.get("/stats").json()["result_cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_opt_out_per_request(stub_llm, job_description, resume_pdf):
+    _evaluate(resume_pdf, cache="false")
+    second = _evaluate(resume_pdf, cache="false")
+
+    assert second[-1]["cached"] is False
+    assert stub_llm.calls.count("reviewer") == 2
+    assert client.get("/stats").json()["result_cache"]["entries"] == 0
+
+
+def test_cache_opt_out_globally(stub_llm, job_description, resume_pdf, monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_ENABLED", "false")
+    _evaluate(resume_pdf)
+    second = _evaluate(resume_pdf)
+
+    assert second[-1]["cached"] is False
+    assert client.get("/stats").json()["result_cache"]["entries"] == 0
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app, evaluation_events, until_disconnected
+from services.ai import get_judge_engine, initial_graph_state
+from services.ocr import (
+    PDFLimitError,
+    extract_text_from_pdf_async,
+    shutdown_extraction_pool,
+)
+from services.scheduler import get_llm_scheduler
+from services.telemetry import render_metrics
+from tests.conftest import REVIEWER_TEXT
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def thread_extraction(monkeypatch):
+    """Deadlines here are shorter than spawning an extraction process."""
+    monkeypatch.setenv("PDF_EXTRACT_EXECUTOR", "thread")
+    shutdown_extraction_pool()
+    yield
+    shutdown_extraction_pool()
+
+
+def _evaluate(pdf: bytes, **params):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    response = client.post("/evaluate", files=files, params=params)
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_slow_audit_returns_unaudited_draft(stub_llm, job_description, resume_pdf):
+    stub_llm.delays = [0, 5]  # Reviewer answers, the Auditor hangs
+
+    final = _evaluate(resume_pdf, deadline=0.5)[-1]
+
+    assert final["status"] == "completed"
+    assert final["deadline_exceeded"] is True
+    assert final["audited"] is False
+    assert final["score"] == "7"
+    assert final["analysis"] == REVIEWER_TEXT
+    assert stub_llm.cancelled == 1
+    auditor = [s for s in final["timings"]["spans"] if s["stage"] == "auditor"]
+    assert auditor[-1]["timed_out"] is True
+    # A truncated result is not cached.
+    assert _evaluate(resume_pdf)[-1]["cached"] is False
+
+
+def test_deadline_keeps_the_best_earlier_draft(stub_llm, job_description, resume_pdf):
+    stub_llm.auditor_verdicts = ["FAIL: คะแนนสูงเกินไป"]
+    stub_llm.delays = [0, 0, 5]  # The rewrite after the FAIL hangs
+
+    events = _evaluate(resume_pdf, deadline=0.5, stream_tokens="true")
+    final = events[-1]
+
+    assert final["deadline_exceeded"] is True
+    assert final["analysis"] == REVIEWER_TEXT
+    assert final["conversation_log"][-1]["role"] == "Auditor"
+    discards = [e for e in events if e["status"] == "discard"]
+    assert discards[-1] == {
+        "status": "discard",
+        "attempt": 2,
+        "reason": "Deadline reached",
+    }
+
+
+def test_sync_graph_enforces_the_deadline_on_each_call(stub_llm):
+    stub_llm.delays = [0, 5]  # Reviewer answers, the Auditor hangs
+    state = initial_graph_state(
+        "resume", "Backend Developer", deadline=time.monotonic() + 0.5
+    )
+
+    start = time.monotonic()
+    final = get_judge_engine().get_app().invoke(state)
+
+    assert time.monotonic() - start < 2
+    assert final["deadline_exceeded"] is True
+    assert final["reviewer_output"] == REVIEWER_TEXT
+    assert get_llm_scheduler().snapshot()["timeouts"] == 1
+
+
+def test_no_draft_before_deadline_is_an_error(stub_llm, job_description, resume_pdf):
+    stub_llm.delays = [5]
+
+    final = _evaluate(resume_pdf, deadline=0.3)[-1]
+
+    assert final == {
+        "status": "error",
+        "message": "Deadline reached before the Reviewer produced an evaluation.",
+    }
+
+
+def test_default_deadline_from_environment(
+    stub_llm, job_description, resume_pdf, monkeypatch
+):
+    monkeypatch.setenv("EVALUATION_DEADLINE", "0.5")
+    stub_llm.delays = [0, 5]
+
+    assert _evaluate(resume_pdf)[-1]["deadline_exceeded"] is True
+
+
+def test_completed_run_is_marked_audited(stub_llm, job_description, resume_pdf):
+    final = _evaluate(resume_pdf, deadline=30)[-1]
+
+    assert final["audited"] is True
+    assert final["deadline_exceeded"] is False
+
+
+def test_extraction_uses_what_is_left_of_the_deadline(resume_pdf):
+    with pytest.raises(PDFLimitError) as error:
+        asyncio.run(extract_text_from_pdf_async(resume_pdf, timeout=0))
+
+    assert error.value.code == "timeout"
+
+
+class DisconnectingRequest:
+    """Minimal stand-in for Request.receive(): disconnects after `after` s."""
+
+    def __init__(self, after: float):
+        self.after = after
+
+    async def receive(self):
+        await asyncio.sleep(self.after)
+        return {"type": "http.disconnect"}
+
+
+def test_disconnect_cancels_in_flight_llm_call(stub_llm, job_description, resume_pdf):
+    stub_llm.delays = [5]
+
+    async def lines():
+        async for event in evaluation_events(resume_pdf, "cv.pdf", use_cache=False):
+            yield json.dumps(event)
+
+    async def run():
+        return [
+            json.loads(line)
+            async for line in until_disconnected(DisconnectingRequest(0.3), lines())
+        ]
+
+    events = asyncio.run(run())
+
+    assert events[-1]["message"] == "AI Agents are thinking..."
+    assert stub_llm.cancelled == 1
+    assert 'skrut_evaluations_total{outcome="cancelled"} 1' in render_metrics()
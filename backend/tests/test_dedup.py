@@ -0,0 +1,150 @@
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from services.cache import reset_result_cache
+from services.dedup import DuplicateIndex, fingerprint, get_duplicate_index
+from tests.conftest import make_pdf
+
+client = TestClient(app)
+
+RESUME = (
+    "Somchai Jaidee - somchai@example.com\n"
+    "Backend developer with four years of Python, FastAPI and PostgreSQL.\n"
+    "Built payment APIs serving two million requests per day at Siam Pay.\n"
+    "Migrated a monolith to Docker services on Kubernetes with zero downtime.\n"
+    "Wrote integration tests, CI pipelines and on-call runbooks for the team.\n"
+    "Skills: Python, FastAPI, PostgreSQL, Redis, Docker, Kubernetes, Linux."
+)
+EDITED = RESUME.replace("Redis", "Redis, Celery")
+OTHER = (
+    "Naree Wong - naree@example.com\n"
+    "Graphic designer focused on brand identity, packaging and print layout.\n"
+    "Skills: Illustrator, Photoshop, typography, colour theory."
+)
+
+
+def _similarity(a: str, b: str) -> float:
+    return float(np.mean(fingerprint(a).signature == fingerprint(b).signature))
+
+
+def _evaluate(pdf: bytes, name="cv.pdf"):
+    response = client.post("/evaluate", files={"file": (name, pdf, "application/pdf")})
+    return [json.loads(line) for line in response.text.splitlines()][-1]
+
+
+def test_small_edits_keep_the_signature_close():
+    assert fingerprint(RESUME).digest == fingerprint(RESUME.upper()).digest
+    assert _similarity(RESUME, EDITED) >= 0.8
+    assert _similarity(RESUME, OTHER) < 0.2
+
+
+def test_numbers_tell_resumes_apart():
+    older = RESUME + "\nGPA 3.20, graduated 2019."
+    newer = RESUME + "\nGPA 3.90, graduated 2021."
+
+    assert fingerprint(older).digest != fingerprint(newer).digest
+    assert _similarity(older, newer) >= 0.8
+
+
+def test_index_is_bounded_and_forgets_failed_originals():
+    index = DuplicateIndex(threshold=0.8, capacity=1)
+    resume, other = fingerprint(RESUME), fingerprint(OTHER)
+
+    match, entry = index.find_or_add("jd", resume, "a.pdf")
+    assert match is None
+    match, _ = index.find_or_add("jd", fingerprint(EDITED), "b.pdf")
+    assert match.entry is entry and not match.exact
+
+    index.abandon(entry)
+    assert index.find_or_add("jd", resume, "c.pdf")[0] is None
+    assert index.find_or_add("jd", other, "d.pdf")[0] is None  # Evicts c.pdf
+    assert index.find_or_add("jd", resume, "e.pdf")[0] is None
+    assert index.snapshot()["entries"] == 1
+
+
+def test_near_duplicate_reuses_the_earlier_evaluation(
+    monkeypatch, stub_llm, job_description
+):
+    monkeypatch.setenv("DUPLICATE_MODE", "reuse")
+    monkeypatch.setenv("DUPLICATE_THRESHOLD", "0.7")
+
+    first = _evaluate(make_pdf(text=RESUME), "cv.pdf")
+    calls = len(stub_llm.calls)
+    second = _evaluate(make_pdf(text=EDITED), "cv_final.pdf")
+
+    assert len(stub_llm.calls) == calls  # No LLM call for the copy
+    assert second["status"] == "completed"
+    assert second["score"] == first["score"]
+    assert second["duplicate"]["file_name"] == "cv.pdf"
+    assert client.get("/stats").json()["duplicates"]["reused"] == 1
+
+
+def test_flag_mode_stops_the_copy(monkeypatch, stub_llm, job_description):
+    monkeypatch.setenv("DUPLICATE_MODE", "flag")
+
+    _evaluate(make_pdf(text=RESUME), "cv.pdf")
+    event = _evaluate(make_pdf(text=RESUME.lower()), "copy.pdf")
+
+    assert event["status"] == "error"
+    assert event["code"] == "duplicate"
+    assert event["duplicate"]["exact"] is True
+    assert get_duplicate_index().snapshot()["skipped"] == 1
+
+
+def test_copies_in_one_batch_are_evaluated_once(monkeypatch, stub_llm, job_description):
+    monkeypatch.setenv("DUPLICATE_MODE", "reuse")
+    pdf = make_pdf(text=RESUME)
+    files = [("files", (f"cv_{i}.pdf", pdf, "application/pdf")) for i in range(3)]
+
+    response = client.post("/evaluate/batch", files=files)
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert stub_llm.calls == ["reviewer", "auditor"]
+    assert events[-1]["completed"] == 3
+    assert events[-1]["duplicates"] == 2
+
+
+def test_copy_of_an_evicted_original_is_evaluated_itself(
+    monkeypatch, stub_llm, job_description
+):
+    monkeypatch.setenv("DUPLICATE_MODE", "reuse")
+    monkeypatch.setenv("DUPLICATE_THRESHOLD", "0.7")
+
+    _evaluate(make_pdf(text=RESUME), "cv.pdf")
+    reset_result_cache()  # The original's result is gone
+    second = _evaluate(make_pdf(text=EDITED), "cv_final.pdf")
+
+    assert stub_llm.calls == ["reviewer", "auditor"] * 2
+    assert second["status"] == "completed" and "duplicate" not in second
+    assert get_duplicate_index().snapshot()["reused"] == 0
+
+
+def test_no_check_without_the_result_cache(monkeypatch, stub_llm, job_description):
+    monkeypatch.setenv("DUPLICATE_MODE", "reuse")
+    monkeypatch.setenv("RESULT_CACHE_ENABLED", "false")
+
+    _evaluate(make_pdf(text=RESUME), "cv.pdf")
+    second = _evaluate(make_pdf(text=RESUME), "copy.pdf")
+
+    assert "duplicate" not in second
+    assert get_duplicate_index().snapshot()["entries"] == 0
+
+
+def test_copy_sent_by_another_candidate_is_evaluated_itself(
+    monkeypatch, stub_llm, job_description
+):
+    monkeypatch.setenv("DUPLICATE_MODE", "reuse")
+    monkeypatch.setenv("DUPLICATE_THRESHOLD", "0.7")
+    template = RESUME.replace(
+        "Somchai Jaidee - somchai@example.com", "Naree Wong - naree@example.com"
+    )
+
+    _evaluate(make_pdf(text=RESUME), "somchai.pdf")
+    second = _evaluate(make_pdf(text=template), "naree.pdf")
+
+    assert stub_llm.calls == ["reviewer", "auditor"] * 2
+    assert "duplicate" not in second
+    assert get_duplicate_index().snapshot()["other_candidate"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+
+import services.ai
+from services.ai import get_judge_engine, reset_judge_engine
+
+
+def test_engine_is_shared_between_calls(stub_llm):
+    first = get_judge_engine()
+    second = get_judge_engine()
+
+    assert first is second
+    assert first.get_app() is second.get_app()
+
+
+def test_engine_rebuilds_when_model_changes(stub_llm, monkeypatch):
+    first = get_judge_engine()
+    monkeypatch.setenv("OPENAI_MODEL", "gpt-4o")
+    second = get_judge_engine()
+
+    assert second is not first
+    assert second.model_name == "gpt-4o"
+    assert get_judge_engine() is second
+
+
+def test_engine_rebuilds_when_pool_config_changes(stub_llm, monkeypatch):
+    first = get_judge_engine()
+    monkeypatch.setenv("LLM_MAX_CONNECTIONS", "7")
+
+    assert get_judge_engine() is not first
+    assert first.http_client.is_closed
+    assert first.http_async_client.is_closed
+
+
+def test_replaced_engine_closes_its_async_client_on_the_running_loop(
+    stub_llm, monkeypatch
+):
+    async def replace():
+        first = get_judge_engine()
+        monkeypatch.setenv("LLM_MAX_CONNECTIONS", "7")
+        second = get_judge_engine()
+        await asyncio.sleep(0)
+        return first, second
+
+    first, second = asyncio.run(replace())
+
+    assert first.http_async_client.is_closed
+    assert not second.http_async_client.is_closed
+
+
+def test_engine_uses_pooled_http_clients(monkeypatch):
+    captured = []
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "5")
+    monkeypatch.setattr(
+        services.ai, "ChatOpenAI", lambda **kwargs: captured.append(kwargs)
+    )
+    monkeypatch.setattr(services.ai.ResumeJudgeGraph, "get_app", lambda self: None)
+    reset_judge_engine()
+    try:
+        get_judge_engine()
+    finally:
+        reset_judge_engine()
+
+    reviewer_kwargs, auditor_kwargs = captured
+    assert reviewer_kwargs["http_async_client"] is auditor_kwargs["http_async_client"]
+    assert reviewer_kwargs["http_client"] is auditor_kwargs["http_client"]
+    pool = reviewer_kwargs["http_async_client"]._transport._pool
+    assert pool._max_keepalive_connections == 5
@@ -0,0 +1,156 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.jd_registry import (
+    JobDescriptionRegistry,
+    build_profile,
+    normalize_jd_text,
+)
+
+client = TestClient(app)
+SAMPLE_JD = (Path(__file__).parent.parent / "data" / "job_description.txt").read_text(
+    encoding="utf-8"
+)
+
+
+def _evaluate(pdf: bytes, **params):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    response = client.post("/evaluate", files=files, params=params)
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_normalization_collapses_layout_and_bullets():
+    text = "Title\r\n\r\n  •   Python   3 years \n\t2) FastAPI\n\n"
+
+    assert normalize_jd_text(text) == "Title\n- Python 3 years\n- FastAPI"
+
+
+def test_profile_extracts_requirements_from_sample_jd():
+    profile = build_profile(SAMPLE_JD)
+
+    assert profile.token_count > 0
+    assert len(profile.requirements) == 9
+    assert profile.requirements[0].startswith("Strategic Partnering:")
+    assert profile.requirements[-1].startswith("Knowledge:")
+    assert "Job Summary" not in profile.requirements
+
+
+def test_identical_jds_share_one_id(tmp_path):
+    registry = JobDescriptionRegistry(str(tmp_path / "jd.db"))
+    first = registry.register("Backend Developer\n- Python")
+    registry.register("Data Analyst\n- SQL")
+    again = registry.register("  Backend Developer \n * Python\n")
+
+    assert again.jd_id == first.jd_id
+    assert registry.current().jd_id == first.jd_id
+    assert len(registry.list()) == 2
+
+
+def test_registry_is_shared_between_worker_processes(tmp_path):
+    path = tmp_path / "jd.db"
+    JobDescriptionRegistry(str(path)).register("Backend Developer\n- Python")
+    script = (
+        "import sys; from services.jd_registry import JobDescriptionRegistry; "
+        "r = JobDescriptionRegistry(sys.argv[1]); "
+        "r.register('Data Analyst\\n- SQL'); print(r.current().jd_id)"
+    )
+    other_worker_id = subprocess.run(
+        [sys.executable, "-c", script, str(path)],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+    assert JobDescriptionRegistry(str(path)).current().jd_id == other_worker_id
+
+
+def test_registry_keeps_only_the_newest_jds(tmp_path):
+    registry = JobDescriptionRegistry(str(tmp_path / "jd.db"), max_entries=2)
+    first = registry.register("Backend Developer\n- Python")
+    registry.register("Data Analyst\n- SQL")
+    registry.register("Designer\n- Figma")
+
+    assert registry.get(first.jd_id) is None
+    assert len(registry.list()) == 2
+    # Re-registering makes a JD the newest again, so it survives the bound.
+    registry.register("Data Analyst\n- SQL")
+    registry.register("Tester\n- Selenium")
+    assert [p.content.split("\n")[0] for p in registry.list()] == [
+        "Tester",
+        "Data Analyst",
+    ]
+
+
+def test_registry_forgets_expired_jds(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(
+        "services.jd_registry.time", SimpleNamespace(time=lambda: clock[0])
+    )
+    registry = JobDescriptionRegistry(str(tmp_path / "jd.db"), ttl_seconds=60)
+    old = registry.register("Backend Developer\n- Python")
+    clock[0] += 61
+
+    assert registry.get(old.jd_id) is None
+    assert registry.current() is None
+    registry.register("Data Analyst\n- SQL")
+    assert [p.content for p in registry.list()] == ["Data Analyst\n- SQL"]
+    # Expired rows are deleted from the file, not only hidden.
+    clock[0] -= 61
+    assert registry.get(old.jd_id) is None
+
+
+def test_jd_endpoints_return_id_and_artifacts():
+    created = client.post("/job-description", params={"content": SAMPLE_JD}).json()
+
+    assert created["token_count"] > 0
+    assert len(created["requirements"]) == 9
+    assert client.get("/job-description").json() == {
+        "content": SAMPLE_JD,
+        "jd_id": created["jd_id"],
+    }
+    stored = client.get(f"/job-descriptions/{created['jd_id']}").json()
+    assert stored["normalized_text"] == normalize_jd_text(SAMPLE_JD)
+    assert client.get("/job-descriptions/unknown").status_code == 404
+
+
+def test_evaluate_uses_requested_jd(stub_llm, resume_pdf):
+    older = client.post("/job-description", params={"content": "Data Analyst\n- SQL"})
+    client.post("/job-description", params={"content": "Backend Developer\n- Python"})
+    older_id = older.json()["jd_id"]
+
+    events = _evaluate(resume_pdf, jd_id=older_id)
+
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["jd_id"] == older_id
+    shared_context = stub_llm.prompts[0][0].content
+    assert "Data Analyst\n- SQL" in shared_context
+    assert "Backend Developer" not in shared_context
+
+
+def test_evaluate_defaults_to_current_jd(stub_llm, job_description, resume_pdf):
+    events = _evaluate(resume_pdf)
+
+    assert events[-1]["jd_id"] == job_description.jd_id
+
+
+def test_unknown_jd_id_is_an_error_event(stub_llm, job_description, resume_pdf):
+    events = _evaluate(resume_pdf, jd_id="missing")
+
+    assert events[-1] == {
+        "status": "error",
+        "message": "Job description missing not found.",
+    }
+    assert stub_llm.calls == []
+
+
+def test_missing_jd_is_an_error_event(stub_llm, resume_pdf):
+    events = _evaluate(resume_pdf)
+
+    assert events[-1] == {"status": "error", "message": "Job description not set."}
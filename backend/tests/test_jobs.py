@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.jobs import JobManager, JobQueueFull
+
+
+def _events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def _submit(client, pdf: bytes, **params):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    return client.post("/jobs", files=files, params=params)
+
+
+def test_job_runs_in_background_and_replays(stub_llm, job_description, resume_pdf):
+    with TestClient(app) as client:
+        response = _submit(client, resume_pdf, cache="false")
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["events_url"] == f"/jobs/{job_id}/events"
+
+        events = _events(client.get(f"/jobs/{job_id}/events"))
+        status = client.get(f"/jobs/{job_id}").json()
+        # A reconnecting client picks up from the offset it had reached.
+        resumed = _events(client.get(f"/jobs/{job_id}/events", params={"offset": 2}))
+
+    assert [e["offset"] for e in events] == list(range(len(events)))
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["score"] == "7"
+    assert resumed == events[2:]
+    assert status["status"] == "completed"
+    assert status["result"]["score"] == "7"
+    assert stub_llm.calls == ["reviewer", "auditor"]
+
+
+def test_unknown_or_expired_job_is_404(
+    stub_llm, job_description, resume_pdf, monkeypatch
+):
+    monkeypatch.setenv("JOB_RESULT_TTL", "0")
+    with TestClient(app) as client:
+        assert client.get("/jobs/nope").status_code == 404
+
+        job_id = _submit(client, resume_pdf).json()["job_id"]
+        events = _events(client.get(f"/jobs/{job_id}/events"))
+        assert events[-1]["status"] == "completed"
+
+        assert client.get(f"/jobs/{job_id}").status_code == 404
+        assert client.get(f"/jobs/{job_id}/events").status_code == 404
+
+
+def test_followers_see_live_events_in_order():
+    release = asyncio.Event()
+
+    async def run():
+        yield {"status": "progress", "message": "one"}
+        await release.wait()
+        yield {"status": "progress", "message": "two"}
+        yield {"status": "completed", "score": "7"}
+
+    async def follow(job, offset):
+        return [event async for event in job.stream(offset)]
+
+    async def scenario():
+        manager = JobManager(workers=1, max_queued=4, ttl_seconds=60)
+        job = manager.submit("cv.pdf", run)
+        early = asyncio.create_task(follow(job, 0))
+        await asyncio.sleep(0.01)
+        assert job.status == "running" and len(job.events) == 1
+        late = asyncio.create_task(follow(job, 1))
+        release.set()
+        result = await early, await late
+        manager.shutdown()
+        return result
+
+    early, late = asyncio.run(scenario())
+
+    assert [e["offset"] for e in early] == [0, 1, 2]
+    assert late == early[1:]
+    assert early[-1]["status"] == "completed"
+
+
+def test_bounded_queue_rejects_when_full():
+    release = asyncio.Event()
+
+    async def run():
+        await release.wait()
+        yield {"status": "completed"}
+
+    async def scenario():
+        manager = JobManager(workers=1, max_queued=1, ttl_seconds=60)
+        running = manager.submit("a.pdf", run)
+        await asyncio.sleep(0)  # The worker picks up the first job
+        queued = manager.submit("b.pdf", run)
+        with pytest.raises(JobQueueFull):
+            manager.submit("c.pdf", run)
+        release.set()
+        await manager._queue.join()
+        manager.shutdown()
+        return running, queued, manager.snapshot()
+
+    running, queued, stats = asyncio.run(scenario())
+
+    assert running.status == queued.status == "completed"
+    assert stats["submitted"] == 2
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+
+
+def test_failing_job_ends_with_an_error_event():
+    async def run():
+        yield {"status": "progress", "message": "starting"}
+        raise RuntimeError("boom")
+
+    async def scenario():
+        manager = JobManager(workers=1, max_queued=1, ttl_seconds=60)
+        job = manager.submit("a.pdf", run)
+        events = [event async for event in job.stream()]
+        manager.shutdown()
+        return events
+
+    events = asyncio.run(scenario())
+
+    assert events[-1] == {"status": "error", "message": "boom", "offset": 1}
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import services.ocr
+from main import app
+from services.ocr import (
+    PDFLimitError,
+    build_compact_resume,
+    extract_text_from_pdf,
+    extract_text_from_pdf_async,
+    shutdown_extraction_pool,
+)
+from services.tokens import estimate_tokens
+from tests.conftest import make_pdf
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    shutdown_extraction_pool()
+    yield
+    shutdown_extraction_pool()
+
+
+def test_parallel_extraction_keeps_page_order(monkeypatch):
+    monkeypatch.setenv("PDF_PAGES_PER_CHUNK", "2")
+    pdf = make_pdf(pages=7)
+
+    text = asyncio.run(extract_text_from_pdf_async(pdf))
+
+    positions = [text.index(f"Page {i}") for i in range(1, 8)]
+    assert positions == sorted(positions)
+    assert text == extract_text_from_pdf(pdf)
+
+
+def test_thread_fallback_matches_process_pool(monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACT_EXECUTOR", "thread")
+    pdf = make_pdf(pages=3)
+
+    assert asyncio.run(extract_text_from_pdf_async(pdf)) == extract_text_from_pdf(pdf)
+
+
+def test_max_pages_limit(monkeypatch):
+    monkeypatch.setenv("MAX_PDF_PAGES", "2")
+    pdf = make_pdf(pages=3)
+
+    with pytest.raises(PDFLimitError) as exc:
+        asyncio.run(extract_text_from_pdf_async(pdf))
+    assert exc.value.code == "max_pages"
+
+    with pytest.raises(PDFLimitError):
+        extract_text_from_pdf(pdf)
+
+
+def test_max_bytes_limit(monkeypatch):
+    monkeypatch.setenv("MAX_PDF_BYTES", "100")
+
+    with pytest.raises(PDFLimitError) as exc:
+        asyncio.run(extract_text_from_pdf_async(make_pdf()))
+    assert exc.value.code == "max_bytes"
+
+
+def test_extraction_timeout(monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACT_EXECUTOR", "thread")
+    monkeypatch.setenv("PDF_EXTRACT_TIMEOUT", "0.1")
+
+    def slow_range(file_bytes, start, stop, mode="plain"):
+        time.sleep(0.5)
+        return []
+
+    monkeypatch.setattr(services.ocr, "_extract_page_range", slow_range)
+
+    with pytest.raises(PDFLimitError) as exc:
+        asyncio.run(extract_text_from_pdf_async(make_pdf()))
+    assert exc.value.code == "timeout"
+
+
+def test_timed_out_extraction_does_not_block_the_next_one(monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACT_EXECUTOR", "thread")
+    monkeypatch.setenv("PDF_EXTRACT_TIMEOUT", "0.2")
+    extract = services.ocr._extract_page_range
+    hostile = make_pdf(text="hostile document " * 5)
+
+    def stuck_on_hostile(file_bytes, start, stop, mode="plain"):
+        if bytes(file_bytes) == hostile:
+            time.sleep(1.5)
+        return extract(file_bytes, start, stop, mode)
+
+    monkeypatch.setattr(services.ocr, "_extract_page_range", stuck_on_hostile)
+
+    with pytest.raises(PDFLimitError):
+        asyncio.run(extract_text_from_pdf_async(hostile))
+    # The single extraction thread is still stuck; a fresh one takes over.
+    assert "Somchai" in asyncio.run(extract_text_from_pdf_async(make_pdf()))
+
+
+def test_invalid_pdf_returns_empty_text():
+    assert asyncio.run(extract_text_from_pdf_async(b"%PDF-1.4 broken")) == ""
+
+
+def test_limit_hit_emits_error_event(monkeypatch, job_description):
+    monkeypatch.setenv("MAX_PDF_PAGES", "1")
+    client = TestClient(app)
+    files = {"file": ("long.pdf", make_pdf(pages=2), "application/pdf")}
+
+    response = client.post("/evaluate", files=files)
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[-1]["status"] == "error"
+    assert events[-1]["code"] == "max_pages"
+
+
+def cv_pdf(pages: int = 3) -> bytes:
+    """A CV with a repeated header, numbered footers and section headings."""
+    import pymupdf as fitz
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((50, 30), "Somchai Jaidee  |  Curriculum Vitae", fontsize=8)
+        body = (
+            "Somchai Jaidee\nsomchai@example.com\nSkills: Python,   FastAPI\n"
+            "Experience\n  - 4 years    backend development"
+            if i == 0
+            else f"- project {i}: Docker and PostgreSQL\nEducation\nB.Sc. Kasetsart"
+        )
+        page.insert_text((50, 60), body, fontsize=9)
+        page.insert_text((270, 815), f"Page {i + 1} of {pages}", fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_compact_mode_drops_page_furniture_and_orders_sections():
+    pdf = cv_pdf()
+
+    plain = extract_text_from_pdf(pdf, mode="plain")
+    compact = extract_text_from_pdf(pdf, mode="compact")
+
+    assert "Curriculum Vitae" in plain and "Page 2 of 3" in plain
+    assert "Curriculum Vitae" not in compact and "Page" not in compact
+    assert "- 4 years backend development" in compact
+    sections = [line for line in compact.splitlines() if line.startswith("[")]
+    assert sections == ["[CONTACT]", "[EXPERIENCE]", "[EDUCATION]", "[SKILLS]"]
+    assert compact.index("Python, FastAPI") > compact.index("B.Sc. Kasetsart")
+    assert len(compact) < len(plain)
+
+
+def test_compact_mode_matches_between_sync_and_pool(monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACT_MODE", "compact")
+    monkeypatch.setenv("PDF_PAGES_PER_CHUNK", "1")
+    pdf = cv_pdf()
+
+    assert asyncio.run(extract_text_from_pdf_async(pdf)) == extract_text_from_pdf(pdf)
+
+
+def test_compact_resume_counts_tokens_and_dropped_lines():
+    pages = [
+        [("Header", 0.02, 0.04), ("Skills", 0.1, 0.12), ("Python", 0.2, 0.22)],
+        [("Header", 0.02, 0.04), ("Docker", 0.2, 0.22), ("2", 0.95, 0.97)],
+    ]
+
+    resume = build_compact_resume(pages)
+
+    assert resume.sections == {"skills": "Python\nDocker"}
+    assert resume.dropped_lines == 3
+    assert resume.token_count == estimate_tokens(resume.text)
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services.ai import evaluate_resume
+from services.parsing import (
+    ReviewerEvaluation,
+    parse_evaluation_text,
+    parse_snapshot,
+    render_evaluation,
+)
+from tests.conftest import REVIEWER_TEXT
+
+client = TestClient(app)
+
+STRUCTURED = ReviewerEvaluation(
+    name="Somchai Jaidee",
+    email="somchai@example.com",
+    score=6.5,
+    strengths="Python และ FastAPI",
+    transferable_skills="Flask ใกล้เคียงกับ FastAPI",
+    gaps="ยังไม่มีประสบการณ์ Kubernetes",
+)
+
+
+@pytest.mark.parametrize(
+    "text, score, name, email",
+    [
+        (REVIEWER_TEXT, "7", "Somchai Jaidee", "somchai@example.com"),
+        ("Score - 8.5\nName: A", "8.5", "A", None),
+        ("Overall 7.5 / 10", "7.5", None, None),
+        ("คะแนน: 6\nชื่อ: สมชาย ใจดี\nอีเมล: a@b.co", "6", "สมชาย ใจดี", "a@b.co"),
+        ("Score: 4\nthe score - 9", "4", None, None),
+        ("Score is around 12 then 3", None, None, None),
+        ("**Name:** Jane Doe\n**Score (0-10):** 3", "3", "Jane Doe", None),
+        ("Name: Bob - bob@x.com\nScore 5/10", "5", "Bob - bob@x.com", "bob@x.com"),
+    ],
+)
+def test_single_pass_parser(text, score, name, email):
+    parsed = parse_evaluation_text(text)
+
+    assert (parsed.score, parsed.name, parsed.email) == (score, name, email)
+
+
+def test_parser_reads_analysis_sections():
+    parsed = parse_evaluation_text(render_evaluation(STRUCTURED))
+
+    assert parsed.score == "6.5"
+    assert parsed.strengths == "Python และ FastAPI"
+    assert parsed.transferable_skills == "Flask ใกล้เคียงกับ FastAPI"
+    assert parsed.gaps == "ยังไม่มีประสบการณ์ Kubernetes"
+    assert parsed.missing_fields() == []
+
+
+def test_parser_recovers_fields_from_broken_json():
+    parsed = parse_evaluation_text('{"name": "Jane", "email": "j@x.io", "score": 7.5,')
+
+    assert (parsed.name, parsed.email, parsed.score) == ("Jane", "j@x.io", "7.5")
+    assert parsed.missing_fields() == []
+
+
+def test_structured_mode_returns_schema_fields(stub_llm, monkeypatch):
+    monkeypatch.setenv("REVIEWER_STRUCTURED_OUTPUT", "true")
+    stub_llm.reviewer_text = STRUCTURED.model_dump_json()
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert stub_llm.calls == ["reviewer", "auditor"]
+    assert result["score"] == "6.5"
+    assert result["evaluation"]["source"] == "structured"
+    assert result["evaluation"]["gaps"] == STRUCTURED.gaps
+    # The Auditor and the UI still get the familiar text layout.
+    assert result["analysis"] == render_evaluation(STRUCTURED)
+    assert result["analysis"] in stub_llm.prompts[1][-1].content
+    assert parse_snapshot()["structured"] == 1
+
+
+def test_structured_mode_falls_back_to_the_text_parser(stub_llm, monkeypatch):
+    monkeypatch.setenv("REVIEWER_STRUCTURED_OUTPUT", "true")
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert result["score"] == "7"
+    assert result["evaluation"]["source"] == "text"
+    stats = parse_snapshot()
+    assert stats["structured_fallbacks"] == 1
+    assert stats["text_parsed"] == 1
+
+
+def test_parse_failures_and_retry_cost_are_counted(
+    stub_llm, job_description, resume_pdf
+):
+    stub_llm.reviewer_replies = ["ผู้สมัครเหมาะสมกับตำแหน่งนี้"]
+    stub_llm.usage = {"input_tokens": 100, "output_tokens": 20, "total_tokens": 120}
+
+    response = client.post(
+        "/evaluate", files={"file": ("cv.pdf", resume_pdf, "application/pdf")}
+    )
+    final = json.loads(response.text.splitlines()[-1])
+
+    assert final["parse_failures"] == 1
+    assert final["score"] == "7"
+    stats = client.get("/stats").json()["reviewer_parsing"]
+    assert stats["failures"] == 1
+    assert stats["retry_calls"] == 1
+    assert stats["retry_tokens"] == 120
+    assert stats["text_parsed"] == 1
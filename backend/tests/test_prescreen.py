@@ -0,0 +1,227 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+from services.jd_registry import build_profile
+from services.prescreen import (
+    LexicalPrescreen,
+    fast_reject_text,
+    prescreen_results,
+    tokenize,
+)
+from services.ai import extract_name, extract_score
+from tests.conftest import make_pdf
+
+client = TestClient(app)
+
+JD = """Senior Backend Engineer
+Requirements:
+- 5+ years Python development
+- FastAPI or Django REST APIs
+- PostgreSQL and Redis
+- Docker, Kubernetes, CI/CD
+คุณสมบัติ
+- สื่อสารภาษาอังกฤษได้ดี"""
+
+MATCHING = (
+    "Somchai Jaidee - somchai@example.com\n"
+    "Experience: 4 years Python, FastAPI and PostgreSQL development.\n"
+    "Skills: Docker, Linux, REST APIs, unit testing."
+)
+MATCHING_THAI = (
+    "นายสมชาย ใจดี\n"
+    "ประสบการณ์ พัฒนาระบบด้วย Python และ Django 5 ปี\n"
+    "ทักษะ Docker PostgreSQL สื่อสารภาษาอังกฤษได้ดี"
+)
+UNRELATED = (
+    "Malee Suksan - malee@example.com\n"
+    "Experience: 6 years chemical laboratory analyst, titration, HPLC.\n"
+    "Skills: Lab safety, GMP, ISO 17025 quality control."
+)
+
+
+def _scorer():
+    profile = build_profile(JD)
+    return LexicalPrescreen(profile.normalized_text, profile.requirements)
+
+
+def test_tokenize_handles_english_and_thai():
+    tokens = tokenize("Python, C++ and Node.js ภาษาไทย")
+
+    assert {"python", "c++", "node.js"} <= set(tokens)
+    assert "and" not in tokens
+    # Thai has no spaces, so it is split into character trigrams.
+    assert {"ภาษ", "าษา", "ษาไ", "าไท", "ไทย"} <= set(tokens)
+
+
+def test_scores_separate_matching_from_unrelated_resumes():
+    scores = _scorer().score_batch([MATCHING, MATCHING_THAI, UNRELATED])
+
+    assert scores[0] > 0.1
+    assert scores[1] > 0.1
+    assert scores[2] < 0.05
+    assert all(0.0 <= s <= 1.0 for s in scores)
+
+
+def test_batch_scores_match_single_scores():
+    scorer = _scorer()
+    batch = scorer.score_batch([MATCHING, UNRELATED, MATCHING_THAI])
+    single = [
+        scorer.score_batch([text])[0] for text in (MATCHING, UNRELATED, MATCHING_THAI)
+    ]
+
+    assert batch == pytest.approx(single)
+
+
+def test_repeating_a_keyword_saturates():
+    scorer = _scorer()
+    once, many = scorer.score_batch(["python", "python " * 50])
+
+    assert many < 2 * once
+
+
+def test_fast_reject_text_is_parsable(monkeypatch):
+    monkeypatch.setenv("PRESCREEN_MODE", "fast")
+    profile = build_profile(JD)
+    [result] = prescreen_results(
+        profile.normalized_text, profile.requirements, [UNRELATED]
+    )
+
+    text = fast_reject_text(UNRELATED, result)
+
+    assert result["fired"] is True
+    assert float(extract_score(text)) <= 2
+    assert extract_name(text) == "Malee Suksan - malee@example.com"
+    assert "5+ years Python development" in text
+
+
+def _evaluate(pdf: bytes):
+    response = client.post(
+        "/evaluate", files={"file": ("cv.pdf", pdf, "application/pdf")}
+    )
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+@pytest.fixture
+def unrelated_pdf():
+    return make_pdf(text=UNRELATED)
+
+
+def test_fast_mode_skips_the_llm_for_obvious_mismatches(
+    stub_llm, job_description, unrelated_pdf, monkeypatch
+):
+    monkeypatch.setenv("PRESCREEN_MODE", "fast")
+
+    events = _evaluate(unrelated_pdf)
+    final = events[-1]
+
+    assert stub_llm.calls == []
+    assert final["status"] == "completed"
+    assert final["prescreened"] is True
+    assert final["prescreen"]["fired"] is True
+    assert float(final["score"]) <= 2
+    assert final["conversation_log"][0]["role"] == "Pre-screen"
+    fired_at = next(i for i, e in enumerate(events) if e.get("prescreened"))
+    assert all(e.get("prescreened") for e in events[fired_at:])
+
+
+def test_cheap_mode_runs_one_unaudited_reviewer_pass(
+    stub_llm, job_description, unrelated_pdf, monkeypatch
+):
+    monkeypatch.setenv("PRESCREEN_MODE", "cheap")
+
+    final = _evaluate(unrelated_pdf)[-1]
+
+    assert stub_llm.calls == ["reviewer"]
+    assert final["prescreened"] is True
+    assert final["score"] == "7"
+
+
+def test_matching_resume_passes_the_prescreen(
+    stub_llm, job_description, resume_pdf, monkeypatch
+):
+    monkeypatch.setenv("PRESCREEN_MODE", "fast")
+
+    final = _evaluate(resume_pdf)[-1]
+
+    assert stub_llm.calls == ["reviewer", "auditor"]
+    assert final["prescreen"]["fired"] is False
+    assert "prescreened" not in final
+
+
+def test_prescreen_is_off_by_default(stub_llm, job_description, unrelated_pdf):
+    final = _evaluate(unrelated_pdf)[-1]
+
+    assert stub_llm.calls == ["reviewer", "auditor"]
+    assert final["prescreen"] is None
+
+
+def test_batch_prescreens_all_files_together(
+    stub_llm, job_description, resume_pdf, unrelated_pdf, monkeypatch
+):
+    monkeypatch.setenv("PRESCREEN_MODE", "fast")
+    files = [
+        ("files", ("good.pdf", resume_pdf, "application/pdf")),
+        ("files", ("bad.pdf", unrelated_pdf, "application/pdf")),
+    ]
+
+    response = client.post("/evaluate/batch", files=files)
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    final = {e["file_name"]: e for e in events if e["status"] == "completed"}
+
+    assert final["good.pdf"]["prescreen"]["fired"] is False
+    assert final["bad.pdf"]["prescreened"] is True
+    assert stub_llm.calls == ["reviewer", "auditor"]
+    assert events[-1]["completed"] == 2
+
+
+def test_batch_prescreen_survives_a_failed_preparation(
+    stub_llm, job_description, resume_pdf, unrelated_pdf, monkeypatch
+):
+    monkeypatch.setenv("PRESCREEN_MODE", "fast")
+    prepare = main.ResumeEvaluation.prepare
+
+    async def failing_prepare(self):
+        if self.file_name == "broken.pdf":
+            raise RuntimeError("boom")
+        async for event in prepare(self):
+            yield event
+
+    monkeypatch.setattr(main.ResumeEvaluation, "prepare", failing_prepare)
+    files = [
+        ("files", ("good.pdf", resume_pdf, "application/pdf")),
+        ("files", ("broken.pdf", resume_pdf, "application/pdf")),
+        ("files", ("bad.pdf", unrelated_pdf, "application/pdf")),
+    ]
+
+    response = client.post("/evaluate/batch", files=files)
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    final = {e["file_name"]: e for e in events if e["status"] == "completed"}
+
+    assert sorted(final) == ["bad.pdf", "good.pdf"]
+    assert final["bad.pdf"]["prescreened"] is True
+    assert events[-1]["completed"] == 2
+    assert events[-1]["failed"] == 1
+
+
+def test_batch_judges_files_when_the_batch_prescreen_fails(
+    stub_llm, job_description, resume_pdf, monkeypatch
+):
+    monkeypatch.setenv("PRESCREEN_MODE", "fast")
+    prescreen_batch = main.prescreen_batch
+
+    def failing_prescreen_batch(evaluations):
+        if len(evaluations) > 1:
+            raise RuntimeError("boom")
+        prescreen_batch(evaluations)
+
+    monkeypatch.setattr(main, "prescreen_batch", failing_prescreen_batch)
+    files = [("files", (f"cv_{i}.pdf", resume_pdf, "application/pdf")) for i in (1, 2)]
+
+    response = client.post("/evaluate/batch", files=files)
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+
+    assert events[-1]["completed"] == 2
@@ -0,0 +1,71 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from services.ai import evaluate_resume
+
+USAGE = {
+    "input_tokens": 1500,
+    "output_tokens": 200,
+    "total_tokens": 1700,
+    "input_token_details": {"cache_read": 1280},
+}
+
+
+def test_reviewer_and_auditor_share_a_stable_prefix(stub_llm):
+    stub_llm.auditor_verdicts = ["FAIL: คะแนนสูงเกินไป"]
+
+    evaluate_resume("Resume text", "Backend Developer")
+
+    reviewer_1, auditor_1, reviewer_2, auditor_2 = stub_llm.prompts
+    prefix = reviewer_1[0].content
+    assert "Backend Developer" in prefix and "Resume text" in prefix
+    for prompt in stub_llm.prompts:
+        assert prompt[0].content == prefix
+    # Role instructions come after the shared document block.
+    assert "Talent Acquisition" in reviewer_1[1].content
+    assert "HR Auditor" in auditor_1[1].content
+    assert "Backend Developer" not in auditor_1[2].content
+
+
+def test_retry_continues_the_reviewer_conversation(stub_llm):
+    stub_llm.auditor_verdicts = ["FAIL: ขาดหลักฐาน", "FAIL: คะแนนสูงเกินไป"]
+
+    evaluate_resume("Resume text", "Backend Developer")
+
+    reviewer_prompts = [
+        p for p, c in zip(stub_llm.prompts, stub_llm.calls) if c == "reviewer"
+    ]
+    first, second, third = reviewer_prompts
+    # Each retry is the previous conversation plus only the new turns.
+    assert second[: len(first)] == first
+    assert third[: len(second)] == second
+    assert len(second) == len(first) + 2
+    assert isinstance(second[-2], AIMessage)
+    assert isinstance(second[-1], HumanMessage)
+    assert "ขาดหลักฐาน" in second[-1].content
+    assert "คะแนนสูงเกินไป" in third[-1].content
+    assert "ขาดหลักฐาน" not in third[-1].content
+
+
+def test_cached_prompt_tokens_are_recorded_per_call(stub_llm):
+    stub_llm.usage = USAGE
+
+    result = evaluate_resume("Resume text", "Backend Developer")
+
+    assert [u["node"] for u in result["llm_usage"]] == ["reviewer", "auditor"]
+    for entry in result["llm_usage"]:
+        assert entry["input_tokens"] == 1500
+        assert entry["cached_input_tokens"] == 1280
+        assert entry["uncached_input_tokens"] == 220
+        assert entry["output_tokens"] == 200
+
+
+def test_scheduler_aggregates_cached_prompt_tokens(stub_llm):
+    from services.scheduler import get_llm_scheduler
+
+    stub_llm.usage = USAGE
+
+    evaluate_resume("Resume text", "Backend Developer")
+
+    stats = get_llm_scheduler().snapshot()
+    assert stats["prompt_tokens"] == 3000
+    assert stats["cached_prompt_tokens"] == 2560
@@ -0,0 +1,110 @@
+import pytest
+
+import services.ai
+from services.ai import evaluate_resume, get_judge_engine, model_signature
+from services.routing import ModelRouting, routing_snapshot
+from tests.conftest import REVIEWER_TEXT, StubChatModel
+
+LOW_SCORE = REVIEWER_TEXT.replace("Score (0-10): 7", "Score (0-10): 2")
+
+
+@pytest.fixture
+def model_stubs(monkeypatch):
+    """One StubChatModel per model name, so each tier's calls can be told apart."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    stubs = {}
+
+    def factory(**kwargs):
+        return stubs.setdefault(
+            kwargs["model"],
+            StubChatModel(
+                calls=[],
+                prompts=[],
+                auditor_verdicts=[],
+                reviewer_replies=[],
+                delays=[],
+            ),
+        )
+
+    monkeypatch.setattr(services.ai, "ChatOpenAI", factory)
+    services.ai.reset_judge_engine()
+    yield stubs
+    services.ai.reset_judge_engine()
+
+
+@pytest.fixture
+def cascade(monkeypatch, model_stubs):
+    monkeypatch.setenv("REVIEWER_MODEL", "strong-model")
+    monkeypatch.setenv("AUDITOR_MODEL", "audit-model")
+    monkeypatch.setenv("CASCADE_MODEL", "fast-model")
+    get_judge_engine()
+    return model_stubs
+
+
+def test_nodes_use_their_configured_models(monkeypatch, model_stubs):
+    monkeypatch.setenv("REVIEWER_MODEL", "strong-model")
+    monkeypatch.setenv("AUDITOR_MODEL", "audit-model")
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert set(model_stubs) == {"strong-model", "audit-model"}
+    assert model_stubs["strong-model"].calls == ["reviewer"]
+    assert model_stubs["audit-model"].calls == ["auditor"]
+    assert [u["model"] for u in result["llm_usage"]] == ["strong-model", "audit-model"]
+    assert result["model_tier"] == "strong"
+
+
+def test_clear_score_stays_on_the_fast_model(cascade):
+    cascade["fast-model"].reviewer_text = LOW_SCORE
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert cascade["fast-model"].calls == ["reviewer"]
+    assert cascade["strong-model"].calls == []
+    assert result["score"] == "2"
+    assert result["model_tier"] == "fast"
+    assert routing_snapshot()["fast_results"] == 1
+
+
+def test_borderline_score_escalates_before_the_audit(cascade):
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert cascade["fast-model"].calls == ["reviewer"]
+    assert cascade["strong-model"].calls == ["reviewer"]
+    assert cascade["audit-model"].calls == ["auditor"]
+    assert result["model_tier"] == "strong"
+    roles = [entry["role"] for entry in result["conversation_log"]]
+    assert roles == ["Reviewer", "Cascade", "Reviewer", "Auditor"]
+    # The strong model continues the conversation after the fast draft.
+    strong_prompt = cascade["strong-model"].prompts[0]
+    assert strong_prompt[-2].content == REVIEWER_TEXT
+    assert routing_snapshot()["escalated_borderline"] == 1
+
+
+def test_auditor_rejection_escalates(cascade):
+    cascade["fast-model"].reviewer_text = LOW_SCORE
+    cascade["strong-model"].reviewer_text = LOW_SCORE
+    cascade["audit-model"].auditor_verdicts = ["FAIL: ขาดหลักฐาน"]
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert cascade["fast-model"].calls == ["reviewer"]
+    assert cascade["strong-model"].calls == ["reviewer"]
+    assert result["model_tier"] == "strong"
+    assert routing_snapshot()["escalated_rejected"] == 1
+
+
+def test_models_are_part_of_the_cache_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_MODEL", "gpt-4o-mini")
+    assert model_signature() == "gpt-4o-mini"
+
+    monkeypatch.setenv("CASCADE_MODEL", "fast-model")
+    assert model_signature() == "gpt-4o-mini/cascade:fast-model@4-7"
+
+
+def test_borderline_range_is_inclusive():
+    routing = ModelRouting("strong", "strong", "fast", 4.0, 7.0)
+
+    assert routing.is_borderline("4") and routing.is_borderline("7")
+    assert not routing.is_borderline("3.5")
+    assert not routing.is_borderline(None)
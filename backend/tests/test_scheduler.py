@@ -0,0 +1,220 @@
+import asyncio
+import json
+import time
+
+import httpx
+import openai
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage
+
+from main import app
+from services.scheduler import LLMScheduler, retry_after_seconds
+
+MESSAGES = [HumanMessage(content="x" * 400)]
+
+
+def _rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class FlakyCall:
+    """Fails with the given errors first, then answers."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    async def __call__(self, messages):
+        self.calls.append(time.monotonic())
+        if self.errors:
+            raise self.errors.pop(0)
+        return AIMessage(
+            content="ok",
+            usage_metadata={
+                "input_tokens": 90,
+                "output_tokens": 10,
+                "total_tokens": 100,
+            },
+        )
+
+
+def test_retry_after_header_parsing():
+    assert retry_after_seconds(_rate_limit_error({"retry-after": "2"})) == 2.0
+    assert retry_after_seconds(_rate_limit_error({"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(_rate_limit_error({})) is None
+    assert retry_after_seconds(ValueError("no response")) is None
+
+
+def test_rpm_budget_spaces_calls():
+    scheduler = LLMScheduler(rpm_limit=2, tpm_limit=0, window_seconds=0.3)
+    call = FlakyCall()
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*[scheduler.run(call, MESSAGES) for _ in range(3)])
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+
+    assert elapsed >= 0.25
+    assert call.calls[2] - call.calls[0] >= 0.25
+    stats = scheduler.snapshot()
+    assert stats["calls"] == 3
+    assert stats["queued"] >= 1
+    assert stats["max_queue_depth"] >= 1
+
+
+def test_tpm_budget_uses_estimates_then_actual_usage():
+    scheduler = LLMScheduler(
+        rpm_limit=0, tpm_limit=320, completion_tokens=100, window_seconds=0.3
+    )
+    call = FlakyCall()
+
+    async def run():
+        await scheduler.run(call, MESSAGES)
+        # Actual usage (100) replaced the estimate (204), so a second call fits.
+        await scheduler.run(call, MESSAGES)
+        # A third (200 used + 204 estimated) exceeds 320 and must wait.
+        await scheduler.run(call, MESSAGES)
+
+    asyncio.run(run())
+
+    assert call.calls[1] - call.calls[0] < 0.1
+    assert call.calls[2] - call.calls[0] >= 0.25
+    assert scheduler.snapshot()["actual_tokens"] == 300
+
+
+def test_rate_limit_honors_retry_after_and_pauses_everyone():
+    scheduler = LLMScheduler(rpm_limit=0, tpm_limit=0, base_delay=0.01)
+    flaky = FlakyCall([_rate_limit_error({"retry-after": "0.2"})])
+    healthy = FlakyCall()
+
+    async def run():
+        first = asyncio.create_task(scheduler.run(flaky, MESSAGES))
+        await asyncio.sleep(0.05)
+        await scheduler.run(healthy, MESSAGES)
+        await first
+
+    asyncio.run(run())
+
+    assert flaky.calls[1] - flaky.calls[0] >= 0.2
+    # The unrelated call also waited out the provider's cool-down.
+    assert healthy.calls[0] - flaky.calls[0] >= 0.2
+    stats = scheduler.snapshot()
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+
+
+def test_call_stats_report_retries_and_queue_wait():
+    scheduler = LLMScheduler(rpm_limit=0, tpm_limit=0, base_delay=0.01)
+    call = FlakyCall([_rate_limit_error({"retry-after": "0"})] * 2)
+    call_stats = {}
+
+    asyncio.run(scheduler.run(call, MESSAGES, call_stats))
+
+    assert call_stats["retries"] == 2
+    # The second and third attempts waited out the scheduler-wide pause.
+    assert call_stats["queue_seconds"] > 0
+
+
+def test_timeout_covers_backoff_between_retries():
+    scheduler = LLMScheduler(rpm_limit=0, tpm_limit=0, base_delay=0.01)
+    call = FlakyCall([_rate_limit_error({"retry-after": "5"})])
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(scheduler.run(call, MESSAGES, timeout=0.2))
+
+    assert len(call.calls) == 1
+    assert scheduler.snapshot()["timeouts"] == 1
+
+
+def test_rate_limited_attempt_leaves_nothing_in_the_window():
+    scheduler = LLMScheduler(
+        rpm_limit=0, tpm_limit=10000, base_delay=0.01, window_seconds=60
+    )
+    call = FlakyCall([_rate_limit_error({"retry-after": "0"})])
+
+    asyncio.run(scheduler.run(call, MESSAGES))
+
+    stats = scheduler.snapshot()
+    assert len(call.calls) == 2
+    # Only the attempt that ran, at its actual usage.
+    assert stats["window_tokens"] == 100
+    assert stats["window_requests"] == 1
+
+
+def test_failed_sync_call_keeps_only_its_prompt():
+    scheduler = LLMScheduler(
+        rpm_limit=0, tpm_limit=10000, completion_tokens=100, max_retries=0
+    )
+
+    def broken(messages):
+        raise openai.APIConnectionError(request=httpx.Request("POST", "/x"))
+
+    with pytest.raises(openai.APIConnectionError):
+        scheduler.run_sync(broken, MESSAGES)
+
+    assert scheduler.snapshot()["window_tokens"] == 104
+
+
+def test_cancelled_call_gives_back_its_completion_estimate():
+    scheduler = LLMScheduler(
+        rpm_limit=0, tpm_limit=320, completion_tokens=100, window_seconds=5
+    )
+    call = FlakyCall()
+
+    async def hang(messages):
+        await asyncio.sleep(5)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.run(hang, MESSAGES, timeout=0.05)
+        # Only the prompt (104) stays reserved, so a 204-token call still fits.
+        await asyncio.wait_for(scheduler.run(call, MESSAGES), 1)
+
+    asyncio.run(run())
+
+    assert scheduler.snapshot()["timeouts"] == 1
+
+
+def test_gives_up_after_max_retries():
+    scheduler = LLMScheduler(rpm_limit=0, tpm_limit=0, max_retries=2, base_delay=0.01)
+    errors = [_rate_limit_error({"retry-after": "0"}) for _ in range(3)]
+    call = FlakyCall(errors)
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(scheduler.run(call, MESSAGES))
+
+    assert len(call.calls) == 3
+    assert scheduler.snapshot()["failures"] == 1
+
+
+def test_sync_path_shares_the_budget():
+    scheduler = LLMScheduler(rpm_limit=1, tpm_limit=0, window_seconds=0.2)
+    calls = []
+
+    def call(messages):
+        calls.append(time.monotonic())
+        return AIMessage(content="ok")
+
+    scheduler.run_sync(call, MESSAGES)
+    scheduler.run_sync(call, MESSAGES)
+
+    assert calls[1] - calls[0] >= 0.18
+
+
+def test_graph_calls_go_through_scheduler(stub_llm, job_description, resume_pdf):
+    client = TestClient(app)
+    files = {"file": ("resume.pdf", resume_pdf, "application/pdf")}
+    events = [
+        json.loads(line)
+        for line in client.post("/evaluate", files=files).text.splitlines()
+    ]
+
+    assert events[-1]["status"] == "completed"
+    stats = client.get("/stats").json()["llm_scheduler"]
+    assert stats["calls"] == 2
+    assert stats["estimated_tokens"] > 0
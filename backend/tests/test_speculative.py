@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from services.ai import evaluate_resume, get_judge_engine, initial_graph_state
+from services.routing import STRONG
+from tests.conftest import REVIEWER_TEXT
+
+USAGE = {"input_tokens": 100, "output_tokens": 10, "total_tokens": 110}
+
+
+@pytest.fixture
+def speculative(monkeypatch, stub_llm):
+    monkeypatch.setenv("SPECULATIVE_DRAFTS", "3")
+    return stub_llm
+
+
+def _run_async(resume_text="resume"):
+    app = get_judge_engine().get_app()
+    state = initial_graph_state(resume_text, "Backend Developer")
+    return asyncio.run(app.ainvoke(state))
+
+
+def test_first_draft_to_pass_wins_and_cancels_the_rest(speculative):
+    # Draft 2 (index 1) finishes first and passes its audit.
+    speculative.delays = [0.3, 0.01, 0.3]
+
+    final = _run_async()
+
+    assert final["accepted_draft"] == 1
+    assert final["temp_status"] == "PASS"
+    assert final["reviewer_output"] == REVIEWER_TEXT
+    assert speculative.calls == ["reviewer", "auditor"]
+    assert speculative.cancelled == 2
+
+
+def test_drafts_cancelled_during_their_audit_are_dropped(speculative):
+    # Draft 0 passes a slow audit; draft 1 is still being audited then.
+    speculative.delays = [0.01, 0.02, 0.3, 0.1, 0.5]
+
+    final = _run_async()
+
+    assert final["accepted_draft"] == 0
+    assert [(e["role"], e["draft"]) for e in final["conversation_history"]] == [
+        ("Reviewer", 0),
+        ("Auditor", 0),
+    ]
+    assert len(final["llm_usage"]) == 2
+    assert speculative.cancelled == 2
+
+
+def _break_drafts(*indexes):
+    def broken(messages):
+        raise ValueError("draft failed")
+
+    calls = get_judge_engine().draft_calls[STRONG]
+    for index in indexes:
+        calls[index] = RunnableLambda(broken)
+
+
+@pytest.mark.parametrize("run", [_run_async, lambda: evaluate_resume("r", "JD")])
+def test_a_failed_draft_does_not_abort_the_round(speculative, run):
+    _break_drafts(0)
+
+    final = run()
+
+    assert final["accepted_draft"] in (1, 2)
+    assert speculative.calls.count("reviewer") == 2
+
+
+def test_round_fails_when_every_draft_failed(speculative):
+    _break_drafts(0, 1, 2)
+
+    with pytest.raises(ValueError, match="draft failed"):
+        _run_async()
+
+
+def test_rejected_round_logs_every_draft_and_verdict(monkeypatch, speculative):
+    monkeypatch.setenv("SPECULATIVE_DRAFTS", "2")
+    speculative.auditor_verdicts = ["FAIL: ขาดหลักฐาน", "FAIL: คะแนนสูงเกินไป"]
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    first_round = [e for e in result["conversation_log"] if e["timestamp"] == 0]
+    assert [(e["role"], e["draft"]) for e in first_round] == [
+        ("Reviewer", 0),
+        ("Auditor", 0),
+        ("Reviewer", 1),
+        ("Auditor", 1),
+    ]
+    assert result["accepted_draft"] is not None
+    # The second round continues from the first draft and the feedback it got.
+    retry_prompt = speculative.prompts[
+        [i for i, c in enumerate(speculative.calls) if c == "reviewer"][2]
+    ]
+    assert retry_prompt[-2].content == REVIEWER_TEXT
+    assert retry_prompt[-1].content.count("FAIL:") == 1
+
+
+def test_extra_token_budget_falls_back_to_one_draft(monkeypatch, speculative):
+    monkeypatch.setenv("SPECULATIVE_DRAFTS", "2")
+    monkeypatch.setenv("SPECULATIVE_TOKEN_BUDGET", "1")
+    speculative.usage = USAGE
+    speculative.auditor_verdicts = ["FAIL: a", "FAIL: b"]
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert speculative.calls.count("reviewer") == 3
+    assert result["speculative_tokens"] == 220  # Draft 2 and its audit
+
+
+def test_serial_loop_is_the_default(stub_llm):
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert stub_llm.calls == ["reviewer", "auditor"]
+    assert result["accepted_draft"] is None
@@ -0,0 +1,67 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+from tests.conftest import REVIEWER_TEXT
+
+client = TestClient(app)
+
+
+def _evaluate(pdf: bytes, **params):
+    response = client.post(
+        "/evaluate",
+        params=params,
+        files={"file": ("cv.pdf", pdf, "application/pdf")},
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_reviewer_tokens_stream_as_delta_events(stub_llm, job_description, resume_pdf):
+    events = _evaluate(resume_pdf, stream_tokens="true")
+
+    deltas = [e for e in events if e["status"] == "delta"]
+    assert len(deltas) > 1
+    assert {e["attempt"] for e in deltas} == {1}
+    assert "".join(e["content"] for e in deltas) == REVIEWER_TEXT
+    # Tokens arrive before the Reviewer node reports it is done.
+    first_delta = events.index(deltas[0])
+    reviewer_done = next(
+        i for i, e in enumerate(events) if "Reviewer finished" in e.get("message", "")
+    )
+    assert first_delta < reviewer_done
+
+
+def test_auditor_tokens_are_not_streamed(stub_llm, job_description, resume_pdf):
+    events = _evaluate(resume_pdf, stream_tokens="true")
+
+    streamed = "".join(e["content"] for e in events if e["status"] == "delta")
+    assert "PASS" not in streamed
+
+
+def test_rejected_attempt_is_discarded(stub_llm, job_description, resume_pdf):
+    stub_llm.auditor_verdicts = ["FAIL: คะแนนสูงเกินไป"]
+
+    events = _evaluate(resume_pdf, stream_tokens="true")
+
+    discards = [e for e in events if e["status"] == "discard"]
+    assert discards == [
+        {"status": "discard", "attempt": 1, "reason": "FAIL: คะแนนสูงเกินไป"}
+    ]
+    attempts = [e["attempt"] for e in events if e["status"] == "delta"]
+    discard_at = events.index(discards[0])
+    assert set(attempts) == {1, 2}
+    assert all(e["attempt"] == 2 for e in events[discard_at:] if e["status"] == "delta")
+    assert events[-1]["status"] == "completed"
+
+
+def test_final_event_is_unchanged_by_streaming(stub_llm, job_description, resume_pdf):
+    plain = _evaluate(resume_pdf, cache="false")
+    streamed = _evaluate(resume_pdf, cache="false", stream_tokens="true")
+
+    assert {e["status"] for e in plain} == {"progress", "completed"}
+    # Timings are per request; everything else must match.
+    plain[-1].pop("timings")
+    streamed[-1].pop("timings")
+    assert streamed[-1] == plain[-1]
@@ -0,0 +1,106 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.ai import evaluate_resume
+from services.telemetry import RequestTrace, render_metrics
+
+client = TestClient(app)
+
+
+def _evaluate(pdf: bytes, **params):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    response = client.post("/evaluate", files=files, params=params)
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_completed_event_carries_stage_timings(stub_llm, job_description, resume_pdf):
+    stub_llm.auditor_verdicts = ["FAIL: คะแนนสูงเกินไป", "PASS"]
+    stub_llm.usage = {"input_tokens": 100, "output_tokens": 20, "total_tokens": 120}
+
+    timings = _evaluate(resume_pdf, cache="false")[-1]["timings"]
+
+    stages = [span["stage"] for span in timings["spans"]]
+    assert stages == [
+        "upload_read",
+        "extraction",
+        "reviewer",
+        "parse",
+        "validator",
+        "auditor",
+        "reviewer",
+        "parse",
+        "validator",
+        "auditor",
+    ]
+    reviewers = [s for s in timings["spans"] if s["stage"] == "reviewer"]
+    assert [s["attempt"] for s in reviewers] == [1, 2]
+    auditors = [s for s in timings["spans"] if s["stage"] == "auditor"]
+    assert [s["verdict"] for s in auditors] == ["FAIL", "PASS"]
+    assert all(s["retries"] == 0 for s in reviewers + auditors)
+    assert timings["llm_calls"] == 4
+    assert timings["prompt_tokens"] == 400
+    assert timings["completion_tokens"] == 80
+    assert set(timings["stages_ms"]) >= {"extraction", "reviewer", "auditor", "parse"}
+    offsets = [span["offset_ms"] for span in timings["spans"]]
+    assert offsets == sorted(offsets)
+    assert timings["total_ms"] >= sum(s["duration_ms"] for s in reviewers)
+
+
+def test_cached_result_gets_fresh_timings(stub_llm, job_description, resume_pdf):
+    _evaluate(resume_pdf)
+    cached = _evaluate(resume_pdf)[-1]
+
+    assert cached["cached"] is True
+    stages = [span["stage"] for span in cached["timings"]["spans"]]
+    assert stages == ["upload_read", "cache_lookup"]
+    assert cached["timings"]["llm_calls"] == 0
+
+
+def test_sync_evaluation_returns_spans(stub_llm):
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert [s["stage"] for s in result["spans"]] == [
+        "reviewer",
+        "parse",
+        "validator",
+        "auditor",
+    ]
+
+
+def test_metrics_endpoint_exposes_histograms_and_counters(
+    stub_llm, job_description, resume_pdf
+):
+    stub_llm.usage = {"input_tokens": 100, "output_tokens": 20, "total_tokens": 120}
+    _evaluate(resume_pdf, cache="false")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert "# TYPE skrut_stage_duration_seconds histogram" in text
+    assert 'skrut_stage_duration_seconds_count{stage="extraction"} 1' in text
+    assert 'skrut_stage_duration_seconds_bucket{stage="reviewer",le="+Inf"} 1' in text
+    assert 'skrut_llm_tokens_total{node="reviewer",kind="prompt"} 100' in text
+    assert 'skrut_llm_tokens_total{node="auditor",kind="completion"} 20' in text
+    assert 'skrut_llm_retries_total{node="reviewer"} 0' in text
+    assert 'skrut_auditor_verdicts_total{verdict="PASS"} 1' in text
+    assert 'skrut_evaluations_total{outcome="completed"} 1' in text
+    assert "skrut_llm_queue_depth 0" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    trace = RequestTrace()
+    for _ in range(3):
+        with trace.span("extraction"):
+            pass
+
+    text = render_metrics()
+
+    assert (
+        'skrut_stage_duration_seconds_bucket{stage="extraction",le="0.005"} 3' in text
+    )
+    assert 'skrut_stage_duration_seconds_bucket{stage="extraction",le="60"} 3' in text
+    assert 'skrut_stage_duration_seconds_count{stage="extraction"} 3' in text
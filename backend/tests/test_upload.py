@@ -0,0 +1,120 @@
+import asyncio
+import io
+import json
+import os
+import tracemalloc
+
+import pymupdf as fitz
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from main import app, read_upload, upload_evaluation
+from services.ocr import PDFLimitError, shutdown_extraction_pool
+from tests.conftest import make_pdf
+
+client = TestClient(app)
+
+
+def _evaluate(pdf: bytes, path: str = "/evaluate"):
+    files = {"file": ("resume.pdf", pdf, "application/pdf")}
+    return client.post(path, files=files)
+
+
+def _upload(data: bytes, size=None) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename="resume.pdf", size=size)
+
+
+def padded_pdf(size: int) -> bytes:
+    """A one-page resume carrying an incompressible attachment of ~size bytes."""
+    doc = fitz.open(stream=make_pdf(), filetype="pdf")
+    doc.embfile_add("blob.bin", os.urandom(size))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_read_upload_stops_at_the_limit(monkeypatch):
+    monkeypatch.setenv("MAX_PDF_BYTES", "10000")
+    monkeypatch.setenv("UPLOAD_CHUNK_BYTES", "4096")
+    upload = _upload(b"x" * 50000)
+
+    with pytest.raises(PDFLimitError) as exc:
+        asyncio.run(read_upload(upload))
+
+    assert exc.value.code == "max_bytes"
+    assert upload.file.closed
+    assert asyncio.run(read_upload(_upload(b"x" * 9000))) == bytearray(b"x" * 9000)
+
+
+def test_oversized_upload_is_an_error_event(stub_llm, job_description, monkeypatch):
+    pdf = make_pdf()
+    monkeypatch.setenv("MAX_PDF_BYTES", str(len(pdf) - 1))
+
+    events = [json.loads(line) for line in _evaluate(pdf).text.splitlines() if line]
+
+    assert events[-1]["status"] == "error"
+    assert events[-1]["code"] == "max_bytes"
+    assert stub_llm.calls == []
+
+
+def test_declared_oversize_body_is_rejected_early(monkeypatch):
+    monkeypatch.setenv("MAX_PDF_BYTES", "1000")
+
+    response = _evaluate(b"x" * 200_000)
+
+    assert response.status_code == 413
+    assert response.json()["code"] == "max_bytes"
+    assert _evaluate(b"x" * 200_000, "/jobs").status_code == 413
+
+
+def test_upload_is_released_after_extraction(stub_llm, job_description, resume_pdf):
+    async def run():
+        evaluation = await upload_evaluation(_upload(resume_pdf), use_cache=False)
+        assert isinstance(evaluation.file_bytes, bytearray)
+        events = [event async for event in evaluation.prepare()]
+        return evaluation, events
+
+    evaluation, events = asyncio.run(run())
+
+    assert evaluation.file_bytes is None
+    assert evaluation.resume_text
+    upload = [s for s in evaluation.trace.spans if s["stage"] == "upload_read"]
+    assert upload[0]["bytes"] == len(resume_pdf)
+
+
+def test_concurrent_uploads_do_not_hold_pdf_bytes(
+    stub_llm, job_description, monkeypatch
+):
+    monkeypatch.setenv("PDF_EXTRACT_EXECUTOR", "thread")
+    shutdown_extraction_pool()
+    stub_llm.delay = 1.0  # Keeps every evaluation in the graph while we measure
+    count, pdf = 8, padded_pdf(2 * 1024 * 1024)
+
+    async def run():
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            evaluations = [
+                await upload_evaluation(_upload(pdf), use_cache=False)
+                for _ in range(count)
+            ]
+
+            async def drain(evaluation):
+                return [event async for event in evaluation.events()]
+
+            tasks = [asyncio.create_task(drain(e)) for e in evaluations]
+            while not all(e.resume_text for e in evaluations):
+                await asyncio.sleep(0.01)
+            in_graph = tracemalloc.get_traced_memory()[0] - baseline
+            results = await asyncio.gather(*tasks)
+        finally:
+            tracemalloc.stop()
+            shutdown_extraction_pool()
+        return in_graph, results
+
+    in_graph, results = asyncio.run(run())
+
+    assert all(events[-1]["status"] == "completed" for events in results)
+    # Without the release this would be at least count * len(pdf).
+    assert in_graph < len(pdf)
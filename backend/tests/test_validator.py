@@ -0,0 +1,119 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services.ai import evaluate_resume
+from services.validator import (
+    AUDIT,
+    AUTO_PASS,
+    RETRY,
+    validate_reviewer_output,
+    validator_snapshot,
+)
+from tests.conftest import REVIEWER_TEXT
+
+client = TestClient(app)
+
+MALFORMED = "ผู้สมัครมีประสบการณ์ Python ที่ดี แต่ยังขาด Docker"
+
+LOW_SCORE_MISMATCH = """
+0. **Candidate Metadata**:
+   - Name: Malee Suksan
+   - Email: malee@example.com
+1. Score (0-10): 1
+2. Analysis:
+   - **ทักษะที่นำมาปรับใช้ได้ (Transferable Skills):** No relevant skills found for this role
+"""
+
+
+def test_valid_output_goes_to_the_auditor():
+    assert validate_reviewer_output(REVIEWER_TEXT) == (AUDIT, "")
+
+
+def test_malformed_output_is_sent_back_with_feedback():
+    verdict, feedback = validate_reviewer_output(MALFORMED)
+
+    assert verdict == RETRY
+    assert feedback.startswith("FAIL:")
+    assert "Score (0-10), Name, Email" in feedback
+
+
+def test_missing_email_header_is_malformed():
+    text = REVIEWER_TEXT.replace("   - Email: somchai@example.com\n", "")
+
+    verdict, feedback = validate_reviewer_output(text)
+
+    assert verdict == RETRY
+    assert "Email" in feedback
+
+
+def test_low_score_with_missing_core_requirements_auto_passes():
+    assert validate_reviewer_output(LOW_SCORE_MISMATCH)[0] == AUTO_PASS
+
+
+def test_high_score_with_the_same_statement_is_still_audited():
+    text = LOW_SCORE_MISMATCH.replace("Score (0-10): 1", "Score (0-10): 6")
+
+    assert validate_reviewer_output(text)[0] == AUDIT
+
+
+def test_malformed_draft_is_retried_without_an_audit(stub_llm):
+    stub_llm.reviewer_replies = [MALFORMED]
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert stub_llm.calls == ["reviewer", "reviewer", "auditor"]
+    assert result["score"] == "7"
+    assert result["auditor_calls_avoided"] == 1
+    # The retry continues the conversation with the validator's feedback.
+    retry_prompt = stub_llm.prompts[1]
+    assert retry_prompt[-2].content == MALFORMED
+    assert "Score (0-10)" in retry_prompt[-1].content
+
+
+def test_deterministic_pass_skips_the_auditor(stub_llm):
+    stub_llm.reviewer_text = LOW_SCORE_MISMATCH
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert stub_llm.calls == ["reviewer"]
+    assert result["score"] == "1"
+    assert result["auditor_calls_avoided"] == 1
+    assert result["conversation_log"][-1]["role"] == "Validator"
+
+
+def test_always_malformed_output_stops_after_max_retries(stub_llm):
+    stub_llm.reviewer_text = MALFORMED
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert stub_llm.calls == ["reviewer"] * 3
+    assert result["auditor_calls_avoided"] == 3
+
+
+def test_validator_can_be_disabled(stub_llm, monkeypatch):
+    monkeypatch.setenv("REVIEW_VALIDATOR_ENABLED", "false")
+    stub_llm.reviewer_text = LOW_SCORE_MISMATCH
+
+    result = evaluate_resume("resume", "Backend Developer")
+
+    assert stub_llm.calls == ["reviewer", "auditor"]
+    assert result["auditor_calls_avoided"] == 0
+
+
+def test_avoided_audits_are_reported(stub_llm, job_description, resume_pdf):
+    stub_llm.reviewer_replies = [MALFORMED]
+
+    response = client.post(
+        "/evaluate", files={"file": ("cv.pdf", resume_pdf, "application/pdf")}
+    )
+    final = json.loads(response.text.splitlines()[-1])
+
+    assert final["auditor_calls_avoided"] == 1
+    stats = client.get("/stats").json()["review_validator"]
+    assert stats == validator_snapshot()
+    assert stats["checked"] == 2
+    assert stats["retried"] == 1
+    assert stats["audited"] == 1
+    assert stats["auditor_calls_avoided"] == 1
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bench.cold_start import measure_import
+from main import app
+from services.ocr import shutdown_extraction_pool
+from services.warmup import warm_up, warmup_snapshot
+
+
+@pytest.fixture
+def thread_extraction(monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACT_EXECUTOR", "thread")
+    shutdown_extraction_pool()
+    yield
+    shutdown_extraction_pool()
+
+
+def test_importing_main_skips_heavy_modules():
+    result = measure_import(1)
+
+    assert result["heavy_loaded"] == []
+
+
+def test_warm_up_prebuilds_engine_and_extraction(stub_llm, thread_extraction):
+    import services.ai
+
+    snapshot = warm_up()
+
+    assert snapshot["status"] == "done"
+    assert snapshot["errors"] == {}
+    assert set(snapshot["steps_ms"]) == {
+        "import_ai",
+        "judge_engine",
+        "pdf_engine",
+        "extraction_pool",
+    }
+    assert services.ai._ENGINE is not None
+
+
+def test_failed_step_does_not_stop_warm_up(thread_extraction, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAPI_KEY", raising=False)
+
+    snapshot = warm_up()
+
+    assert snapshot["status"] == "done"
+    assert "OPENAI_API_KEY" in snapshot["errors"]["judge_engine"]
+    assert "extraction_pool" in snapshot["steps_ms"]
+
+
+def test_startup_runs_warm_up_in_background(stub_llm, thread_extraction, monkeypatch):
+    monkeypatch.setenv("WARMUP_ON_STARTUP", "true")
+
+    with TestClient(app) as client:
+        assert client.head("/").status_code == 200
+        for _ in range(500):
+            if client.get("/stats").json()["warmup"]["status"] == "done":
+                break
+            time.sleep(0.01)
+
+    assert warmup_snapshot()["status"] == "done"
+    assert warmup_snapshot()["errors"] == {}
+
+
+def test_warm_up_is_off_by_default():
+    with TestClient(app) as client:
+        client.head("/")
+
+    assert warmup_snapshot()["status"] == "idle"
@@ -148,81 +148,90 @@ export default function UploadPage() {
       });
       
       if (!jdRes.ok) throw new Error("Failed to save Job Description");
+      // Pin the batch to this JD, even if someone else posts a new one meanwhile
+      const { jd_id: jdId } = await jdRes.json();
 
-      // 2. Process Files sequentially
+      // 2. Process all files in one batch stream (evaluated concurrently on the server)
       setLoadingStatus("analyzing");
-      
-      for (let i = 0; i < files.length; i++) {
-        const file = files[i];
-        setCurrentFileName(file.name);
-        
-        const formData = new FormData();
-        formData.append('file', file);
-
-        try {
-            const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
-            const response = await fetch(`${apiUrl}/evaluate`, {
-                method: 'POST',
-                body: formData,
-            });
 
-            if (!response.ok) throw new Error(`Analysis failed for ${file.name}`);
+      const formData = new FormData();
+      files.forEach((file) => formData.append('files', file));
 
-            // Handle Streaming Response
-            const reader = response.body?.getReader();
-            const decoder = new TextDecoder();
-            
-            if (!reader) throw new Error("Could not get stream reader");
-
-            let done = false;
-            let buffer = "";
-
-            while (!done) {
-                const { value, done: doneReading } = await reader.read();
-                done = doneReading;
-                const chunk = decoder.decode(value || new Uint8Array(), { stream: !done });
-                buffer += chunk;
-
-                const lines = buffer.split("\n");
-                buffer = lines.pop() || ""; // Keep the last incomplete line in buffer
-
-                for (const line of lines) {
-                    if (!line.trim()) continue;
-                    try {
-                        const event = JSON.parse(line);
-                        
-                        if (event.status === "progress") {
-                            // Update the UI with the detailed agent status
-                            setLoadingStatus("analyzing");
-                            setCurrentFileName(`${file.name} — ${event.message}`);
-                        } else if (event.status === "completed") {
-                            results.push({
-                                filename: file.name,
-                                ...event
-                            });
-                        } else if (event.status === "error") {
-                            console.error(`Error analyzing ${file.name}: ${event.message}`);
-                            throw new Error(event.message);
-                        }
-                    } catch (e) {
-                        console.error("Failed to parse stream line:", line, e);
-                    }
-                }
-            }
-
-        } catch (err) {
-            console.error(err);
-            results.push({
-                filename: file.name,
-                score: '0',
-                analysis: `Error: ${err instanceof Error ? err.message : 'Failed to process this file.'}`,
-                conversation_log: []
-            });
-        }
-        
-        setProcessedCount(i + 1);
+      const resultsById: Record<string, AnalysisResult> = {};
+      const failFile = (fileId: string, message: string) => {
+          const file = files[Number(fileId)];
+          resultsById[fileId] = {
+              filename: file?.name ?? fileId,
+              score: '0',
+              analysis: `Error: ${message}`,
+              conversation_log: []
+          };
+      };
+
+      try {
+          const response = await fetch(`${apiUrl}/evaluate/batch?jd_id=${encodeURIComponent(jdId)}`, {
+              method: 'POST',
+              body: formData,
+          });
+
+          if (!response.ok) throw new Error("Batch analysis failed");
+
+          // Handle Streaming Response (events for all files, tagged by file_id)
+          const reader = response.body?.getReader();
+          const decoder = new TextDecoder();
+
+          if (!reader) throw new Error("Could not get stream reader");
+
+          let done = false;
+          let buffer = "";
+          let finished = 0;
+
+          while (!done) {
+              const { value, done: doneReading } = await reader.read();
+              done = doneReading;
+              const chunk = decoder.decode(value || new Uint8Array(), { stream: !done });
+              buffer += chunk;
+
+              const lines = buffer.split("\n");
+              buffer = lines.pop() || ""; // Keep the last incomplete line in buffer
+
+              for (const line of lines) {
+                  if (!line.trim()) continue;
+                  try {
+                      const event = JSON.parse(line);
+
+                      if (event.status === "progress") {
+                          // Update the UI with the detailed agent status
+                          setCurrentFileName(`${event.file_name} — ${event.message}`);
+                      } else if (event.status === "completed") {
+                          resultsById[event.file_id] = {
+                              filename: event.file_name,
+                              ...event
+                          };
+                          finished += 1;
+                          setProcessedCount(finished);
+                      } else if (event.status === "error") {
+                          console.error(`Error analyzing ${event.file_name}: ${event.message}`);
+                          failFile(event.file_id, event.message);
+                          finished += 1;
+                          setProcessedCount(finished);
+                      }
+                  } catch (e) {
+                      console.error("Failed to parse stream line:", line, e);
+                  }
+              }
+          }
+      } catch (err) {
+          console.error(err);
       }
-      
+
+      // Keep upload order; files without a final event are reported as failed
+      files.forEach((_, i) => {
+          if (!resultsById[String(i)]) failFile(String(i), 'Failed to process this file.');
+          results.push(resultsById[String(i)]);
+      });
+      setProcessedCount(files.length);
+
       setLoadingStatus("completed");
       
       // Short delay to show completion 100%